@@ -0,0 +1 @@
+"""Performance benchmarks for cron_parser, runnable with ``python -m benchmarks.<name>``."""
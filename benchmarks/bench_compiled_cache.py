@@ -0,0 +1,51 @@
+"""Compare startup from crontab text against startup from the memory-mapped compiled cache.
+
+Usage: python -m benchmarks.bench_compiled_cache [--size N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_crontab_lines
+from cron_cache import load_crontab_cached
+from cron_parser import parse_crontab
+
+
+def _timed(label: str, func) -> None:
+    started = time.perf_counter()
+    func()
+    print(f"{label:<36} {time.perf_counter() - started:>8.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        crontab = os.path.join(directory, "crontab")
+        cache = os.path.join(directory, "crontab.bin")
+        with open(crontab, "w") as handle:
+            handle.writelines(synthetic_crontab_lines(args.size))
+
+        print(f"{args.size} crontab entries")
+        _timed("parse text", lambda: list(parse_crontab(crontab)))
+        _timed("build cache (first start)", lambda: load_crontab_cached(crontab, cache).close())
+
+        def warm_start(touch_all: bool):
+            schedules = load_crontab_cached(crontab, cache)
+            if touch_all:
+                for schedule in schedules:
+                    pass
+            else:
+                schedules[len(schedules) // 2]
+            schedules.close()
+
+        _timed("warm start, open only", lambda: warm_start(False))
+        _timed("warm start, decode every record", lambda: warm_start(True))
+        print(f"cache file size: {os.path.getsize(cache) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Time reloading a large crontab after a one-line edit: incremental Crontab.load against a full re-parse.
+
+Usage: python -m benchmarks.bench_crontab_reload [--lines N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_crontab_lines
+from cron_crontab import Crontab
+from cron_parser import ExpandedCronExpression, clear_field_cache, parse_crontab
+
+
+def _timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - started:>8.3f}s")
+    return result
+
+
+# The previous approach: rebuild every expression from scratch on each change
+def full_reparse(path: str) -> list:
+    with open(path) as handle:
+        return [ExpandedCronExpression(line.strip()).compile() for line in handle if line.strip() and not line.startswith("#")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args()
+
+    lines = synthetic_crontab_lines(args.lines)
+    handle, path = tempfile.mkstemp(suffix=".crontab")
+    os.close(handle)
+    try:
+        with open(path, "w") as out:
+            out.writelines(lines)
+        clear_field_cache()
+        crontab = _timed(f"initial load, {args.lines} lines", lambda: Crontab.from_file(path))
+
+        middle = len(lines) // 2
+        while lines[middle].startswith("#") or not lines[middle].strip():
+            middle += 1
+        lines[middle] = "7 7 7 7 0 /usr/local/bin/edited\n"
+        with open(path, "w") as out:
+            out.writelines(lines)
+
+        compiled_before = crontab.compiled_lines
+        events = _timed("incremental reload, one line edited", lambda: crontab.load(path))
+        print(f"  events: {[(event.kind, event.entry.line_number) for event in events]}, lines compiled: {crontab.compiled_lines - compiled_before}")
+        _timed("full re-parse (ExpandedCronExpression)", lambda: full_reparse(path))
+        _timed("full re-parse (parse_crontab)", lambda: list(parse_crontab(path)))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
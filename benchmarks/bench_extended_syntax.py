@@ -0,0 +1,122 @@
+"""Compare plain numeric expressions with names, macros, "L" and "#".
+
+"compile" builds a CompiledCronExpression with the field cache disabled, so every
+field is parsed. Names and macros compile to the same bitsets as their numeric
+spelling, so matches() and next_run() cost the same; "L" and "#" look the day up
+in a cached per-month table. Each numeric case is followed by a "baseline" row
+timing the same expression through a copy of the code before the extended
+syntax (fields parsed without names, "L" or "#"; no date-dependent checks when
+matching), with the relative cost of the current code in brackets.
+
+Usage: python -m benchmarks.bench_extended_syntax [--number N] [--repeat N]
+"""
+import argparse
+import calendar
+import timeit
+from datetime import datetime
+
+from cron_parser import (
+    FIELD_CACHE_SIZE,
+    FIELD_KINDS,
+    FIELD_SPECS,
+    BaseCronExpression,
+    CompiledCronExpression,
+    ExpandedField,
+    _field_cache,
+    _values_to_mask,
+    _weekday_days_mask,
+    expand_expression,
+    set_field_cache_size,
+)
+
+CASES = [
+    ("numeric", "0 9 * 1-3,12 1-5 /cmd"),
+    ("names", "0 9 * JAN-MAR,DEC MON-FRI /cmd"),
+    ("numeric daily", "0 0 * * * /cmd"),
+    ("macro", "@daily /cmd"),
+    ("last day", "0 9 L * * /cmd"),
+    ("nth weekday", "0 9 * * MON#2,5L /cmd"),
+]
+WHEN = datetime(2025, 3, 14, 9, 0)
+
+
+# expand_field as it was before the extended syntax: no names, "L" or "#", and no date-dependent tokens in the mask
+def _baseline_field(kind: str, expression: str) -> ExpandedField:
+    key = ('baseline', kind, expression)
+    cached = _field_cache.get(key)
+    if cached is not None:
+        return cached
+    spec = FIELD_SPECS[kind]
+    values = tuple(expand_expression(spec.component, expression, spec.options, spec.min_val, spec.max_val))
+    result = ExpandedField(values, _values_to_mask(values))
+    _field_cache.put(key, result)
+    return result
+
+
+# Compiled expression as it was before names, macros, "L" and "#", kept as the benchmark baseline
+class BaselineCronExpression(CompiledCronExpression):
+    __slots__ = ()
+
+    def __init__(self, cron_expression: str):
+        BaseCronExpression.__init__(self, cron_expression)
+        for kind, field in zip(FIELD_KINDS, self.raw_expression[:5]):
+            setattr(self, f"{kind}_mask", _baseline_field(kind, field).mask)
+
+    def matches(self, when: datetime) -> bool:
+        if not (self.minute_mask >> when.minute & 1 and self.hour_mask >> when.hour & 1 and self.month_mask >> when.month & 1):
+            return False
+        dom_match = self.dom_mask >> when.day & 1
+        dow_match = self.dow_mask >> (when.weekday() + 1) % 7 & 1
+        if self.day_or:
+            return bool(dom_match or dow_match)
+        return bool(dom_match and dow_match)
+
+    def _days_mask(self, year: int, month: int) -> int:
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        dow_days = _weekday_days_mask(self.dow_mask, (first_weekday + 1) % 7)
+        if self.day_or:
+            days = self.dom_mask | dow_days
+        else:
+            days = self.dom_mask & dow_days
+        return days & (((1 << days_in_month) - 1) << 1)
+
+
+def _best(statements, number: int, repeat: int):
+    """Return the best time per call of each statement in microseconds, alternating them so drift hits all alike."""
+    best = [float("inf")] * len(statements)
+    for _ in range(repeat):
+        for index, statement in enumerate(statements):
+            best[index] = min(best[index], timeit.timeit(statement, number=number) / number * 1e6)
+    return best
+
+
+def _measure(expression_classes, expression: str, number: int, repeat: int):
+    """Return (compile, matches, next_run) times in microseconds for each expression class."""
+    set_field_cache_size(0)
+    compile_times = _best([lambda cls=cls: cls(expression) for cls in expression_classes], number, repeat)
+    set_field_cache_size(FIELD_CACHE_SIZE)
+    compiled = [cls(expression) for cls in expression_classes]
+    matches_times = _best([lambda item=item: item.matches(WHEN) for item in compiled], number * 10, repeat)
+    next_run_times = _best([lambda item=item: item.next_run(WHEN) for item in compiled], number, repeat)
+    return list(zip(compile_times, matches_times, next_run_times))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"  {'syntax':<14} {'compile':>18} {'matches':>18} {'next_run':>18}")
+    for name, expression in CASES:
+        if not name.startswith("numeric"):
+            times, = _measure([CompiledCronExpression], expression, args.number, args.repeat)
+            print(f"  {name:<14} " + " ".join(f"{value:>8.3f}us{'':>8}" for value in times))
+            continue
+        times, baseline = _measure([CompiledCronExpression, BaselineCronExpression], expression, args.number, args.repeat)
+        print(f"  {name:<14} " + " ".join(f"{value:>8.3f}us ({value / base - 1:>+4.0%})" for value, base in zip(times, baseline)))
+        print(f"  {'  baseline':<14} " + " ".join(f"{value:>8.3f}us{'':>8}" for value in baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Compare per-field parse time of expand_expression before and after the single-pass field parser.
+
+The "before" column runs a verbatim copy of the regex-cascade implementation that
+the field parser replaced.
+
+Each column is the best of ``--repeat`` measurements.
+
+Usage: python -m benchmarks.bench_field_parse [--number N] [--repeat N]
+"""
+import argparse
+import re
+import timeit
+from typing import List, Union
+
+from cron_parser import expand_expression
+
+FIELDS = [
+    ("minute", "30", list(range(60)), 0, 59),
+    ("minute", "1-5", list(range(60)), 0, 59),
+    ("minute", "10-20", list(range(60)), 0, 59),
+    ("minute", "0,15,30,45", list(range(60)), 0, 59),
+    ("minute", "*/5", list(range(60)), 0, 59),
+    ("minute", "15/3,20-23,30,40,51-53", list(range(60)), 0, 59),
+    ("hour", "1-5,15/3", list(range(24)), 0, 23),
+]
+
+
+# Regex-cascade implementation replaced by cron_parser.parse_field, kept as the benchmark baseline
+def legacy_expand_expression(component: str, expression: str, options: Union[List[int], List[str]], min_val: str, max_val: str) -> Union[List[int], List[str]]:
+    """Expand a cron schedule expression component."""
+    
+    """ Handle "*" for any value """
+    if expression == "*":
+        return options
+
+    """ Handle dash for ranges, e.g. "1-5" """
+    cron_match = re.match(r"^(\d+)-(\d+)$", expression)
+    if cron_match:
+        start = int(cron_match.group(1))
+        end = int(cron_match.group(2))
+        # Validation : Both start and end should fall within allowed range
+        if min_val <= start <= max_val and min_val <= end <= max_val and start <= end:
+            return list(range(start, end + 1))
+        raise ValueError(f"Invalid range for '{component}': {expression}") # Handle error
+
+    """ Handle comma-separated values, e.g. "1,2,3" """
+    comma_match = re.match(r"^\d+(?:,\d+)*$", expression)
+    if comma_match:
+        values = list(map(int, expression.split(',')))
+        # Each value should fall within allowed range
+        if all(min_val <= value <= max_val for value in values):
+            return list(map(int, expression.split(',')))
+        raise ValueError(f"Invalid range for comma separated values for '{component}': {expression}") # Handle error
+
+    """ Handle step values, e.g. "*/5" """
+    step_match = re.match(r"^(\d+|\*)/(\d+)$", expression)
+    if step_match:
+        base = step_match.group(1)
+        step = int(step_match.group(2))
+        if min_val <= step <= max_val:
+            # Handle base range with step value
+            if base == "*":
+                base = options
+            else:
+                base = options[int(base):]  # Slice options if base is a number
+            return base[::step]
+        raise ValueError(f"Invalid step values for '{component}': {expression}") # Handle error
+    
+    
+    """Check for comma-separated cron-like expression like '15,20-23,30,40,51-53'. """
+    cron_match = re.match(r"^(\d+|\d+-\d+|\*|\d+/\d+)(?:,(\d+|\d+-\d+|\*|\d+/\d+))*$", expression)
+    if bool(cron_match):
+        expanded_part = []
+        parts = expression.split(',')
+        for part in parts:
+           """ Handle dash for ranges, e.g. "1-5" """
+           cron_match = re.match(r"^(\d+)-(\d+)$", part)
+           if cron_match:
+                start = int(cron_match.group(1))
+                end = int(cron_match.group(2))
+                if not (min_val <= start <= max_val and min_val <= end <= max_val and start <= end):
+                    raise ValueError(f"Invalid range for '{component}: {part}") # Handle error
+                expanded_part.extend(list(range(start, end + 1)))
+                continue
+
+           """ Handle comma-separated values, e.g. "1,2,3" """
+           comma_match = re.match(r"^\d+(?:,\d+)*$", part)
+           if comma_match:
+                values = list(map(int, part.split(',')))
+                # Each value should fall within allowed range
+                if not (all(min_val <= value <= max_val for value in values)):
+                    if len(values) == 1:
+                       raise ValueError(f"Invalid value for '{component}: {part}") # Handle error 
+                    raise ValueError(f"Invalid range for comma separated values for '{component}: {part}") # Handle error
+                expanded_part.extend(values)
+                continue
+
+           """ Handle step values, e.g. "*/5" """
+           step_match = re.match(r"^(\d+|\*)/(\d+)$", part)
+           if step_match:
+                base = step_match.group(1)
+                step = int(step_match.group(2))
+                if not (min_val <= step <= max_val):
+                    raise ValueError(f"Invalid step values for '{component}: {part}") # Handle error
+                # Handle base range with step value
+                if base == "*":
+                    base = options
+                else:
+                    base = options[int(base):]  # Slice options if base is a number
+
+                expanded_part.extend(base[::step])
+        return sorted(set(expanded_part))
+    """ If none of the above matched, raise an error """
+    raise ValueError(f"Invalid cron expression for '{component}: {expression}")
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000, help="parses per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per field, the best is reported")
+    args = parser.parse_args()
+
+    print(f"{'field':<24} {'before':>10} {'after':>10} {'speedup':>8}")
+    for component, expression, options, min_val, max_val in FIELDS:
+        before = min(timeit.repeat(lambda: legacy_expand_expression(component, expression, options, min_val, max_val), number=args.number, repeat=args.repeat))
+        after = min(timeit.repeat(lambda: expand_expression(component, expression, options, min_val, max_val), number=args.number, repeat=args.repeat))
+        print(f"{expression:<24} {before / args.number * 1e6:>8.2f}us {after / args.number * 1e6:>8.2f}us {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare memory and load time of eager and lazy expression loading on a large crontab.
+
+"eager, dict-based" mirrors the original ExpandedCronExpression: a per-instance
+__dict__, the text split twice and all five fields expanded into fresh lists.
+The lazy rows use the current __slots__-based class, which splits the text once
+and expands a field only when it is read.
+
+Usage: python -m benchmarks.bench_lazy_loading [--size N]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_parser import FIELD_KINDS, FIELD_SPECS, ExpandedCronExpression, expand_expression, parse_expression, parse_raw_components
+
+
+# Replica of the eager, dict-based expression layout this benchmark compares against
+class EagerDictExpression:
+    def __init__(self, cron_expression: str):
+        self.cron_expression = cron_expression
+        self.raw_expression = parse_expression(cron_expression)
+        self.command = self.raw_expression[5]
+        fields = parse_raw_components(cron_expression)
+        self.minute, self.hour, self.dom, self.month, self.dow = fields
+        self.expanded_minute, self.expanded_hour, self.expanded_dom, self.expanded_month, self.expanded_dow = [
+            list(expand_expression(FIELD_SPECS[kind].component, field, list(FIELD_SPECS[kind].options), FIELD_SPECS[kind].min_val, FIELD_SPECS[kind].max_val, FIELD_SPECS[kind].syntax))
+            for kind, field in zip(FIELD_KINDS, fields)
+        ]
+
+
+def _measure(label: str, load) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    loaded = load()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {elapsed:>8.3f}s {current / 1e6:>9.1f} MB  ({len(loaded)} kept)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    expressions = synthetic_expressions(args.size)
+    wanted = "/usr/local/bin/job7"
+    print(f"{args.size} expressions; filter keeps entries whose command starts with {wanted}")
+    _measure("eager, dict-based (original)", lambda: [e for e in map(EagerDictExpression, expressions) if e.command.startswith(wanted)])
+    _measure("eager, dict-based, keep all", lambda: list(map(EagerDictExpression, expressions)))
+    _measure("lazy slots, keep all", lambda: list(map(ExpandedCronExpression, expressions)))
+    _measure("lazy slots, filter by command", lambda: [e for e in map(ExpandedCronExpression, expressions) if e.command.startswith(wanted)])
+    _measure("lazy slots, filter by minute", lambda: [e for e in map(ExpandedCronExpression, expressions) if 0 in e.expanded_minute])
+
+    def lazy_all_fields():
+        loaded = list(map(ExpandedCronExpression, expressions))
+        for expression in loaded:
+            for kind in FIELD_KINDS:
+                expression.expanded_field(kind)
+        return loaded
+
+    _measure("lazy slots, every field read", lazy_all_fields)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Time load_histogram over a long horizon against occurrence_counts on the same window.
+
+Runs on the usual synthetic mix and on a high-diversity set where almost every
+schedule has its own day fields (two days of month, a month step and a weekday
+range), timing both the NumPy and the pure-Python histogram.
+
+Usage: python -m benchmarks.bench_load_histogram [--schedules N] [--days D] [--compare-days D]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import diverse_expressions, synthetic_expressions
+from cron_analysis import load_histogram, np, occurrence_counts
+from cron_parser import CompiledCronExpression
+
+START = datetime(2025, 1, 1)
+
+
+def _timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<34} {time.perf_counter() - started:>8.3f}s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schedules", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--compare-days", type=int, default=1, help="window for the occurrence_counts baseline")
+    args = parser.parse_args()
+
+    for name, generate in (("mixed", synthetic_expressions), ("diverse", diverse_expressions)):
+        print(f"{name} schedules")
+        expressions = _timed(f"compile {args.schedules} expressions", lambda: [CompiledCronExpression(expression) for expression in generate(args.schedules)])
+        end = START + timedelta(days=args.days)
+        if np is not None:
+            _timed(f"load_histogram (numpy), {args.days} days", lambda: load_histogram(expressions, START, end, use_numpy=True))
+        histogram = _timed(f"load_histogram (python), {args.days} days", lambda: load_histogram(expressions, START, end, use_numpy=False))
+        peaks = _timed("top 10 peaks with contributors", lambda: histogram.peaks(10))
+        _timed("percentiles", histogram.percentiles)
+        compare_end = START + timedelta(days=args.compare_days)
+        _timed(f"load_histogram, {args.compare_days} days", lambda: load_histogram(expressions, START, compare_end))
+        _timed(f"occurrence_counts, {args.compare_days} days", lambda: occurrence_counts(expressions, START, compare_end))
+        print(f"busiest minute: {peaks[0].when:%Y-%m-%d %H:%M} with {peaks[0].count} jobs" if peaks else "no runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare merged_timeline against building and sorting every job's run list.
+
+Both approaches walk every run in the window. Memory is the tracemalloc peak while
+consuming the timeline, so the sorted approach pays for holding every run at once.
+
+Usage: python -m benchmarks.bench_merged_timeline [--sizes 1000 10000] [--days N]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_analysis import merged_timeline
+from cron_parser import CompiledCronExpression
+
+START = datetime(2025, 3, 3, 0, 0)
+
+
+def _sorted_runs(jobs, start, end):
+    runs = [(run, job) for job, expression in enumerate(jobs) for run in expression.iter_runs(start, end)]
+    runs.sort()
+    return iter(runs)
+
+
+def _measure(timeline):
+    """Return (runs, seconds, peak MiB) for consuming a timeline built by a callable."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    runs = sum(1 for _ in timeline())
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return runs, elapsed, peak / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--days", type=float, default=1.0, help="length of the window")
+    args = parser.parse_args()
+
+    end = START + timedelta(days=args.days)
+    print(f"{'jobs':>8} {'runs':>10} {'approach':<10} {'time':>9} {'peak':>10}")
+    for size in args.sizes:
+        jobs = [CompiledCronExpression(expression) for expression in synthetic_expressions(size)]
+        for name, timeline in (
+            ("sorted", lambda: _sorted_runs(jobs, START, end)),
+            ("merged", lambda: merged_timeline(jobs, START, end)),
+        ):
+            runs, elapsed, peak = _measure(timeline)
+            print(f"{size:>8} {runs:>10} {name:<10} {elapsed:>8.2f}s {peak:>8.1f}MiB")
+
+
+if __name__ == "__main__":
+    main()
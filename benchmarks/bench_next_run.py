@@ -0,0 +1,56 @@
+"""Compare next_run against stepping minute by minute until the schedule matches.
+
+Usage: python -m benchmarks.bench_next_run [--repeat N]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from cron_parser import CompiledCronExpression
+
+EXPRESSIONS = [
+    "*/5 * * * * /cmd",
+    "0 9 * * 1-5 /cmd",
+    "30 4 1 * * /cmd",
+    "0 0 1 1 * /cmd",
+    "0 0 29 2 * /cmd",
+]
+
+START = datetime(2025, 3, 1, 12, 0)
+
+
+# Reference implementation: walk forward one minute at a time
+def brute_force_next_run(compiled: CompiledCronExpression, after: datetime) -> datetime:
+    candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while not compiled.matches(candidate):
+        candidate += timedelta(minutes=1)
+    return candidate
+
+
+def _time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    print(f"{'expression':<22} {'next run':<18} {'next_run':>12} {'brute force':>12} {'speedup':>9}")
+    for expression in EXPRESSIONS:
+        compiled = CompiledCronExpression(expression)
+        run = compiled.next_run(START)
+        assert run == brute_force_next_run(compiled, START)
+        fast = _time(lambda: compiled.next_run(START), args.repeat)
+        slow = _time(lambda: brute_force_next_run(compiled, START), args.repeat)
+        fields = " ".join(expression.split()[:5])
+        print(f"{fields:<22} {run:%Y-%m-%d %H:%M} {fast * 1e6:>10.1f}us {slow * 1e6:>10.0f}us {slow / fast:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
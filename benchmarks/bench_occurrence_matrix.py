@@ -0,0 +1,45 @@
+"""Time occurrence_matrix with NumPy, without NumPy, and as a per-expression matches() loop.
+
+Usage: python -m benchmarks.bench_occurrence_matrix [--schedules N] [--days D]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_analysis import np, occurrence_counts, occurrence_matrix, window_minutes
+from cron_parser import CompiledCronExpression
+
+START = datetime(2025, 3, 3)
+
+
+def _timed(label: str, func) -> None:
+    started = time.perf_counter()
+    func()
+    print(f"{label:<28} {time.perf_counter() - started:>8.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schedules", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--skip-loop", action="store_true", help="skip the slow matches() baseline")
+    args = parser.parse_args()
+
+    expressions = [CompiledCronExpression(expression) for expression in synthetic_expressions(args.schedules)]
+    end = START + timedelta(days=args.days)
+    print(f"{args.schedules} schedules x {args.days * 1440} minutes")
+    if np is not None:
+        _timed("numpy matrix", lambda: occurrence_matrix(expressions, START, end, use_numpy=True))
+        _timed("numpy counts", lambda: occurrence_counts(expressions, START, end, use_numpy=True))
+    else:
+        print("numpy not installed; skipping the vectorized path")
+    _timed("pure-Python matrix", lambda: occurrence_matrix(expressions, START, end, use_numpy=False))
+    _timed("pure-Python counts", lambda: occurrence_counts(expressions, START, end, use_numpy=False))
+    if not args.skip_loop:
+        minutes = window_minutes(START, end)
+        _timed("matches() loop", lambda: [[expression.matches(minute) for minute in minutes] for expression in expressions])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Measure ExpressionRegistry throughput and single-flight behaviour under many threads.
+
+Every thread looks up the same shuffled list of expressions, starting together
+from a barrier. Each thread count is measured twice for the registry:
+
+* "cold" starts from an empty registry, so it times the first expansion of every
+  distinct expression plus the lookups; "computed" must equal the number of
+  distinct expressions, as concurrent misses on one text wait for a single
+  expansion ("waited").
+* "warm" repeats the run on the now-filled registry, timing steady-state lookups only.
+
+"expand" builds an ExpandedCronExpression and reads every field on each lookup
+instead, with a warm field cache. On a free-threaded CPython build the threads
+run in parallel; the GIL status is printed first.
+
+Usage: python -m benchmarks.bench_registry [--distinct N] [--lookups N] [--threads 1 2 4 8]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_parser import FIELD_KINDS, ExpandedCronExpression
+from cron_registry import ExpressionRegistry
+
+
+def _expand(line: str) -> ExpandedCronExpression:
+    expression = ExpandedCronExpression(line)
+    for kind in FIELD_KINDS:
+        getattr(expression, f"expanded_{kind}")
+    return expression
+
+
+def _run_threads(threads: int, lookup, lines) -> float:
+    """Return the seconds for every thread to look up all lines, started together."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed: int) -> None:
+        order = lines[:]
+        random.Random(seed).shuffle(order)
+        barrier.wait()
+        for line in order:
+            lookup(line)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--distinct", type=int, default=2000, help="distinct expressions")
+    parser.add_argument("--lookups", type=int, default=50000, help="lookups per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    distinct = list(synthetic_expressions(args.distinct))
+    lines = (distinct * (args.lookups // len(distinct) + 1))[:args.lookups]
+    print(f"  {'threads':>7} {'approach':<14} {'seconds':>8} {'lookups/s':>12} {'computed':>9} {'waited':>7}")
+    for threads in args.threads:
+        lookups = threads * len(lines)
+        _run_threads(1, _expand, distinct)  # fill the field cache so "expand" is steady-state too
+        elapsed = _run_threads(threads, _expand, lines)
+        print(f"  {threads:>7} {'expand':<14} {elapsed:>8.3f} {lookups / elapsed:>12,.0f}")
+        registry = ExpressionRegistry()
+        elapsed = _run_threads(threads, registry.resolve, lines)
+        stats = registry.stats()
+        assert stats["computed"] == len(set(distinct)), stats
+        print(f"  {threads:>7} {'registry cold':<14} {elapsed:>8.3f} {lookups / elapsed:>12,.0f} {stats['computed']:>9} {stats['waited']:>7}")
+        elapsed = _run_threads(threads, registry.resolve, lines)
+        assert registry.stats()["computed"] == stats["computed"], registry.stats()
+        print(f"  {threads:>7} {'registry warm':<14} {elapsed:>8.3f} {lookups / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare ScheduleIndex.due against checking every compiled expression in turn.
+
+Usage: python -m benchmarks.bench_schedule_index [--sizes 1000 10000 100000] [--ticks N]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_index import ScheduleIndex
+from cron_parser import CompiledCronExpression
+
+START = datetime(2025, 3, 3, 8, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ticks", type=int, default=120, help="consecutive minutes to query")
+    args = parser.parse_args()
+
+    ticks = [START + timedelta(minutes=minute) for minute in range(args.ticks)]
+    print(f"{'schedules':>10} {'build':>10} {'due/tick':>12} {'scan/tick':>12} {'speedup':>8}")
+    for size in args.sizes:
+        compiled = [CompiledCronExpression(expression) for expression in synthetic_expressions(size)]
+
+        started = time.perf_counter()
+        index = ScheduleIndex(enumerate(compiled))
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        indexed = [index.due(tick) for tick in ticks]
+        due_time = (time.perf_counter() - started) / len(ticks)
+
+        started = time.perf_counter()
+        scanned = [{job_id for job_id, expression in enumerate(compiled) if expression.matches(tick)} for tick in ticks]
+        scan_time = (time.perf_counter() - started) / len(ticks)
+
+        assert indexed == scanned
+        print(f"{size:>10} {build:>9.2f}s {due_time * 1e3:>10.3f}ms {scan_time * 1e3:>10.3f}ms {scan_time / due_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
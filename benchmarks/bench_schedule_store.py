@@ -0,0 +1,76 @@
+"""Compare the memory and due() time of ScheduleStore against one object per schedule.
+
+Memory is the tracemalloc peak while building each representation from the same
+expression text, divided by the number of schedules. Expanded expressions have
+every field read, as a matching pass would.
+
+Usage: python -m benchmarks.bench_schedule_store [--sizes 10000 100000] [--ticks N]
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_index import ScheduleIndex, ScheduleStore, np
+from cron_parser import FIELD_KINDS, CompiledCronExpression, ExpandedCronExpression
+
+START = datetime(2025, 3, 3, 8, 0)
+
+
+def _expanded(lines):
+    expressions = [ExpandedCronExpression(line) for line in lines]
+    for expression in expressions:
+        for kind in FIELD_KINDS:
+            getattr(expression, f"expanded_{kind}")
+    return expressions
+
+
+def _measure(build, lines):
+    """Return (bytes per schedule, seconds, result) for building one representation."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(lines)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / len(lines), elapsed, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--ticks", type=int, default=60, help="consecutive minutes to query")
+    args = parser.parse_args()
+
+    ticks = [START + timedelta(minutes=minute) for minute in range(args.ticks)]
+    builders = [
+        ("expanded", _expanded),
+        ("compiled", lambda lines: [CompiledCronExpression(line) for line in lines]),
+        ("store", ScheduleStore),
+    ]
+    for size in args.sizes:
+        lines = list(synthetic_expressions(size))
+        print(f"{size} schedules")
+        print(f"  {'representation':<16} {'bytes/schedule':>15} {'build':>9}")
+        built = {}
+        for name, build in builders:
+            per_schedule, elapsed, built[name] = _measure(build, lines)
+            print(f"  {name:<16} {per_schedule:>15.0f} {elapsed:>8.2f}s")
+
+        store = built["store"]
+        index = ScheduleIndex(enumerate(built["compiled"]))
+        timings = [("index.due", lambda tick: sorted(index.due(tick))), ("store.due (python)", lambda tick: store.due(tick, use_numpy=False))]
+        if np is not None:
+            timings.append(("store.due (numpy)", lambda tick: store.due(tick, use_numpy=True)))
+        print(f"  {'query':<20} {'per tick':>10}")
+        results = []
+        for name, query in timings:
+            started = time.perf_counter()
+            results.append([query(tick) for tick in ticks])
+            print(f"  {name:<20} {(time.perf_counter() - started) / len(ticks) * 1e3:>8.3f}ms")
+        assert all(result == results[0] for result in results)
+
+
+if __name__ == "__main__":
+    main()
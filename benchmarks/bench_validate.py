@@ -0,0 +1,59 @@
+"""Compare validate_expression against full expansion for linting a crontab.
+
+"expand" builds an ExpandedCronExpression and reads every field with the field
+cache disabled (each line's fields are new to a linter); "expand (cached)" uses a
+warm cache. One line in ``--invalid-every`` is made invalid.
+
+Usage: python -m benchmarks.bench_validate [--size N] [--repeat N] [--invalid-every N]
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_expressions
+from cron_parser import FIELD_CACHE_SIZE, FIELD_KINDS, ExpandedCronExpression, set_field_cache_size, validate_expression
+
+
+def _expand_valid(line: str) -> bool:
+    expression = ExpandedCronExpression(line)
+    try:
+        for kind in FIELD_KINDS:
+            getattr(expression, f"expanded_{kind}")
+    except ValueError:
+        return False
+    return True
+
+
+def _best_of(repeat: int, function, lines) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for line in lines:
+            function(line)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--invalid-every", type=int, default=10)
+    args = parser.parse_args()
+
+    lines = synthetic_expressions(args.size)
+    lines = [line.replace(" ", " 61,", 1) if index % args.invalid_every == 0 else line for index, line in enumerate(lines)]
+    assert [not validate_expression(line) for line in lines] == [_expand_valid(line) for line in lines]
+
+    set_field_cache_size(0)
+    expand = _best_of(args.repeat, _expand_valid, lines)
+    set_field_cache_size(FIELD_CACHE_SIZE)
+    expand_cached = _best_of(args.repeat, _expand_valid, lines)
+    validate = _best_of(args.repeat, validate_expression, lines)
+
+    print(f"{args.size} lines, 1 in {args.invalid_every} invalid")
+    for name, elapsed in (("expand", expand), ("expand (cached)", expand_cached), ("validate", validate)):
+        print(f"  {name:<16} {elapsed * 1e6 / args.size:>8.2f}us/line {expand / elapsed:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
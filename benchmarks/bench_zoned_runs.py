@@ -0,0 +1,65 @@
+"""Time zone-aware run iteration across DST boundaries against stepping every minute through the zone.
+
+Usage: python -m benchmarks.bench_zoned_runs [--zone NAME] [--days D]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from cron_parser import CompiledCronExpression
+from cron_zone import ZoneInfo, ZonedCronExpression, clear_zone_cache
+
+EXPRESSIONS = [
+    "*/5 * * * * /cmd",
+    "30 2 * * * /cmd",
+    "0 1 * * 0 /cmd",
+]
+
+
+# Reference implementation: convert every UTC minute to local time and test it
+def minute_stepping_runs(expression: str, zone, start: datetime, end: datetime) -> int:
+    compiled = CompiledCronExpression(expression)
+    instant = start.astimezone(timezone.utc)
+    stop = end.astimezone(timezone.utc)
+    count = 0
+    while instant < stop:
+        if compiled.matches(instant.astimezone(zone)):
+            count += 1
+        instant += timedelta(minutes=1)
+    return count
+
+
+def _timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<44} {time.perf_counter() - started:>8.3f}s  ({result} runs)")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--zone", default="America/New_York")
+    parser.add_argument("--days", type=int, default=365, help="length of the long window")
+    parser.add_argument("--skip-stepping", action="store_true", help="skip the slow minute-stepping baseline")
+    args = parser.parse_args()
+    if ZoneInfo is None:
+        raise SystemExit("zoneinfo is not available")
+
+    zone = ZoneInfo(args.zone)
+    # A two-day window around the spring-forward and fall-back transitions, and a long window
+    windows = [
+        ("spring forward", datetime(2025, 3, 8, tzinfo=zone), datetime(2025, 3, 10, tzinfo=zone)),
+        ("fall back", datetime(2025, 11, 1, tzinfo=zone), datetime(2025, 11, 3, tzinfo=zone)),
+        (f"{args.days} days", datetime(2025, 1, 1, tzinfo=zone), datetime(2025, 1, 1, tzinfo=zone) + timedelta(days=args.days)),
+    ]
+    for expression in EXPRESSIONS:
+        print(expression)
+        clear_zone_cache()
+        for label, start, end in windows:
+            _timed(f"  iter_runs, {label}", lambda: sum(1 for _ in ZonedCronExpression(expression, zone).iter_runs(start, end)))
+            if not args.skip_stepping:
+                _timed(f"  minute stepping, {label}", lambda: minute_stepping_runs(expression, zone, start, end))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Benchmark suite for the parse, expand, match and render hot paths.
+
+Usage:
+    python -m benchmarks [--size N] [--repeat R] [--only NAME ...]
+                         [--output results.json] [--baseline baseline.json --max-slowdown 10]
+
+Each case runs over a synthetic crontab of ``--size`` entries and reports the best
+of ``--repeat`` runs. Results are printed as a table and, with ``--output``, saved
+as JSON. With ``--baseline`` every case is compared to a saved run and the process
+exits with status 1 when any case is more than ``--max-slowdown`` percent slower.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import synthetic_crontab_lines, synthetic_expressions
+from cron_parser import (
+    FIELD_KINDS,
+    FIELD_SPECS,
+    CompiledCronExpression,
+    ExpandedCronExpression,
+    TableOutput,
+    clear_field_cache,
+    expand_expression,
+    expand_field,
+    parse_crontab,
+)
+
+MOMENT = datetime(2025, 3, 3, 9, 0)
+
+
+## CASES
+# Each case takes the synthetic expressions and returns (callable to time, operations per call)
+def _fields(expressions: List[str]):
+    return [(kind, field) for expression in expressions for kind, field in zip(FIELD_KINDS, expression.split()[:5])]
+
+
+def case_expand_expression(expressions: List[str]):
+    specs = [(FIELD_SPECS[kind], field) for kind, field in _fields(expressions)]
+    return lambda: [expand_expression(spec.component, field, spec.options, spec.min_val, spec.max_val, spec.syntax) for spec, field in specs], len(specs)
+
+
+def case_expand_field_cached(expressions: List[str]):
+    fields = _fields(expressions)
+    return lambda: [expand_field(kind, field) for kind, field in fields], len(fields)
+
+
+def _construct_and_expand(expressions: List[str]):
+    """Build each ExpandedCronExpression and read all five fields, since expansion is lazy."""
+    built = []
+    for expression in expressions:
+        expanded = ExpandedCronExpression(expression)
+        for kind in FIELD_KINDS:
+            expanded.expanded_field(kind)
+        built.append(expanded)
+    return built
+
+
+def case_expanded_construction(expressions: List[str]):
+    return lambda: _construct_and_expand(expressions), len(expressions)
+
+
+def case_expanded_construction_cold(expressions: List[str]):
+    def run():
+        clear_field_cache()
+        return _construct_and_expand(expressions)
+    return run, len(expressions)
+
+
+def case_compiled_construction(expressions: List[str]):
+    return lambda: [CompiledCronExpression(expression) for expression in expressions], len(expressions)
+
+
+def case_parse_crontab(expressions: List[str]):
+    lines = synthetic_crontab_lines(len(expressions))
+    return lambda: list(parse_crontab(lines)), len(expressions)
+
+
+def case_matches(expressions: List[str]):
+    compiled = [CompiledCronExpression(expression) for expression in expressions]
+    return lambda: [expression.matches(MOMENT) for expression in compiled], len(compiled)
+
+
+def case_next_run(expressions: List[str]):
+    compiled = [CompiledCronExpression(expression) for expression in expressions]
+    return lambda: [expression.next_run(MOMENT) for expression in compiled], len(compiled)
+
+
+def case_count_runs_quarter(expressions: List[str]):
+    compiled = [CompiledCronExpression(expression) for expression in expressions]
+    end = MOMENT + timedelta(days=91)
+    return lambda: [expression.count_runs(MOMENT, end) for expression in compiled], len(compiled)
+
+
+def case_render(expressions: List[str]):
+    tables = [ExpandedCronExpression(expression).to_table_format() for expression in expressions]
+    return lambda: [TableOutput(table).render() for table in tables], len(tables)
+
+
+CASES: Dict[str, Callable] = {
+    "expand_expression": case_expand_expression,
+    "expand_field_cached": case_expand_field_cached,
+    "expanded_construction": case_expanded_construction,
+    "expanded_construction_cold": case_expanded_construction_cold,
+    "compiled_construction": case_compiled_construction,
+    "parse_crontab": case_parse_crontab,
+    "matches": case_matches,
+    "next_run": case_next_run,
+    "count_runs_quarter": case_count_runs_quarter,
+    "render": case_render,
+}
+
+
+## RUNNER
+def run_case(setup: Callable, expressions: List[str], repeat: int) -> Dict[str, float]:
+    func, operations = setup(expressions)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "best_s": best,
+        "mean_s": sum(timings) / len(timings),
+        "operations": operations,
+        "per_op_us": best / operations * 1e6,
+    }
+
+
+def run_suite(size: int, repeat: int, only: Optional[List[str]] = None) -> Dict:
+    expressions = synthetic_expressions(size)
+    names = only or list(CASES)
+    unknown = sorted(set(names) - set(CASES))
+    if unknown:
+        raise SystemExit(f"Unknown benchmark(s): {', '.join(unknown)}")
+    return {
+        "meta": {
+            "size": size,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": {name: run_case(CASES[name], expressions, repeat) for name in names},
+    }
+
+
+def compare(results: Dict, baseline: Dict, max_slowdown: float) -> List[str]:
+    """Return a description of every case more than max_slowdown percent slower per operation than the baseline."""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = (current["per_op_us"] / previous["per_op_us"] - 1) * 100
+        if change > max_slowdown:
+            regressions.append(f"{name}: {previous['per_op_us']:.2f}us -> {current['per_op_us']:.2f}us per op (+{change:.1f}%)")
+    return regressions
+
+
+def _print_table(results: Dict, baseline: Optional[Dict]) -> None:
+    print(f"{'case':<28} {'per op':>12} {'best':>10}" + (f" {'vs baseline':>12}" if baseline else ""))
+    for name, result in results["results"].items():
+        line = f"{name:<28} {result['per_op_us']:>10.2f}us {result['best_s']:>9.3f}s"
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            line += f" {(result['per_op_us'] / previous['per_op_us'] - 1) * 100:>+11.1f}%"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000, help="number of synthetic crontab entries")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best is reported")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--output", help="write the results as JSON to this path ('-' for stdout)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=10.0, help="allowed slowdown per case, in percent")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.size, args.repeat, args.only)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+
+    if args.output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        _print_table(results, baseline)
+        if args.output:
+            with open(args.output, "w") as handle:
+                json.dump(results, handle, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.max_slowdown)
+        if regressions:
+            print(f"\nRegressions over {args.max_slowdown:g}%:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+    return 0
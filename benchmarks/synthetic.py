@@ -0,0 +1,53 @@
+"""Deterministic synthetic crontabs shared by the benchmarks."""
+import random
+from typing import List
+
+_MINUTE_FIELDS = ["0", "*/5", "*/15", "30", "0,30", "5-10", "{n}", "{n}"]
+_HOUR_FIELDS = ["*", "*", "0", "9-17", "*/2", "{n}"]
+_DOM_FIELDS = ["*", "*", "*", "1", "1,15", "{n}"]
+_MONTH_FIELDS = ["*", "*", "*", "*/3", "1-6"]
+_DOW_FIELDS = ["*", "*", "*", "1-5", "0,6"]
+
+
+def _pick(rng: random.Random, choices: List[str], low: int, high: int) -> str:
+    return rng.choice(choices).format(n=rng.randint(low, high))
+
+
+# Return `count` cron expressions with a realistic mix of repeated and unique fields
+def synthetic_expressions(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join((
+            _pick(rng, _MINUTE_FIELDS, 0, 59),
+            _pick(rng, _HOUR_FIELDS, 0, 23),
+            _pick(rng, _DOM_FIELDS, 1, 28),
+            _pick(rng, _MONTH_FIELDS, 1, 12),
+            _pick(rng, _DOW_FIELDS, 0, 6),
+            f"/usr/local/bin/job{index}",
+        ))
+        for index in range(count)
+    ]
+
+
+# Return a synthetic crontab as text lines, with comments and blank lines mixed in
+def synthetic_crontab_lines(count: int, seed: int = 0) -> List[str]:
+    lines = []
+    for index, expression in enumerate(synthetic_expressions(count, seed)):
+        if index % 50 == 0:
+            lines.append(f"# section {index // 50}\n")
+            lines.append("\n")
+        lines.append(expression + "\n")
+    return lines
+
+
+# Return `count` cron expressions whose day fields are almost all different, the worst case for grouping by day fields
+def diverse_expressions(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    expressions = []
+    for index in range(count):
+        first, second = sorted(rng.sample(range(1, 32), 2))
+        low = rng.randint(0, 6)
+        dow = rng.choice(["*", f"{low}-{rng.randint(low, 6)}"])
+        month = rng.choice(["*", "*/2", "1-6"])
+        expressions.append(f"{rng.randint(0, 59)} {rng.randint(0, 23)} {first},{second} {month} {dow} /usr/local/bin/job{index}")
+    return expressions
@@ -0,0 +1,455 @@
+import argparse
+import calendar
+import heapq
+import math
+import sys
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from cron_parser import BaseCronExpression, CompiledCronExpression, _mask_to_values, compile_expression, parse_crontab
+
+# NumPy is optional: without it every function falls back to a pure-Python path with the same results
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+## HELPER FUNCTIONS
+# Helper function to normalise the window to whole minutes and count them
+def _window(start: datetime, end: datetime) -> Tuple[datetime, int]:
+    start = start.replace(second=0, microsecond=0)
+    minutes = max(0, -(-(end - start) // timedelta(minutes=1)))  # minutes in [start, end), rounding up
+    return start, minutes
+
+
+# Helper function to decide which implementation to run
+def _numpy_enabled(use_numpy: Optional[bool]) -> bool:
+    if use_numpy and np is None:
+        raise ImportError("use_numpy=True requires NumPy to be installed")
+    return np is not None if use_numpy is None else use_numpy
+
+
+# Helper function returning 1440 bytes, one per minute of the day, set where hour and minute both match
+def _time_of_day_pattern(compiled: CompiledCronExpression) -> bytes:
+    minutes = bytes(compiled.minute_mask >> minute & 1 for minute in range(60))
+    idle = bytes(60)
+    return b"".join(minutes if compiled.hour_mask >> hour & 1 else idle for hour in range(24))
+
+
+# Helper function building one pure-Python occurrence row, a day at a time
+def _occurrence_row(compiled: CompiledCronExpression, start: datetime, minutes: int) -> bytearray:
+    pattern = _time_of_day_pattern(compiled)
+    row = bytearray()
+    day = start.date()
+    offset = start.hour * 60 + start.minute
+    while len(row) < minutes:
+        chunk = min(1440 - offset, minutes - len(row))
+        if compiled.runs_on(day):
+            row += pattern[offset:offset + chunk]
+        else:
+            row += bytes(chunk)
+        offset = 0
+        day += timedelta(days=1)
+    return row
+
+
+# Helper function to expand per-expression bitsets into an N x width boolean lookup table
+def _lookup_table(masks: Sequence[int], width: int):
+    bits = np.arange(width, dtype=np.uint64)
+    return ((np.array(masks, dtype=np.uint64)[:, None] >> bits) & np.uint64(1)).astype(bool)
+
+
+# Helper function computing the occurrence matrix with NumPy as (matching days) x (matching times of day)
+def _numpy_matrix(compiled: List[CompiledCronExpression], start: datetime, minutes: int):
+    offset = start.hour * 60 + start.minute
+    day_count = -(-(offset + minutes) // 1440)
+    days = np.datetime64(start.date(), 'D') + np.arange(day_count)
+    months = days.astype('datetime64[M]')
+    month = months.astype(np.int64) % 12 + 1
+    dom = (days - months.astype('datetime64[D]')).astype(np.int64) + 1
+    dow = (days.astype(np.int64) + 4) % 7  # 1970-01-01 was a Thursday; cron counts Sunday as 0
+
+    dom_match = _lookup_table([c.dom_mask for c in compiled], 32)[:, dom]
+    dow_match = _lookup_table([c.dow_mask for c in compiled], 7)[:, dow]
+    day_or = np.array([c.day_or for c in compiled], dtype=bool)[:, None]
+    day_match = np.where(day_or, dom_match | dow_match, dom_match & dow_match)
+    dated = [row for row, expression in enumerate(compiled) if expression.date_dependent]
+    if dated:  # "L", "wL" and "w#n" days come from the per-month tables instead
+        dates = [start.date() + timedelta(days=index) for index in range(day_count)]
+        for row in dated:
+            day_match[row] = [compiled[row]._days_mask(day.year, day.month) >> day.day & 1 for day in dates]
+    day_match &= _lookup_table([c.month_mask for c in compiled], 13)[:, month]
+
+    hours = _lookup_table([c.hour_mask for c in compiled], 24)
+    minutes_of_hour = _lookup_table([c.minute_mask for c in compiled], 60)
+    time_of_day = (hours[:, :, None] & minutes_of_hour[:, None, :]).reshape(len(compiled), 1440)
+
+    matrix = (day_match[:, :, None] & time_of_day[:, None, :]).reshape(len(compiled), day_count * 1440)
+    return matrix[:, offset:offset + minutes]
+
+
+# Helper function collapsing equivalent schedules, so each distinct schedule is evaluated once
+def _distinct_schedules(compiled: List[CompiledCronExpression]) -> Tuple[List[CompiledCronExpression], List[int]]:
+    """Return the distinct schedules and, for each input expression, the index of its schedule."""
+    positions = {}
+    distinct = []
+    indexes = []
+    for expression in compiled:
+        key = expression.schedule_key
+        if key not in positions:
+            positions[key] = len(distinct)
+            distinct.append(expression)
+        indexes.append(positions[key])
+    return distinct, indexes
+
+
+# Helper function computing one row per distinct schedule with the selected implementation
+def _distinct_matrix(distinct: List[CompiledCronExpression], start: datetime, minutes: int, numpy_enabled: bool):
+    if numpy_enabled:
+        if not distinct:
+            return np.zeros((0, minutes), dtype=bool)
+        return _numpy_matrix(distinct, start, minutes)
+    return [_occurrence_row(expression, start, minutes) for expression in distinct]
+
+
+# Helper function packing a 0/1 row into bits, most significant bit first like numpy.packbits
+def _pack_row(row: bytearray) -> bytearray:
+    packed = bytearray((len(row) + 7) // 8)
+    for index in range(0, len(row), 8):
+        byte = 0
+        for bit, value in enumerate(row[index:index + 8]):
+            byte |= value << (7 - bit)
+        packed[index // 8] = byte
+    return packed
+
+
+## PUBLIC FUNCTIONS
+# Public function listing the minutes covered by a window, matching the matrix columns
+def window_minutes(start: datetime, end: datetime) -> List[datetime]:
+    """Return every whole minute in [start, end), i.e. the column labels of occurrence_matrix."""
+    start, minutes = _window(start, end)
+    return [start + timedelta(minutes=minute) for minute in range(minutes)]
+
+
+# Public function computing whether each expression fires at each minute of a window
+def occurrence_matrix(expressions: Iterable[Union[str, BaseCronExpression]], start: datetime, end: datetime, use_numpy: Optional[bool] = None, packed: bool = False):
+    """Return an N x T matrix: row i, column t is set when expression i fires at minute t of [start, end).
+
+    With NumPy this is a boolean ndarray (or, with ``packed=True``, the rows packed with
+    ``numpy.packbits`` along the time axis). Without NumPy, or with ``use_numpy=False``,
+    it is a list of bytearrays holding 0/1 per minute (packed into bytes, most
+    significant bit first, when ``packed=True``), so both paths index the same way.
+    """
+    compiled = [compile_expression(expression) for expression in expressions]
+    start, minutes = _window(start, end)
+    distinct, indexes = _distinct_schedules(compiled)
+    if _numpy_enabled(use_numpy):
+        matrix = _distinct_matrix(distinct, start, minutes, True)[np.array(indexes, dtype=np.intp)]
+        return np.packbits(matrix, axis=1) if packed else matrix
+    rows = _distinct_matrix(distinct, start, minutes, False)
+    if packed:
+        rows = [_pack_row(row) for row in rows]
+    return [bytearray(rows[index]) for index in indexes]  # copies, so rows of equal schedules stay independent
+
+
+# Public function counting how many expressions fire at each minute of a window
+def occurrence_counts(expressions: Iterable[Union[str, BaseCronExpression]], start: datetime, end: datetime, use_numpy: Optional[bool] = None):
+    """Return the number of expressions firing at each minute of [start, end) (ndarray or list).
+
+    Equivalent schedules are evaluated once and weighted by how many expressions share them.
+    """
+    compiled = [compile_expression(expression) for expression in expressions]
+    start, minutes = _window(start, end)
+    distinct, indexes = _distinct_schedules(compiled)
+    weights = [0] * len(distinct)
+    for index in indexes:
+        weights[index] += 1
+    if _numpy_enabled(use_numpy):
+        matrix = _distinct_matrix(distinct, start, minutes, True)
+        return np.array(weights, dtype=np.int64) @ matrix.astype(np.int64)
+    counts = [0] * minutes
+    for weight, row in zip(weights, _distinct_matrix(distinct, start, minutes, False)):
+        for minute, fires in enumerate(row):
+            if fires:
+                counts[minute] += weight
+    return counts
+
+
+## LOAD HISTOGRAM
+# One of the busiest minutes of a histogram: when, how many jobs fire, and their positions in the input
+Peak = namedtuple('Peak', ['when', 'count', 'jobs'])
+
+
+# Day-pattern columns multiplied at a time by the NumPy histogram (1440 float64 minutes each, so 11 MiB per block)
+_HISTOGRAM_BLOCK = 1024
+
+
+# Helper function adding a schedule's weight to every minute of the day on which it fires, in a sparse {minute of day: jobs} pattern
+def _add_time_of_day(pattern: Dict[int, int], compiled: CompiledCronExpression, weight: int) -> None:
+    minutes = _mask_to_values(compiled.minute_mask)
+    for hour in _mask_to_values(compiled.hour_mask):
+        base = hour * 60
+        for minute in minutes:
+            pattern[base + minute] = pattern.get(base + minute, 0) + weight
+
+
+# Helper function returning a bitset of the days of the window (bit i for first_day + i days) on which a day pattern (dom, dow, month) is active
+def _active_days(compiled: CompiledCronExpression, first_day: datetime, day_count: int) -> int:
+    active = 0
+    index, year, month, day = 0, first_day.year, first_day.month, first_day.day
+    while index < day_count:
+        if compiled.month_mask >> month & 1:
+            active |= compiled._days_mask(year, month) >> day << index
+        index += calendar.monthrange(year, month)[1] - day + 1
+        year, month, day = (year + 1, 1, 1) if month == 12 else (year, month + 1, 1)
+    return active & ((1 << day_count) - 1)
+
+
+# Helper function summing day rows by applying only the patterns that start or stop between consecutive days
+def _delta_counts(patterns: Dict[int, Dict[int, int]], day_count: int) -> List[int]:
+    changes = [[] for _ in range(day_count)]
+    for active, pattern in patterns.items():
+        items = tuple(pattern.items())
+        for day in _mask_to_values((active ^ (active << 1)) & ((1 << day_count) - 1)):
+            changes[day].append((items, 1 if active >> day & 1 else -1))
+    row = [0] * 1440
+    counts: List[int] = []
+    for day_changes in changes:
+        for items, sign in day_changes:
+            for minute, jobs in items:
+                row[minute] += sign * jobs
+        counts.extend(row)
+    return counts
+
+
+# Helper function multiplying the days x day-patterns activity matrix by the day-patterns x 1440 minute matrix, a block of patterns at a time
+def _numpy_counts(patterns: Dict[int, Dict[int, int]], day_count: int) -> List[int]:
+    totals = np.zeros((day_count, 1440))
+    width = (day_count + 7) // 8
+    keys = list(patterns)
+    for block in range(0, len(keys), _HISTOGRAM_BLOCK):
+        block_keys = keys[block:block + _HISTOGRAM_BLOCK]
+        packed = np.frombuffer(b"".join(active.to_bytes(width, 'little') for active in block_keys), dtype=np.uint8)
+        activity = np.unpackbits(packed.reshape(len(block_keys), width), axis=1, bitorder='little')[:, :day_count]
+        minutes = np.zeros((len(block_keys), 1440))
+        for row, active in enumerate(block_keys):
+            pattern = patterns[active]
+            minutes[row, list(pattern)] = list(pattern.values())
+        totals += activity.T.astype(float) @ minutes  # float64 sums stay exact far beyond any job count
+    return np.rint(totals).astype(np.int64).ravel().tolist()
+
+
+# Class holding the number of jobs firing at each minute of a window, with peak and percentile queries
+class LoadHistogram:
+    """Per-minute firing counts for many expressions over [start, end).
+
+    Built from the field bitsets rather than by enumerating runs: every
+    schedule's time-of-day pattern is added to the pattern of all schedules
+    active on the same days of the window. With NumPy the days x patterns
+    activity matrix is multiplied by the patterns x minutes matrix; without it
+    each day's row is the previous one plus the patterns that start or stop that
+    day. The cost grows with distinct day patterns, not with runs.
+    """
+
+    def __init__(self, expressions: Iterable[Union[str, BaseCronExpression]], start: datetime, end: datetime, use_numpy: Optional[bool] = None):
+        self.expressions = list(expressions)
+        self.start, minutes = _window(start, end)
+        compiled = [compile_expression(expression) for expression in self.expressions]
+        distinct, indexes = _distinct_schedules(compiled)
+        self._schedules = distinct
+        self._jobs = [[] for _ in distinct]
+        for position, index in enumerate(indexes):
+            self._jobs[index].append(position)
+        self.counts = self._build_counts(minutes, _numpy_enabled(use_numpy))
+
+    def _build_counts(self, minutes: int, numpy_enabled: bool) -> List[int]:
+        """Return the flattened per-minute counts of the window."""
+        offset = self.start.hour * 60 + self.start.minute
+        day_count = -(-(offset + minutes) // 1440)
+        first_day = self.start.replace(hour=0, minute=0)
+
+        # Sum the time-of-day patterns of every schedule active on the same days, finding those days once per distinct day fields
+        active_days: Dict[Tuple[int, int, int], int] = {}
+        patterns: Dict[int, Dict[int, int]] = {}
+        for schedule, jobs in zip(self._schedules, self._jobs):
+            key = (schedule.dom_mask, schedule.dow_mask, schedule.month_mask)
+            if key not in active_days:
+                active_days[key] = _active_days(schedule, first_day, day_count)
+            if active_days[key]:
+                _add_time_of_day(patterns.setdefault(active_days[key], {}), schedule, len(jobs))
+
+        if not patterns:
+            counts = [0] * (day_count * 1440)
+        elif numpy_enabled:
+            counts = _numpy_counts(patterns, day_count)
+        else:
+            counts = _delta_counts(patterns, day_count)
+        return counts[offset:offset + minutes]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def minute(self, index: int) -> datetime:
+        """Return the datetime of counts[index]."""
+        return self.start + timedelta(minutes=index)
+
+    def count_at(self, when: datetime) -> int:
+        """Return how many jobs fire at the minute of ``when`` (0 outside the window)."""
+        index = (when.replace(second=0, microsecond=0) - self.start) // timedelta(minutes=1)
+        return self.counts[index] if 0 <= index < len(self.counts) else 0
+
+    def contributors(self, when: datetime) -> List[int]:
+        """Return the positions, in the input, of the expressions firing at the minute of ``when``."""
+        jobs = []
+        for schedule, positions in zip(self._schedules, self._jobs):
+            if schedule.matches(when):
+                jobs.extend(positions)
+        return sorted(jobs)
+
+    def peaks(self, top: int = 10) -> List[Peak]:
+        """Return the ``top`` busiest minutes, busiest first and earliest first on ties."""
+        busiest = heapq.nlargest(top, range(len(self.counts)), key=self.counts.__getitem__)
+        return [Peak(self.minute(index), self.counts[index], self.contributors(self.minute(index))) for index in busiest if self.counts[index]]
+
+    def percentiles(self, percents: Sequence[float] = (50, 90, 99, 100)) -> Dict[float, int]:
+        """Return the nearest-rank percentiles of the per-minute counts."""
+        if not self.counts:
+            return {percent: 0 for percent in percents}
+        ordered = sorted(self.counts)
+        return {percent: ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)] for percent in percents}
+
+
+# Public function building a load histogram for many expressions
+def load_histogram(expressions: Iterable[Union[str, BaseCronExpression]], start: datetime, end: datetime, use_numpy: Optional[bool] = None) -> LoadHistogram:
+    """Return a LoadHistogram of how many expressions fire at each minute of [start, end)."""
+    return LoadHistogram(expressions, start, end, use_numpy)
+
+
+## MERGED TIMELINE
+# One run of a merged timeline: when it fires and the id of the job; also usable as a checkpoint
+TimelineRun = namedtuple('TimelineRun', ['when', 'job'])
+
+
+# Public function yielding the runs of many jobs in chronological order
+def merged_timeline(jobs: Union[Mapping[Hashable, Union[str, BaseCronExpression]], Iterable[Union[str, BaseCronExpression]]], start: datetime, end: Optional[datetime] = None,
+                    checkpoint: Union[datetime, Tuple[datetime, Hashable], None] = None, only: Optional[Iterable[Hashable]] = None) -> Iterator[TimelineRun]:
+    """Lazily yield a TimelineRun for every run of every job in [start, end), in time order.
+
+    ``jobs`` maps job ids to expressions; for a plain iterable the ids are input positions.
+    Runs at the same minute come in input order. One lazy run iterator per distinct
+    schedule sits in a heap, so memory grows with the number of jobs, not of runs.
+
+    To resume, pass the last TimelineRun consumed as ``checkpoint``; a bare datetime
+    resumes after every run at that minute. ``only`` restricts the timeline to some job ids.
+    """
+    items = list(jobs.items()) if isinstance(jobs, Mapping) else list(enumerate(jobs))
+    if only is not None:
+        only = set(only)
+        items = [(job, expression) for job, expression in items if job in only]
+    job_ids = [job for job, _ in items]
+    distinct, indexes = _distinct_schedules([compile_expression(expression) for _, expression in items])
+    members: List[List[int]] = [[] for _ in distinct]
+    for position, index in enumerate(indexes):
+        members[index].append(position)
+
+    resume_at, resume_position = None, -1
+    if checkpoint is not None:
+        if isinstance(checkpoint, tuple):
+            resume_at, job = checkpoint
+            try:
+                resume_position = job_ids.index(job)
+            except ValueError:
+                raise ValueError(f"Checkpoint job {job!r} is not in the timeline") from None
+        else:
+            resume_at, resume_position = checkpoint, len(job_ids)
+        start = max(start, resume_at)
+
+    runs = [schedule.iter_runs(start, end) for schedule in distinct]
+    heap = []
+    for index, schedule_runs in enumerate(runs):
+        first = next(schedule_runs, None)
+        if first is not None:
+            heap.append((first, index))
+    heapq.heapify(heap)
+    while heap:
+        when = heap[0][0]
+        due = []
+        while heap and heap[0][0] == when:
+            _, index = heap[0]
+            due.append(members[index])
+            following = next(runs[index], None)
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (following, index))
+        for position in due[0] if len(due) == 1 else heapq.merge(*due):
+            if when == resume_at and position <= resume_position:
+                continue
+            yield TimelineRun(when, job_ids[position])
+
+
+## COMMAND-LINE INTERFACE
+# Named horizons accepted by --horizon, in days
+HORIZONS = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+
+# Helper function turning a --horizon value (a name or a number of days) into a timedelta
+def _parse_horizon(value: str) -> timedelta:
+    if value in HORIZONS:
+        return timedelta(days=HORIZONS[value])
+    try:
+        days = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(HORIZONS)} or a number of days, got {value!r}")
+    if days <= 0:
+        raise argparse.ArgumentTypeError("horizon must be positive")
+    return timedelta(days=days)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cron_parser.py histogram", description="Report the busiest minutes of a crontab.")
+    parser.add_argument('--input', default='-', help="crontab file ('-' for stdin)")
+    parser.add_argument('--start', type=datetime.fromisoformat, help="window start (default: today 00:00)")
+    parser.add_argument('--horizon', type=_parse_horizon, default=timedelta(days=1), help="day, week, month, year or a number of days")
+    parser.add_argument('--top', type=int, default=10, help="number of peak minutes to report")
+    parser.add_argument('--max-jobs', type=int, default=10, help="jobs listed per peak minute")
+    return parser
+
+
+# Helper function writing the text report for a histogram
+def write_report(histogram: LoadHistogram, lines: List[Tuple[int, str]], out, top: int = 10, max_jobs: int = 10) -> None:
+    end = histogram.start + timedelta(minutes=len(histogram))
+    out.write(f"Load histogram {histogram.start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}: {len(histogram)} minutes, {len(lines)} jobs\n")
+    percentiles = histogram.percentiles()
+    out.write("Jobs per minute: " + " ".join(f"p{percent:g}={value}" for percent, value in percentiles.items()) + "\n")
+    peaks = histogram.peaks(top)
+    if not peaks:
+        out.write("No job fires in this window\n")
+        return
+    out.write("Peak minutes:\n")
+    for peak in peaks:
+        out.write(f"  {peak.when:%Y-%m-%d %H:%M}  {peak.count} jobs\n")
+        for position in peak.jobs[:max_jobs]:
+            line_number, text = lines[position]
+            out.write(f"    line {line_number}: {text}\n")
+        if len(peak.jobs) > max_jobs:
+            out.write(f"    ... and {len(peak.jobs) - max_jobs} more\n")
+
+
+# Entry point for "cron_parser.py histogram"; returns the process exit status
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    start = args.start or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    source = sys.stdin if args.input == '-' else args.input
+    lines, expressions, failed = [], [], 0
+    for line_number, result in parse_crontab(source):
+        if isinstance(result, ValueError):
+            sys.stderr.write(f"Error: line {line_number}: {result}\n")
+            failed += 1
+            continue
+        lines.append((line_number, result.cron_expression))
+        expressions.append(result)
+    write_report(load_histogram(expressions, start, start + args.horizon), lines, sys.stdout, args.top, args.max_jobs)
+    return 1 if failed else 0
@@ -0,0 +1,165 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from cron_parser import BaseCronExpression, CompiledCronExpression, compile_expression, parse_crontab
+
+## FILE FORMAT
+# A compiled cache file is laid out as:
+#   header   magic, SHA-256 of the source crontab, record count
+#   records  one fixed-width record per schedule: the five field bitsets and the source line number
+#   offsets  record count + 1 little-endian uint64 offsets into the string table
+#   strings  UTF-8 expression text of every record, back to back
+MAGIC = b"CRONBIN2"
+_HEADER = struct.Struct("<8s32sQ")
+_RECORD = struct.Struct("<QIIHQI")  # minute, hour, dom, month, dow (with its "wL" / "w#n" bits), line number
+_OFFSET = struct.Struct("<Q")
+
+
+# Error raised when a cache file does not match the source it is checked against
+class StaleCacheError(ValueError):
+    pass
+
+
+## HELPER FUNCTIONS
+# Public function hashing crontab content so a cache can be tied to the exact text it was built from
+def source_digest(source: Union[bytes, str, "os.PathLike[str]"]) -> bytes:
+    """Return the SHA-256 digest of a crontab's bytes, given the bytes themselves or a path."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).digest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+## CLASSES
+# Read-only, memory-mapped view of a compiled cache file that decodes records on access
+class CompiledSchedules:
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not a compiled cron cache: {path}")
+        magic, self.source_hash, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a compiled cron cache: {path}")
+        self._offsets_start = _HEADER.size + self._count * _RECORD.size
+        self._strings_start = self._offsets_start + (self._count + 1) * _OFFSET.size
+        if self._strings_start > len(self._map) or self._strings_start + self._string_end() > len(self._map):
+            self.close()
+            raise ValueError(f"Truncated compiled cron cache: {path}")
+
+    def _string_end(self) -> int:
+        return _OFFSET.unpack_from(self._map, self._offsets_start + self._count * _OFFSET.size)[0]
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("compiled schedule index out of range")
+        return index
+
+    def _text(self, index: int) -> str:
+        start, end = struct.unpack_from("<QQ", self._map, self._offsets_start + index * _OFFSET.size)
+        return self._map[self._strings_start + start:self._strings_start + end].decode("utf-8")
+
+    def line_number(self, index: int) -> int:
+        """Return the crontab line number the record was compiled from (0 if unknown)."""
+        return _RECORD.unpack_from(self._map, _HEADER.size + self._index(index) * _RECORD.size)[5]
+
+    def __getitem__(self, index: int) -> CompiledCronExpression:
+        index = self._index(index)
+        minute, hour, dom, month, dow, _ = _RECORD.unpack_from(self._map, _HEADER.size + index * _RECORD.size)
+        return CompiledCronExpression.from_masks(self._text(index), minute, hour, dom, month, dow)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[CompiledCronExpression]:
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "CompiledSchedules":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+## PUBLIC FUNCTIONS
+# Public function writing compiled schedules to a cache file
+def save_compiled(path: Union[str, "os.PathLike[str]"], expressions: Iterable[Union[str, BaseCronExpression, Tuple[int, Union[str, BaseCronExpression]]]], source_hash: bytes = b"") -> int:
+    """Write expressions (or (line number, expression) pairs) to path and return how many were saved.
+
+    The file is written to a new temporary file in the same directory and renamed
+    into place, so readers never see a partially written cache.
+    """
+    records = bytearray()
+    offsets = bytearray(_OFFSET.pack(0))
+    strings = bytearray()
+    count = 0
+    for item in expressions:
+        line_number, expression = item if isinstance(item, tuple) else (0, item)
+        compiled = compile_expression(expression)
+        records += _RECORD.pack(compiled.minute_mask, compiled.hour_mask, compiled.dom_mask, compiled.month_mask, compiled.dow_mask, line_number)
+        strings += compiled.cron_expression.encode("utf-8")
+        offsets += _OFFSET.pack(len(strings))
+        count += 1
+    directory, name = os.path.split(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            handle.write(_HEADER.pack(MAGIC, source_hash.ljust(32, b"\0")[:32], count))
+            handle.write(records)
+            handle.write(offsets)
+            handle.write(strings)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return count
+
+
+# Public function opening a cache file, optionally checking it against the source it was built from
+def load_compiled(path: Union[str, "os.PathLike[str]"], source_hash: Optional[bytes] = None) -> CompiledSchedules:
+    """Memory-map a cache file; records are decoded only when accessed.
+
+    Raises StaleCacheError when source_hash is given and differs from the hash stored in the file.
+    """
+    schedules = CompiledSchedules(path)
+    if source_hash is not None and schedules.source_hash != source_hash.ljust(32, b"\0")[:32]:
+        schedules.close()
+        raise StaleCacheError(f"Compiled cache {path} was built from a different source")
+    return schedules
+
+
+# Public function loading a crontab through its cache, rebuilding the cache whenever the crontab changed
+def load_crontab_cached(crontab_path: Union[str, "os.PathLike[str]"], cache_path: Union[str, "os.PathLike[str]"], workers: int = 1) -> CompiledSchedules:
+    """Return the compiled schedules of a crontab, re-parsing it only if its content hash changed.
+
+    Lines that fail to parse are left out of the cache; use parse_crontab to report them.
+    """
+    with open(crontab_path, "rb") as handle:
+        source = handle.read()  # hash and parse the same bytes, even if the file changes meanwhile
+    digest = source_digest(source)
+    try:
+        return load_compiled(cache_path, digest)
+    except (OSError, ValueError):
+        pass
+    entries = (
+        (line_number, result)
+        for line_number, result in parse_crontab(source.decode("utf-8").splitlines(), workers=workers)
+        if not isinstance(result, ValueError)
+    )
+    save_compiled(cache_path, entries, digest)
+    return load_compiled(cache_path, digest)
@@ -0,0 +1,212 @@
+import itertools
+import os
+import threading
+from collections import deque, namedtuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from cron_parser import CompiledCronExpression, _crontab_entries, _read_crontab
+
+# A change found by Crontab.update: kind is 'added', 'removed' or 'changed'; previous is the replaced entry
+CrontabEvent = namedtuple('CrontabEvent', ['kind', 'entry', 'previous'])
+
+# Receives the events of one reload
+CrontabListener = Callable[[List[CrontabEvent]], None]
+
+
+## CLASSES
+# One crontab entry: a stable id, where it currently is, its text and its compiled expression (or parse error)
+class CrontabEntry:
+    __slots__ = ('id', 'line_number', 'text', 'expression')
+
+    def __init__(self, entry_id: int, line_number: int, text: str, expression: Union[CompiledCronExpression, ValueError]):
+        self.id = entry_id
+        self.line_number = line_number
+        self.text = text
+        self.expression = expression
+
+    @property
+    def ok(self) -> bool:
+        return not isinstance(self.expression, ValueError)
+
+    def __repr__(self) -> str:
+        return f"CrontabEntry(id={self.id}, line_number={self.line_number}, text={self.text!r})"
+
+
+# Class holding the compiled entries of a crontab and updating them incrementally from new content
+class Crontab:
+    """Compiled crontab entries that can be refreshed by diffing against new content.
+
+    Lines are keyed by their text (blank lines and comments are skipped as in
+    parse_crontab). ``update`` keeps the entries of unchanged lines, even if they
+    moved, and compiles only lines whose text is new. Each entry keeps its id while
+    it exists, and an edited line keeps the id of the line it replaced, so
+    listeners can update an index or scheduler job in place.
+    """
+
+    def __init__(self, lines: Optional[Iterable[str]] = None):
+        self._entries: List[CrontabEntry] = []
+        self._by_id: Dict[int, CrontabEntry] = {}
+        self._ids = itertools.count(1)
+        self.compiled_lines = 0  # lines compiled so far, i.e. the work reloads could not avoid
+        if lines is not None:
+            self.update(lines)
+
+    @classmethod
+    def from_file(cls, path: Union[str, "os.PathLike[str]"]) -> "Crontab":
+        crontab = cls()
+        crontab.load(path)
+        return crontab
+
+    def _compile(self, line_number: int, text: str, entry_id: Optional[int] = None) -> CrontabEntry:
+        self.compiled_lines += 1
+        try:
+            expression = CompiledCronExpression(text)
+        except ValueError as error:
+            expression = error
+        return CrontabEntry(next(self._ids) if entry_id is None else entry_id, line_number, text, expression)
+
+    def load(self, path: Union[str, "os.PathLike[str]"]) -> List[CrontabEvent]:
+        """Update from a crontab file and return the changes."""
+        return self._apply(list(_read_crontab(path)))
+
+    def update(self, lines: Iterable[str]) -> List[CrontabEvent]:
+        """Update from the new crontab lines and return the changes."""
+        return self._apply(list(_crontab_entries(lines)))
+
+    def _apply(self, new: List[Tuple[int, str]]) -> List[CrontabEvent]:
+        old = self._entries
+        # Unchanged leading and trailing lines: edits are usually local, so this skips most of the file
+        prefix = 0
+        limit = min(len(old), len(new))
+        while prefix < limit and old[prefix].text == new[prefix][1]:
+            old[prefix].line_number = new[prefix][0]
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix].text == new[-1 - suffix][1]:
+            old[-1 - suffix].line_number = new[-1 - suffix][0]
+            suffix += 1
+        old_middle = old[prefix:len(old) - suffix]
+        new_middle = new[prefix:len(new) - suffix]
+
+        # In the edited region, reuse entries whose text moved; what is left over was added, removed or changed
+        unused: Dict[str, deque] = {}
+        for entry in old_middle:
+            unused.setdefault(entry.text, deque()).append(entry)
+        middle: List[Optional[CrontabEntry]] = []
+        for line_number, text in new_middle:
+            pool = unused.get(text)
+            if pool:
+                entry = pool.popleft()
+                entry.line_number = line_number
+                middle.append(entry)
+            else:
+                middle.append(None)
+        leftover = {id(entry) for pool in unused.values() for entry in pool}
+        old_positions = {id(entry): position for position, entry in enumerate(old_middle)}
+
+        # An added line replaces ("changes") a removed line from the same gap between surviving entries
+        next_kept = [len(old_middle)] * (len(middle) + 1)
+        for index in range(len(middle) - 1, -1, -1):
+            entry = middle[index]
+            next_kept[index] = next_kept[index + 1] if entry is None else old_positions[id(entry)]
+        events = []
+        cursor = 0
+        for index, entry in enumerate(middle):
+            if entry is not None:
+                cursor = max(cursor, old_positions[id(entry)] + 1)
+                continue
+            while cursor < next_kept[index] and id(old_middle[cursor]) not in leftover:
+                cursor += 1
+            line_number, text = new_middle[index]
+            if cursor < next_kept[index]:
+                previous = old_middle[cursor]
+                leftover.discard(id(previous))
+                cursor += 1
+                middle[index] = self._compile(line_number, text, previous.id)
+                events.append(CrontabEvent('changed', middle[index], previous))
+            else:
+                middle[index] = self._compile(line_number, text)
+                events.append(CrontabEvent('added', middle[index], None))
+        events.extend(CrontabEvent('removed', entry, None) for entry in old_middle if id(entry) in leftover)
+
+        self._entries = old[:prefix] + middle + old[len(old) - suffix:]
+        for event in events:
+            if event.kind == 'removed':
+                del self._by_id[event.entry.id]
+            else:
+                self._by_id[event.entry.id] = event.entry
+        return events
+
+    def get(self, entry_id: int) -> Optional[CrontabEntry]:
+        return self._by_id.get(entry_id)
+
+    def errors(self) -> List[CrontabEntry]:
+        """Return the entries that failed to parse."""
+        return [entry for entry in self._entries if not entry.ok]
+
+    def __iter__(self) -> Iterator[CrontabEntry]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Class reloading a crontab file when it changes on disk and passing the changes to listeners
+class CrontabWatcher:
+    def __init__(self, path: Union[str, "os.PathLike[str]"], listeners: Iterable[CrontabListener] = ()):
+        self.path = path
+        self.crontab = Crontab()
+        self._listeners = list(listeners)
+        self._signature = None
+
+    def add_listener(self, listener: CrontabListener) -> None:
+        self._listeners.append(listener)
+
+    def check(self) -> List[CrontabEvent]:
+        """Reload the file if its size, mtime or inode changed; notify listeners and return the changes.
+
+        A missing file counts as empty, so every entry is reported as removed.
+        """
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return []
+        self._signature = signature
+        events = self.crontab.load(self.path) if signature is not None else self.crontab.update([])
+        if events:
+            for listener in self._listeners:
+                listener(events)
+        return events
+
+    def watch(self, interval: float = 1.0, stop: Optional[threading.Event] = None) -> None:
+        """Call check() every ``interval`` seconds until ``stop`` is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.check()
+            stop.wait(interval)
+
+
+## HELPER FUNCTIONS
+# Public function applying crontab changes to a ScheduleIndex (or anything with add/remove by id)
+def sync_index(index, events: Iterable[CrontabEvent]) -> None:
+    """Add, replace or remove the index entries of changed crontab lines; lines that fail to parse are left out."""
+    for event in events:
+        entry = event.entry
+        if event.kind != 'removed' and entry.ok:
+            index.add(entry.id, entry.expression)
+        elif entry.id in index:
+            index.remove(entry.id)
+
+
+# Public function applying crontab changes to a CronScheduler
+def sync_scheduler(scheduler, events: Iterable[CrontabEvent], action=None) -> None:
+    """Register, replace or cancel the scheduler jobs of changed crontab lines, keyed by entry id."""
+    for event in events:
+        entry = event.entry
+        if event.kind != 'removed' and entry.ok:
+            scheduler.add_job(entry.id, entry.expression, action)
+        elif scheduler.get_job(entry.id) is not None:
+            scheduler.cancel(entry.id)
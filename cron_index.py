@@ -0,0 +1,260 @@
+from array import array
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from cron_parser import (
+    FIELD_KINDS,
+    BaseCronExpression,
+    CompiledCronExpression,
+    _DOM_FULL,
+    _DOM_LAST,
+    _DOW_FULL,
+    _DOW_LAST_BASE,
+    _month_table,
+    canonical_schedule,
+    compile_expression,
+    expand_field,
+    parse_expression,
+)
+
+# NumPy is optional: ScheduleStore.due falls back to a pure-Python scan without it
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+## CLASSES
+# Class holding inverted indexes (field value -> job ids) to answer "which jobs fire at minute T"
+class ScheduleIndex:
+    def __init__(self, jobs: Optional[Union[Mapping[Hashable, Union[str, BaseCronExpression]], Iterable[Tuple[Hashable, Union[str, BaseCronExpression]]]]] = None):
+        self._jobs: Dict[Hashable, CompiledCronExpression] = {}
+        self._minute: List[Set[Hashable]] = [set() for _ in range(60)]
+        self._hour: List[Set[Hashable]] = [set() for _ in range(24)]
+        self._dom: List[Set[Hashable]] = [set() for _ in range(32)]
+        self._month: List[Set[Hashable]] = [set() for _ in range(13)]
+        self._dow: List[Set[Hashable]] = [set() for _ in range(7)]
+        self._day_or: Set[Hashable] = set()  # jobs whose day of month and day of week are both restricted
+        self._dated: Set[Hashable] = set()  # jobs using "L", "wL" or "w#n", whose days are checked with matches()
+        if jobs is not None:
+            items = jobs.items() if isinstance(jobs, Mapping) else jobs
+            for job_id, expression in items:
+                self.add(job_id, expression)
+
+    def _buckets(self, compiled: CompiledCronExpression):
+        """Yield every (index, value) bucket the compiled expression belongs to."""
+        fields = [
+            (self._minute, compiled.expanded_minute),
+            (self._hour, compiled.expanded_hour),
+            (self._month, compiled.expanded_month),
+        ]
+        if not compiled.date_dependent:
+            fields += [(self._dom, compiled.expanded_dom), (self._dow, compiled.expanded_dow)]
+        for index, values in fields:
+            for value in values:
+                yield index[value]
+
+    def add(self, job_id: Hashable, expression: Union[str, BaseCronExpression]) -> CompiledCronExpression:
+        """Index a job, replacing any existing job with the same id, and return its compiled expression."""
+        compiled = compile_expression(expression)
+        if job_id in self._jobs:
+            self.remove(job_id)
+        self._jobs[job_id] = compiled
+        for bucket in self._buckets(compiled):
+            bucket.add(job_id)
+        if compiled.date_dependent:
+            self._dated.add(job_id)
+        elif compiled.day_or:
+            self._day_or.add(job_id)
+        return compiled
+
+    def remove(self, job_id: Hashable) -> CompiledCronExpression:
+        """Remove a job from every index and return its compiled expression; raises KeyError if unknown."""
+        compiled = self._jobs.pop(job_id)
+        for bucket in self._buckets(compiled):
+            bucket.discard(job_id)
+        self._day_or.discard(job_id)
+        self._dated.discard(job_id)
+        return compiled
+
+    def due(self, when: datetime) -> Set[Hashable]:
+        """Return the ids of every job that fires at the minute of ``when``."""
+        minute, hour, month = self._minute[when.minute], self._hour[when.hour], self._month[when.month]
+        smallest, middle, largest = sorted((minute, hour, month), key=len)
+        candidates = smallest & middle
+        if not candidates:
+            return set()
+        candidates &= largest
+        dom, dow = self._dom[when.day], self._dow[(when.weekday() + 1) % 7]  # cron counts Sunday as 0
+        due = candidates & dom & dow
+        for job_id in candidates & self._day_or:
+            if job_id in dom or job_id in dow:
+                due.add(job_id)
+        for job_id in candidates & self._dated:
+            if self._jobs[job_id].matches(when):
+                due.add(job_id)
+        return due
+
+    def get(self, job_id: Hashable) -> Optional[CompiledCronExpression]:
+        """Return the compiled expression of a job, or None if it is not indexed."""
+        return self._jobs.get(job_id)
+
+    def __contains__(self, job_id: Hashable) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __iter__(self):
+        return iter(self._jobs)
+
+
+## COLUMNAR STORE
+# Smallest array typecode whose items hold at least ``bits`` bits (item sizes are platform dependent)
+def _typecode(bits: int) -> str:
+    return next(code for code in 'BHILQ' if array(code).itemsize * 8 >= bits)
+
+
+# Column name and array typecode of each field bitset
+_MASK_COLUMNS = (
+    ('minute', 'Q'),            # bits 0-59
+    ('hour', _typecode(24)),    # bits 0-23
+    ('dom', _typecode(32)),     # bits 1-31, and bit 0 for "L"
+    ('month', _typecode(13)),   # bits 1-12
+    ('dow', _typecode(7)),      # bits 0-6; widened to _DATED_DOW_TYPECODE by the first "wL" or "w#n"
+)
+_DATED_DOW_TYPECODE = _typecode(_DOW_LAST_BASE + 7)
+
+
+# Class storing many schedules column-wise in typed arrays, with commands in one packed string table
+class ScheduleStore:
+    """Append-only, columnar storage for very large numbers of schedules.
+
+    Each field bitset lives in its own ``array`` (8 bytes for minutes, 4/4/2/1 for
+    hour, day of month, month and day of week) and every command is UTF-8 in one
+    shared byte string addressed by an offsets array. A schedule costs about 27
+    bytes plus its command, with no per-schedule Python objects. Rows are
+    addressed by position. The day-of-week column only widens to 8 bytes once a
+    schedule uses "wL" or "w#n".
+
+    ``columns()`` exposes the arrays through the buffer protocol without copying.
+    Release those views before appending again: arrays cannot grow while exported.
+    """
+
+    def __init__(self, expressions: Optional[Iterable[Union[str, BaseCronExpression]]] = None):
+        self._masks = {name: array(code) for name, code in _MASK_COLUMNS}
+        self._commands = bytearray()
+        self._offsets = array('Q', [0])
+        if expressions is not None:
+            self.extend(expressions)
+
+    def append_masks(self, minute_mask: int, hour_mask: int, dom_mask: int, month_mask: int, dow_mask: int, command: str) -> int:
+        """Append one schedule given its bitsets and return its row number."""
+        dow_column = self._masks['dow']
+        if dow_mask > _DOW_FULL and dow_column.typecode != _DATED_DOW_TYPECODE:
+            dow_column.append(0)  # raises BufferError, like any append, while a view is exported
+            dow_column.pop()
+            self._masks['dow'] = array(_DATED_DOW_TYPECODE, dow_column)
+        for (name, _), mask in zip(_MASK_COLUMNS, (minute_mask, hour_mask, dom_mask, month_mask, dow_mask)):
+            self._masks[name].append(mask)
+        self._commands += command.encode('utf-8')
+        self._offsets.append(len(self._commands))
+        return len(self._offsets) - 2
+
+    def append(self, expression: Union[str, BaseCronExpression]) -> int:
+        """Append one cron expression and return its row number; raises ValueError if it is invalid."""
+        if isinstance(expression, CompiledCronExpression):
+            return self.append_masks(*expression.schedule_key, expression.command)
+        if isinstance(expression, BaseCronExpression):
+            expression = expression.cron_expression
+        fields = parse_expression(expression)
+        masks = [expand_field(kind, field).mask for kind, field in zip(FIELD_KINDS, fields)]
+        return self.append_masks(*masks, fields[5])
+
+    def extend(self, expressions: Iterable[Union[str, BaseCronExpression]]) -> None:
+        """Append many expressions, building no per-schedule objects for plain strings.
+
+        Rows before an invalid expression stay appended; the ValueError names its position.
+        """
+        for position, expression in enumerate(expressions):
+            try:
+                self.append(expression)
+            except ValueError as error:
+                raise ValueError(f"Expression {position}: {error}") from error
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _row(self, row: int) -> int:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("schedule store row out of range")
+        return row
+
+    def masks(self, row: int) -> Tuple[int, int, int, int, int]:
+        """Return the five field bitsets of a row."""
+        row = self._row(row)
+        return tuple(self._masks[name][row] for name, _ in _MASK_COLUMNS)
+
+    def command(self, row: int) -> str:
+        row = self._row(row)
+        return self._commands[self._offsets[row]:self._offsets[row + 1]].decode('utf-8')
+
+    def expression(self, row: int) -> CompiledCronExpression:
+        """Materialise one row as a CompiledCronExpression, with the schedule in canonical form."""
+        masks = self.masks(row)
+        return CompiledCronExpression.from_masks(f"{canonical_schedule(masks)} {self.command(row)}", *masks)
+
+    def columns(self) -> Dict[str, memoryview]:
+        """Return zero-copy views of every column, including 'commands' (UTF-8) and 'command_offsets'."""
+        views = {name: memoryview(column) for name, column in self._masks.items()}
+        views['commands'] = memoryview(self._commands)
+        views['command_offsets'] = memoryview(self._offsets)
+        return views
+
+    def due(self, when: datetime, use_numpy: Optional[bool] = None) -> List[int]:
+        """Return the rows that fire at the minute of ``when``, in row order.
+
+        With NumPy the columns are tested as whole arrays (wrapping the buffers without
+        copying); otherwise the rows are scanned in pure Python with the same result.
+        """
+        if use_numpy and np is None:
+            raise ImportError("use_numpy=True requires NumPy to be installed")
+        if np is not None if use_numpy is None else use_numpy:
+            return self._due_numpy(when)
+        minute_bit, hour_bit, month_bit = 1 << when.minute, 1 << when.hour, 1 << when.month
+        dom_bit, dow_bit = self._day_bits(when)
+        masks = self._masks
+        due = []
+        for row, (minute, hour, dom, month, dow) in enumerate(zip(masks['minute'], masks['hour'], masks['dom'], masks['month'], masks['dow'])):
+            if minute & minute_bit and hour & hour_bit and month & month_bit:
+                if dom != _DOM_FULL and dow != _DOW_FULL:
+                    if dom & dom_bit or dow & dow_bit:
+                        due.append(row)
+                elif dom & dom_bit and dow & dow_bit:
+                    due.append(row)
+        return due
+
+    @staticmethod
+    def _day_bits(when: datetime) -> Tuple[int, int]:
+        """Return the day-of-month and day-of-week bits true on a date, including "L", "wL" and "w#n"."""
+        days_in_month, day_bits, _ = _month_table(when.year, when.month)
+        return (1 << when.day) | (_DOM_LAST if when.day == days_in_month else 0), day_bits[when.day]
+
+    def _due_numpy(self, when: datetime) -> List[int]:
+        columns = {name: np.frombuffer(column, dtype=column.typecode) for name, column in self._masks.items() if len(column)}
+        if not columns:
+            return []
+
+        def has(name: str, bits: int):
+            column = columns[name]
+            return column & column.dtype.type(bits) != 0
+
+        dom_bits, dow_bits = self._day_bits(when)
+        matched = has('minute', 1 << when.minute) & has('hour', 1 << when.hour) & has('month', 1 << when.month)
+        dom_match = has('dom', dom_bits)
+        dow_match = has('dow', dow_bits & ((1 << columns['dow'].itemsize * 8) - 1))
+        day_or = (columns['dom'] != _DOM_FULL) & (columns['dow'] != _DOW_FULL)
+        matched &= np.where(day_or, dom_match | dow_match, dom_match & dow_match)
+        return np.flatnonzero(matched).tolist()
@@ -1,126 +1,693 @@
-import re
+import abc
+import argparse
+import calendar
+import csv
+import io
+import json
+import os
+import socket
+import stat
 import sys
-from typing import List, Tuple, Union
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
 
 ## HELPER FUNCTIONS
 # Helper function to generate padded columns for table output
 def _generate_padding(name: str, length: int) -> str:
     """Ensure that the field name is properly padded with spaces to the desired length."""
     return name + " " * (length - len(name))
-    
+
+
+# Helper function to pack expanded field values into an integer bitset
+def _values_to_mask(values: List[int]) -> int:
+    """Return an integer with bit ``n`` set for every value ``n`` in values."""
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
+# Helper function to unpack an integer bitset back into sorted field values
+def _mask_to_values(mask: int) -> List[int]:
+    """Return the sorted list of bit positions set in mask."""
+    values = []
+    while mask:
+        lowest = mask & -mask
+        values.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return values
+
+
+# Helper function to find the lowest set bit at or above a position
+def _next_bit(mask: int, position: int) -> int:
+    """Return the lowest bit position >= position set in mask, or -1 if there is none."""
+    mask = mask >> position << position
+    if not mask:
+        return -1
+    return (mask & -mask).bit_length() - 1
+
+
+# Helper function to find the highest set bit at or below a position
+def _prev_bit(mask: int, position: int) -> int:
+    """Return the highest bit position <= position set in mask, or -1 if there is none."""
+    if position < 0:
+        return -1
+    return (mask & ((1 << (position + 1)) - 1)).bit_length() - 1
+
+
+# Helper function counting the set bits of a bitset
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+# Helper function rounding a datetime up to the next whole minute
+def _ceil_minute(when: datetime) -> datetime:
+    floored = when.replace(second=0, microsecond=0)
+    return floored if floored == when else floored + timedelta(minutes=1)
+
+
+# Helper function mapping a day-of-week bitset (plain weekdays only) onto the days of a month
+@lru_cache(maxsize=1024)
+def _weekday_days_mask(dow_mask: int, first_dow: int) -> int:
+    """Return a bitset of days 1-31 whose weekday is in dow_mask, given the weekday (0 = Sunday) of day 1.
+
+    Callers pass only bits 0-6, so there are at most 128 x 7 distinct keys.
+    """
+    mask = 0
+    for day in range(1, 32):
+        if dow_mask >> ((first_dow + day - 1) % 7) & 1:
+            mask |= 1 << day
+    return mask
+
+
+# Longest possible length of each month (index 1-12), used to spot schedules that can never fire
+_MAX_MONTH_DAYS = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# How far next_run/prev_run search before giving up on a schedule
+_MAX_SEARCH_YEARS = 400
+
+# Bitsets with every legal value of a field set, used to detect restricted fields
+_MINUTE_FULL = _values_to_mask(range(60))
+_HOUR_FULL = _values_to_mask(range(24))
+_DOM_FULL = _values_to_mask(range(1, 32))
+_MONTH_FULL = _values_to_mask(range(1, 13))
+_DOW_FULL = _values_to_mask(range(0, 7))
+
+# Bits of the date-dependent items: day-of-month bit 0, which no day uses, stands for "L" (last day);
+# day-of-week bits 7-41 stand for "w#n" (bit 7 + 7 * (n - 1) + w) and bits 42-48 for "wL" (last weekday w)
+_DOM_LAST = 1
+_DOW_NTH_BASE = 7
+_DOW_LAST_BASE = 42
+
+# Days 1-29, which exist in every month, and "L", which resolves to a day in every month
+_ALWAYS_DAYS = _values_to_mask(range(1, 30)) | _DOM_LAST
+
+
+# Helper function building the lookups that resolve "L", "wL" and "w#n" in one month
+@lru_cache(maxsize=4096)
+def _month_table(year: int, month: int) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+    """Return (days in month, day-of-week bits of each day, days of each day-of-week bit).
+
+    The second table is indexed by day and holds every day-of-week bit (plain, nth and
+    last) true on that day; the third is indexed by bit and holds the bitset of its days.
+    """
+    first_weekday, days_in_month = calendar.monthrange(year, month)
+    first_dow = (first_weekday + 1) % 7
+    day_bits = [0] * 32
+    bit_days = [0] * (_DOW_LAST_BASE + 7)
+    for day in range(1, days_in_month + 1):
+        weekday = (first_dow + day - 1) % 7
+        bits = [weekday, _DOW_NTH_BASE + 7 * ((day - 1) // 7) + weekday]
+        if day + 7 > days_in_month:
+            bits.append(_DOW_LAST_BASE + weekday)
+        for bit in bits:
+            day_bits[day] |= 1 << bit
+            bit_days[bit] |= 1 << day
+    return days_in_month, tuple(day_bits), tuple(bit_days)
+
+# Names accepted in place of numbers, in any case
+MONTH_NAMES = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')  # 1-12
+DOW_NAMES = ('SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT')  # 0-6
+
+# Macros standing for all five time fields
+MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+
+# Extended syntax of a field: names usable wherever a number is, and whether "L" (last) and "#" (nth) items are allowed
+FieldSyntax = namedtuple('FieldSyntax', ['names', 'last', 'nth'])
+
+# Per-field label, allowed values, bounds and extended syntax (None for plain numbers), built once at import time
+FieldSpec = namedtuple('FieldSpec', ['component', 'options', 'min_val', 'max_val', 'syntax'])
+FIELD_SPECS = {
+    'minute': FieldSpec('minute(s)', tuple(range(60)), 0, 59, None),
+    'hour': FieldSpec('hour(s)', tuple(range(24)), 0, 23, None),
+    'dom': FieldSpec('day(s) of month', tuple(range(1, 32)), 1, 31, FieldSyntax({}, True, False)),  # "L": last day of the month
+    'month': FieldSpec('month(s)', tuple(range(1, 13)), 1, 12, FieldSyntax({name: number for number, name in enumerate(MONTH_NAMES, 1)}, False, False)),
+    'dow': FieldSpec('day(s) of week', tuple(range(0, 7)), 0, 6,  # 0 is Sunday; "5L": last Friday, "5#2": second Friday
+                     FieldSyntax({name: number for number, name in enumerate(DOW_NAMES)}, True, True)),
+}
+FIELD_KINDS = ('minute', 'hour', 'dom', 'month', 'dow')
+
+
+## FIELD PARSER
+# Error raised for a field that cannot be parsed or is out of bounds, pointing at the offending character
+class CronSyntaxError(ValueError):
+    def __init__(self, message: str, component: str, expression: str, offset: int):
+        super().__init__(message, component, expression, offset)
+        self.message = message
+        self.component = component
+        self.expression = expression
+        self.offset = offset
+
+    def __str__(self) -> str:
+        return f"{self.message} for '{self.component}' at offset {self.offset}: {self.expression}"
+
+
+# AST nodes for a single field; offset is the index of the node's first character
+FieldAny = namedtuple('FieldAny', ['offset'])                                 # "*"
+FieldValue = namedtuple('FieldValue', ['value', 'offset'])                    # "5"
+FieldRange = namedtuple('FieldRange', ['start', 'end', 'offset', 'end_offset'])  # "1-5"
+FieldStep = namedtuple('FieldStep', ['base', 'step', 'offset', 'step_offset'])  # "*/15", "5/10", "0-30/5"
+FieldList = namedtuple('FieldList', ['items'])                                # "1,5-7,*/20"
+FieldLast = namedtuple('FieldLast', ['weekday', 'offset'])                    # "L" (weekday None), "5L"
+FieldNth = namedtuple('FieldNth', ['weekday', 'nth', 'offset', 'nth_offset'])  # "5#2"
+
+
+# Helper function to check that text is a non-empty run of ASCII digits
+def _is_number(text: str) -> bool:
+    return text.isdigit() and text.isascii()
+
+
+# Helper function to report the first character of text (found at offset) that breaks the grammar
+def _raise_unexpected(text: str, offset: int, component: str, expression: str, allowed: str = "0123456789"):
+    for index, char in enumerate(text):
+        if char not in allowed:
+            raise CronSyntaxError(f"Unexpected character '{char}'", component, expression, offset + index)
+    raise CronSyntaxError("Expected a number", component, expression, offset + len(text))
+
+
+# Helper function to parse a number token found at offset, or one of the field's names
+def _parse_number(text: str, offset: int, component: str, expression: str, names: Optional[Dict[str, int]] = None) -> int:
+    if _is_number(text):
+        return int(text)
+    if names:
+        value = names.get(text.upper())
+        if value is not None:
+            return value
+        if text.isalpha() and text.isascii():
+            raise CronSyntaxError(f"Unknown name '{text}'", component, expression, offset)
+    _raise_unexpected(text, offset, component, expression)
+
+
+# Helper function to parse the date-dependent items "L", "wL" and "w#n"; returns None for any other item
+def _parse_extended_item(text: str, offset: int, component: str, expression: str, syntax: FieldSyntax):
+    if syntax.last and text[-1:] in ('L', 'l'):
+        if not syntax.nth:
+            return FieldLast(None, offset) if len(text) == 1 else None
+        if len(text) > 1:
+            return FieldLast(_parse_number(text[:-1], offset, component, expression, syntax.names), offset)
+    if syntax.nth and '#' in text:
+        weekday_text, _, nth_text = text.partition('#')
+        nth_offset = offset + len(weekday_text) + 1
+        weekday = _parse_number(weekday_text, offset, component, expression, syntax.names)
+        return FieldNth(weekday, _parse_number(nth_text, nth_offset, component, expression), offset, nth_offset)
+    return None
+
+
+# Helper function to parse one comma-separated item: a base ("*", "n" or "a-b") with an optional "/step"
+def _parse_field_item(text: str, offset: int, component: str, expression: str, syntax: Optional[FieldSyntax] = None):
+    if _is_number(text):
+        return FieldValue(int(text), offset)
+    names = None
+    if syntax is not None:
+        extended = _parse_extended_item(text, offset, component, expression, syntax)
+        if extended is not None:
+            return extended
+        names = syntax.names
+    base_text, slash, step_text = text.partition('/')
+    if base_text == '*':
+        base = FieldAny(offset)
+    elif _is_number(base_text):
+        base = FieldValue(int(base_text), offset)
+    elif base_text.startswith('*'):
+        _raise_unexpected(base_text[1:], offset + 1, component, expression, allowed="")
+    else:
+        start_text, dash, end_text = base_text.partition('-')
+        if not dash:
+            base = FieldValue(_parse_number(base_text, offset, component, expression, names), offset)
+        else:
+            start = _parse_number(start_text, offset, component, expression, names)
+            end_offset = offset + len(start_text) + 1
+            base = FieldRange(start, _parse_number(end_text, end_offset, component, expression, names), offset, end_offset)
+    if not slash:
+        return base
+    step_offset = offset + len(base_text) + 1
+    return FieldStep(base, _parse_number(step_text, step_offset, component, expression), offset, step_offset)
+
+
+# Public function to parse a field into its AST without any regular expressions
+def parse_field(expression: str, component: str = "field", syntax: Optional[FieldSyntax] = None):
+    """Parse one cron field into FieldAny/FieldValue/FieldRange/FieldStep/FieldList nodes.
+
+    With a ``syntax``, names are read as their numbers and "L" / "#" items become
+    FieldLast/FieldNth nodes. Raises CronSyntaxError with the offset of the first
+    character that does not fit the grammar.
+    """
+    if ',' not in expression:
+        return _parse_field_item(expression, 0, component, expression, syntax)
+    items = []
+    offset = 0
+    for text in expression.split(','):
+        items.append(_parse_field_item(text, offset, component, expression, syntax))
+        offset += len(text) + 1
+    return FieldList(tuple(items))
+
+
+# Helper function to check that a parsed number lies within the field bounds
+def _check_bounds(value: int, offset: int, message: str, component: str, expression: str, min_val: int, max_val: int) -> None:
+    if not min_val <= value <= max_val:
+        raise CronSyntaxError(message, component, expression, offset)
+
+
+# Helper function turning a range or single-value base into its (start, end) bounds, validated
+def _base_bounds(node, component: str, expression: str, min_val: int, max_val: int) -> Tuple[int, int]:
+    if isinstance(node, FieldValue):
+        _check_bounds(node.value, node.offset, "Invalid value", component, expression, min_val, max_val)
+        return node.value, node.value
+    _check_bounds(node.start, node.offset, "Invalid range", component, expression, min_val, max_val)
+    _check_bounds(node.end, node.end_offset, "Invalid range", component, expression, min_val, max_val)
+    if node.start > node.end:
+        raise CronSyntaxError("Invalid range", component, expression, node.offset)
+    return node.start, node.end
+
+
+# Helper function validating a date-dependent item and returning its token ("L", "5L" or "5#2")
+def _extended_token(node, component: str, expression: str, min_val: int, max_val: int) -> str:
+    if node.weekday is None:
+        return 'L'
+    _check_bounds(node.weekday, node.offset, "Invalid value", component, expression, min_val, max_val)
+    if type(node) is FieldLast:
+        return f"{node.weekday}L"
+    _check_bounds(node.nth, node.nth_offset, "Invalid nth weekday", component, expression, 1, 5)
+    return f"{node.weekday}#{node.nth}"
+
+
+# Helper function returning the bit of a date-dependent token in its field's bitset
+def _token_bit(token: str) -> int:
+    if token == 'L':
+        return _DOM_LAST
+    if token.endswith('L'):
+        return 1 << (_DOW_LAST_BASE + int(token[:-1]))
+    weekday, _, nth = token.partition('#')
+    return 1 << (_DOW_NTH_BASE + 7 * (int(nth) - 1) + int(weekday))
+
+
+# Helper function listing the date-dependent tokens of a day-of-month or day-of-week bitset, in bit order
+def _extended_tokens(kind: str, mask: int) -> List[str]:
+    if kind == 'dom':
+        return ['L'] if mask & _DOM_LAST else []
+    tokens = []
+    for bit in _mask_to_values(mask >> _DOW_NTH_BASE << _DOW_NTH_BASE):
+        if bit >= _DOW_LAST_BASE:
+            tokens.append(f"{bit - _DOW_LAST_BASE}L")
+        else:
+            nth, weekday = divmod(bit - _DOW_NTH_BASE, 7)
+            tokens.append(f"{weekday}#{nth + 1}")
+    return tokens
+
+
+# Helper function dropping date-dependent tokens already covered by plain values ("5,5#2" is every Friday)
+def _needed_tokens(tokens: Iterable[str], values: Set[int]) -> List[str]:
+    needed = []
+    for token in tokens:
+        covered = values.issuperset(range(28, 32)) if token == 'L' else int(token[0]) in values
+        if not covered:
+            needed.append(token)
+    return sorted(needed, key=_token_bit)
+
+
+# Helper function to evaluate one non-list AST node into its values
+def _evaluate_item(node, component: str, expression: str, options: Union[List[int], List[str]], min_val: int, max_val: int) -> Union[List[int], List[str]]:
+    node_type = type(node)
+    if node_type is FieldValue and min_val <= node.value <= max_val:
+        return [node.value]
+    if node_type is FieldRange and min_val <= node.start <= node.end <= max_val:
+        return list(range(node.start, node.end + 1))
+    if node_type is FieldAny:
+        return options
+    if node_type is FieldStep:
+        _check_bounds(node.step, node.step_offset, "Invalid step value", component, expression, max(min_val, 1), max_val)
+        if type(node.base) is FieldAny:
+            return options[::node.step]
+        start, end = _base_bounds(node.base, component, expression, min_val, max_val)
+        if type(node.base) is FieldValue:
+            end = max_val  # "n/step" runs from n to the top of the field
+        return list(range(start, end + 1, node.step))
+    if node_type is FieldLast or node_type is FieldNth:
+        return [_extended_token(node, component, expression, min_val, max_val)]
+    _base_bounds(node, component, expression, min_val, max_val)  # out of bounds: raises with the exact offset
+
 
 ## PUBLIC FUNCTIONS
 # Public function to expand cron components (minute, hour, etc.)
-def expand_expression(component: str, expression: str, options: Union[List[int], List[str]], min_val: str, max_val: str) -> Union[List[int], List[str]]:
-    """Expand a cron schedule expression component."""
-    
+def expand_expression(component: str, expression: str, options: Union[List[int], List[str]], min_val: str, max_val: str, syntax: Optional[FieldSyntax] = None) -> Union[List[int], List[str]]:
+    """Expand a cron schedule expression component; pass the field's FIELD_SPECS syntax to allow names, "L" and "#"."""
+
     """ Handle "*" for any value """
     if expression == "*":
         return options
 
-    """ Handle dash for ranges, e.g. "1-5" """
-    cron_match = re.match(r"^(\d+)-(\d+)$", expression)
-    if cron_match:
-        start = int(cron_match.group(1))
-        end = int(cron_match.group(2))
-        # Validation : Both start and end should fall within allowed range
-        if min_val <= start <= max_val and min_val <= end <= max_val and start <= end:
-            return list(range(start, end + 1))
-        raise ValueError(f"Invalid range for '{component}': {expression}") # Handle error
-
-    """ Handle comma-separated values, e.g. "1,2,3" """
-    comma_match = re.match(r"^\d+(?:,\d+)*$", expression)
-    if comma_match:
-        values = list(map(int, expression.split(',')))
-        # Each value should fall within allowed range
-        if all(min_val <= value <= max_val for value in values):
-            return list(map(int, expression.split(',')))
-        raise ValueError(f"Invalid range for comma separated values for '{component}': {expression}") # Handle error
-
-    """ Handle step values, e.g. "*/5" """
-    step_match = re.match(r"^(\d+|\*)/(\d+)$", expression)
-    if step_match:
-        base = step_match.group(1)
-        step = int(step_match.group(2))
-        if min_val <= step <= max_val:
-            # Handle base range with step value
-            if base == "*":
-                base = options
-            else:
-                base = options[int(base):]  # Slice options if base is a number
-            return base[::step]
-        raise ValueError(f"Invalid step values for '{component}': {expression}") # Handle error
-    
-    
-    """Check for comma-separated cron-like expression like '15,20-23,30,40,51-53'. """
-    cron_match = re.match(r"^(\d+|\d+-\d+|\*|\d+/\d+)(?:,(\d+|\d+-\d+|\*|\d+/\d+))*$", expression)
-    if bool(cron_match):
-        expanded_part = []
+    """ Fast paths for plain "a-b" ranges and "a,b,c" lists; anything else, including errors, takes the parser """
+    if ',' not in expression:
+        start_text, dash, end_text = expression.partition('-')
+        if dash and start_text.isdigit() and end_text.isdigit() and start_text.isascii() and end_text.isascii():
+            start, end = int(start_text), int(end_text)
+            if min_val <= start <= end <= max_val:
+                return list(range(start, end + 1))
+    else:
         parts = expression.split(',')
-        for part in parts:
-           """ Handle dash for ranges, e.g. "1-5" """
-           cron_match = re.match(r"^(\d+)-(\d+)$", part)
-           if cron_match:
-                start = int(cron_match.group(1))
-                end = int(cron_match.group(2))
-                if not (min_val <= start <= max_val and min_val <= end <= max_val and start <= end):
-                    raise ValueError(f"Invalid range for '{component}: {part}") # Handle error
-                expanded_part.extend(list(range(start, end + 1)))
-                continue
+        if all(part.isdigit() for part in parts) and expression.isascii():
+            values = sorted(set(map(int, parts)))
+            if min_val <= values[0] and values[-1] <= max_val:
+                return values
 
-           """ Handle comma-separated values, e.g. "1,2,3" """
-           comma_match = re.match(r"^\d+(?:,\d+)*$", part)
-           if comma_match:
-                values = list(map(int, part.split(',')))
-                # Each value should fall within allowed range
-                if not (all(min_val <= value <= max_val for value in values)):
-                    if len(values) == 1:
-                       raise ValueError(f"Invalid value for '{component}: {part}") # Handle error 
-                    raise ValueError(f"Invalid range for comma separated values for '{component}: {part}") # Handle error
-                expanded_part.extend(values)
-                continue
-
-           """ Handle step values, e.g. "*/5" """
-           step_match = re.match(r"^(\d+|\*)/(\d+)$", part)
-           if step_match:
-                base = step_match.group(1)
-                step = int(step_match.group(2))
-                if not (min_val <= step <= max_val):
-                    raise ValueError(f"Invalid step values for '{component}: {part}") # Handle error
-                # Handle base range with step value
-                if base == "*":
-                    base = options
-                else:
-                    base = options[int(base):]  # Slice options if base is a number
-
-                expanded_part.extend(base[::step])
-        return sorted(set(expanded_part))
-    """ If none of the above matched, raise an error """
-    raise ValueError(f"Invalid cron expression for '{component}: {expression}")
+    node = parse_field(expression, component, syntax)
+    if type(node) is FieldList:
+        """ Handle comma-separated lists of values, ranges and steps, e.g. "15,20-23,*/10" """
+        expanded_part = set()
+        tokens = None
+        for item in node.items:
+            if type(item) is FieldValue and min_val <= item.value <= max_val:
+                expanded_part.add(item.value)
+            elif type(item) is FieldLast or type(item) is FieldNth:
+                tokens = tokens or set()
+                tokens.update(_evaluate_item(item, component, expression, options, min_val, max_val))
+            else:
+                expanded_part.update(_evaluate_item(item, component, expression, options, min_val, max_val))
+        if tokens:
+            """ Date-dependent items ("L", "5#2") follow the numbers, unless the numbers already cover them """
+            return sorted(expanded_part) + _needed_tokens(tokens, expanded_part)
+        return sorted(expanded_part)
+    """ Handle a single value, range or step, e.g. "5", "1-5", "*/5" """
+    return _evaluate_item(node, component, expression, options, min_val, max_val)
 
  # Public function to parse base expression
 def parse_expression(cron_expression: str) -> List[any]:
         expressions = cron_expression.split()
         """ Return if the arguments are less than 6 """
         if len(expressions) != 6:
+            if expressions and expressions[0].startswith('@'):
+                return _expand_macro(expressions)
             raise ValueError("Cron expression must contain exactly 5 time fields and 1 command field") # Handle error
         return expressions
 
+
+# Helper function replacing a macro such as "@daily" by its five time fields
+def _expand_macro(expressions: List[str]) -> List[str]:
+    fields = MACROS.get(expressions[0].lower())
+    if fields is None:
+        if expressions[0].lower() == '@reboot':
+            raise ValueError("@reboot runs once at startup and has no schedule")
+        raise ValueError(f"Unknown macro '{expressions[0]}'")
+    if len(expressions) != 2:
+        raise ValueError("A macro must be followed by exactly 1 command field")
+    return fields.split() + expressions[1:]
+
+
 # Public function to parse the cron expression into its components
 def parse_raw_components(cron_expression: str) -> Tuple[str, str, str, str, str]:
         parts = parse_expression(cron_expression)
         return parts[0], parts[1], parts[2], parts[3], parts[4]
 
 
+## VALIDATION
+# One problem found by validate_expression: the field kind ('expression' for the line as a whole),
+# the [start, end) character span in the expression, and the message
+ValidationError = namedtuple('ValidationError', ['field', 'start', 'end', 'message'])
+
+
+# Helper function locating the first character of text (found at offset) that breaks the grammar, like _raise_unexpected
+def _unexpected_span(text: str, offset: int, allowed: str = "0123456789") -> Tuple[int, int, str]:
+    for index, char in enumerate(text):
+        if char not in allowed:
+            return offset + index, offset + index + 1, f"Unexpected character '{char}'"
+    return offset + len(text), offset + len(text), "Expected a number"
+
+
+# Characters of plain numeric items; items with any other character may use names, "L" or "#"
+_PLAIN_ITEM_CHARS = frozenset("0123456789*/-")
+
+
+# Helper function checking an item that uses names, "L" or "#" with the parser itself (its values are tiny)
+def _parsed_item_error(text: str, offset: int, min_val: int, max_val: int, syntax: FieldSyntax) -> Optional[Tuple[int, int, str]]:
+    try:
+        node = _parse_field_item(text, offset, '', text, syntax)
+        _evaluate_item(node, '', text, (), min_val, max_val)
+    except CronSyntaxError as error:
+        start = error.offset
+        if error.message.startswith("Unexpected character"):
+            return start, start + 1, error.message
+        end = start
+        while end - offset < len(text) and text[end - offset].isalnum():
+            end += 1
+        return start, end, error.message
+    return None
+
+
+# Helper function checking one comma-separated item without evaluating it; returns (start, end, message) or None
+def _item_error(text: str, offset: int, min_val: int, max_val: int, syntax: Optional[FieldSyntax] = None) -> Optional[Tuple[int, int, str]]:
+    if _is_number(text):
+        return None if min_val <= int(text) <= max_val else (offset, offset + len(text), "Invalid value")
+    if syntax is not None and not _PLAIN_ITEM_CHARS.issuperset(text):
+        return _parsed_item_error(text, offset, min_val, max_val, syntax)
+    base_text, slash, step_text = text.partition('/')
+    start_text = end_text = None
+    # Syntax, in the order parse_field checks it
+    if base_text.startswith('*') and base_text != '*':
+        return _unexpected_span(base_text[1:], offset + 1, allowed="")
+    if base_text != '*' and not _is_number(base_text):
+        start_text, dash, end_text = base_text.partition('-')
+        if not dash:
+            return _unexpected_span(base_text, offset)
+        if not _is_number(start_text):
+            return _unexpected_span(start_text, offset)
+        if not _is_number(end_text):
+            return _unexpected_span(end_text, offset + len(start_text) + 1)
+    step_offset = offset + len(base_text) + 1
+    if slash and not _is_number(step_text):
+        return _unexpected_span(step_text, step_offset)
+    # Bounds, in the order _evaluate_item checks them
+    if slash and not max(min_val, 1) <= int(step_text) <= max_val:
+        return step_offset, step_offset + len(step_text), "Invalid step value"
+    if start_text is not None:
+        end_offset = offset + len(start_text) + 1
+        if not min_val <= int(start_text) <= max_val:
+            return offset, end_offset - 1, "Invalid range"
+        if not min_val <= int(end_text) <= max_val:
+            return end_offset, end_offset + len(end_text), "Invalid range"
+        if int(start_text) > int(end_text):
+            return offset, end_offset + len(end_text), "Invalid range"
+    elif base_text != '*' and not min_val <= int(base_text) <= max_val:
+        return offset, offset + len(base_text), "Invalid value"
+    return None
+
+
+# Public function checking a cron expression without expanding it
+def validate_expression(cron_expression: str) -> List[ValidationError]:
+    """Return every syntax and bounds error in a cron expression; an empty list means it is valid.
+
+    Fields are checked item by item, without building value lists or sets. Unlike the
+    parsers it does not stop at the first error: each comma-separated item reports its
+    first problem, with the same message and offset CronSyntaxError would give.
+    """
+    errors = []
+    fields = cron_expression.split()
+    if len(fields) != 6 and fields and fields[0].startswith('@'):
+        try:
+            _expand_macro(fields)
+        except ValueError as error:
+            start = cron_expression.find(fields[0])
+            return [ValidationError('expression', start, start + len(fields[0]), str(error))]
+        return []
+    if len(fields) != 6:
+        errors.append(ValidationError('expression', 0, len(cron_expression), "Cron expression must contain exactly 5 time fields and 1 command field"))
+    position = 0
+    for kind, field in zip(FIELD_KINDS, fields):
+        position = cron_expression.find(field, position)  # only whitespace precedes the field, so this is its offset
+        if field != '*':
+            spec = FIELD_SPECS[kind]
+            offset = position
+            for item in field.split(','):
+                error = _item_error(item, offset, spec.min_val, spec.max_val, spec.syntax)
+                if error is not None:
+                    errors.append(ValidationError(kind, *error))
+                offset += len(item) + 1
+        position += len(field)
+    return errors
+
+
+
+## FIELD CACHE
+# Immutable result of expanding one field: sorted values and the matching bitset
+ExpandedField = namedtuple('ExpandedField', ['values', 'mask'])
+
+# Default number of distinct (field kind, expression) pairs kept by the field cache
+FIELD_CACHE_SIZE = 4096
+
+
+# Class implementing a bounded least-recently-used cache with hit/miss/eviction counters; safe to share between threads
+class LRUCache:
+    def __init__(self, maxsize: int = FIELD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # a hit reorders entries, so even lookups must not interleave
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        """Return the cached value for key (marking it recently used), or None on a miss."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        """Store value under key, evicting the least recently used entries beyond maxsize."""
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize: int) -> None:
+        """Change the capacity, evicting entries if the cache shrinks."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def reset_counters(self) -> None:
+        """Zero the hit, miss and eviction counters, keeping the entries."""
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the counters needed to size the cache."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_field_cache = LRUCache()
+
+
+# Public function to expand a single field by kind, sharing results through the field cache
+def expand_field(kind: str, expression: str) -> ExpandedField:
+    """Return the memoized expansion of one field ('minute', 'hour', 'dom', 'month' or 'dow')."""
+    key = (kind, expression)
+    cached = _field_cache.get(key)
+    if cached is not None:
+        return cached
+    spec = FIELD_SPECS[kind]
+    values = tuple(expand_expression(spec.component, expression, spec.options, spec.min_val, spec.max_val, spec.syntax))
+    if values and type(values[-1]) is str:  # date-dependent tokens come last
+        mask = _values_to_mask([value for value in values if type(value) is int])
+        for token in values:
+            if type(token) is str:
+                mask |= _token_bit(token)
+    else:
+        mask = _values_to_mask(values)
+    result = ExpandedField(values, mask)
+    _field_cache.put(key, result)
+    return result
+
+
+# Public functions to size, inspect and reset the field cache
+def set_field_cache_size(maxsize: int) -> None:
+    """Set how many field expansions are kept; 0 disables caching."""
+    _field_cache.resize(maxsize)
+
+
+def field_cache_stats() -> Dict[str, int]:
+    """Return hits, misses, evictions, current size and capacity of the field cache."""
+    return _field_cache.stats()
+
+
+def clear_field_cache() -> None:
+    """Empty the field cache and reset its counters."""
+    _field_cache.clear()
+
 
 ## CLASSES
 # Abstract base class for cron expressions
 class BaseCronExpression:
+    # __slots__ keep instances small when loading very large crontabs
+    __slots__ = ('cron_expression', 'raw_expression', 'command')
+
     def __init__(self, cron_expression: str):
         self.cron_expression = cron_expression
-        self.raw_expression = parse_expression(cron_expression)
-        self.command = self.raw_expression[5] 
+        self.raw_expression = parse_expression(cron_expression)  # the only place the text is split
+        self.command = self.raw_expression[5]
+
+    # Raw field text, read from the single split of the expression
+    @property
+    def minute(self) -> str:
+        return self.raw_expression[0]
+
+    @property
+    def hour(self) -> str:
+        return self.raw_expression[1]
+
+    @property
+    def dom(self) -> str:
+        return self.raw_expression[2]
 
+    @property
+    def month(self) -> str:
+        return self.raw_expression[3]
+
+    @property
+    def dow(self) -> str:
+        return self.raw_expression[4]
 
     def to_table_format(self, values: dict) -> List[Tuple[str, Union[str, List[int]]]]:
         """Return the cron expression in a table format, reusing the same method for both raw and expanded."""
@@ -136,9 +703,7 @@ class BaseCronExpression:
 
 # Class for raw cron expression (returns raw values)
 class RawCronExpression(BaseCronExpression):
-    def __init__(self, cron_expression: str):
-        super().__init__(cron_expression)
-        self.minute, self.hour, self.dom, self.month, self.dow = parse_raw_components(cron_expression)
+    __slots__ = ()
 
     def to_table_format(self) -> List[Tuple[str, Union[str, List[int]]]]:
         """Return the raw cron expression in a table format."""
@@ -152,20 +717,108 @@ class RawCronExpression(BaseCronExpression):
         return super().to_table_format(raw_values)
 
 
+# Slot caching each lazily expanded field of ExpandedCronExpression, and the field's position in the expression
+_FIELD_SLOTS = {kind: f'_{kind}_field' for kind in FIELD_KINDS}
+_FIELD_POSITIONS = {kind: position for position, kind in enumerate(FIELD_KINDS)}
+
+
 # Class to handle expanding the cron expression (expanded values)
 class ExpandedCronExpression(BaseCronExpression):
+    """Cron expression whose fields are expanded on first access and then cached.
+
+    Construction only splits the text, so an invalid field raises ValueError when
+    it is first read (or when the expression is compiled or rendered), not here.
+    """
+    __slots__ = tuple(_FIELD_SLOTS.values()) + ('_compiled',)
+
     def __init__(self, cron_expression: str):
         super().__init__(cron_expression)
-        self.minute, self.hour, self.dom, self.month, self.dow = parse_raw_components(cron_expression)
-        self.expanded_minute = self.expand_component('minute(s)', self.minute, list(range(60)), 0, 59) # # Validate minute (0-59)
-        self.expanded_hour = self.expand_component('hour(s)', self.hour, list(range(24)), 0, 23) # Validate hour (0-23)
-        self.expanded_dom = self.expand_component('day(s) of month', self.dom, list(range(1, 32)), 1, 31) # Validate day of month (1-31)
-        self.expanded_month = self.expand_component('month(s)', self.month, list(range(1, 13)), 1, 12) # Validate month (1-12)
-        self.expanded_dow = self.expand_component('day(s) of week', self.dow, list(range(0, 7)), 0, 6)  # Validate day of week (0-6, where 0 is Sunday)
-
-    def expand_component(self, component: str, expression: str, options: Union[List[int], List[str]], min_val: str, max_val: str) -> Union[List[int], List[str]]:
+        self._minute_field = self._hour_field = self._dom_field = self._month_field = self._dow_field = None
+        self._compiled = None
+
+    def expanded_field(self, kind: str) -> ExpandedField:
+        """Return one field's shared (values, mask) expansion, expanding it on first access."""
+        slot = _FIELD_SLOTS[kind]
+        field = getattr(self, slot)
+        if field is None:
+            field = expand_field(kind, self.raw_expression[_FIELD_POSITIONS[kind]])
+            setattr(self, slot, field)
+        return field
+
+    # Expanded fields are shared, immutable tuples from the field cache
+    @property
+    def expanded_minute(self) -> Tuple[int, ...]:
+        return self.expanded_field('minute').values  # minute (0-59)
+
+    @property
+    def expanded_hour(self) -> Tuple[int, ...]:
+        return self.expanded_field('hour').values  # hour (0-23)
+
+    @property
+    def expanded_dom(self) -> Tuple[int, ...]:
+        return self.expanded_field('dom').values  # day of month (1-31)
+
+    @property
+    def expanded_month(self) -> Tuple[int, ...]:
+        return self.expanded_field('month').values  # month (1-12)
+
+    @property
+    def expanded_dow(self) -> Tuple[int, ...]:
+        return self.expanded_field('dow').values  # day of week (0-6, where 0 is Sunday)
+
+    def expand_component(self, component: str, expression: str, options: Union[List[int], List[str]], min_val: str, max_val: str, syntax: Optional[FieldSyntax] = None) -> Union[List[int], List[str]]:
         """Expand each field of the cron expression."""
-        return expand_expression(component, expression, options, min_val, max_val)
+        return expand_expression(component, expression, options, min_val, max_val, syntax)
+
+    @property
+    def schedule_key(self) -> Tuple[int, int, int, int, int]:
+        """The five field bitsets; equal for every spelling of the same schedule."""
+        return tuple(self.expanded_field(kind).mask for kind in FIELD_KINDS)
+
+    @property
+    def canonical_schedule(self) -> str:
+        """The five time fields in canonical form, e.g. "*/15 * * * *" for "0,15,30,45 * * 1-12 *"."""
+        return canonical_schedule(self.schedule_key)
+
+    @property
+    def canonical_expression(self) -> str:
+        """The canonical schedule followed by the command."""
+        return f"{self.canonical_schedule} {self.command}"
+
+    # Expressions are equal when they fire at the same times and run the same command
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ExpandedCronExpression):
+            return NotImplemented
+        return self.command == other.command and self.schedule_key == other.schedule_key
+
+    def __hash__(self) -> int:
+        return hash((self.schedule_key, self.command))
+
+    def compile(self) -> "CompiledCronExpression":
+        """Return a bitmask-backed copy of this expression for fast matching."""
+        return CompiledCronExpression.from_expanded(self)
+
+    def _schedule(self) -> "CompiledCronExpression":
+        """Return the interned compiled schedule used for run computations, looking it up on first use."""
+        if self._compiled is None:
+            self._compiled = intern_schedule(self)
+        return self._compiled
+
+    def next_run(self, after: datetime) -> Optional[datetime]:
+        """Return the first run strictly after ``after``, or None if the schedule never fires."""
+        return self._schedule().next_run(after)
+
+    def prev_run(self, before: datetime) -> Optional[datetime]:
+        """Return the last run strictly before ``before``, or None if the schedule never fires."""
+        return self._schedule().prev_run(before)
+
+    def iter_runs(self, start: datetime, end: Optional[datetime] = None) -> Iterator[datetime]:
+        """Lazily yield every run in [start, end), or forever when end is None."""
+        return self._schedule().iter_runs(start, end)
+
+    def count_runs(self, start: datetime, end: datetime) -> int:
+        """Return how many runs fall in [start, end), without enumerating them."""
+        return self._schedule().count_runs(start, end)
 
     def to_table_format(self) -> List[Tuple[str, Union[str, List[int]]]]:
         """Return the expanded cron expression in a table format."""
@@ -178,21 +831,550 @@ class ExpandedCronExpression(BaseCronExpression):
         }
         return super().to_table_format(expanded_values)
 
+
+# Class holding each expanded field as an integer bitset (bit n set when value n is allowed)
+class CompiledCronExpression(BaseCronExpression):
+    __slots__ = ('minute_mask', 'hour_mask', 'dom_mask', 'month_mask', 'dow_mask', '__weakref__')
+
+    def __init__(self, cron_expression: str):
+        super().__init__(cron_expression)
+        minute, hour, dom, month, dow = self.raw_expression[:5]
+        self.minute_mask = expand_field('minute', minute).mask
+        self.hour_mask = expand_field('hour', hour).mask
+        self.dom_mask = expand_field('dom', dom).mask
+        self.month_mask = expand_field('month', month).mask
+        self.dow_mask = expand_field('dow', dow).mask
+
+    @classmethod
+    def from_expanded(cls, expanded: ExpandedCronExpression) -> "CompiledCronExpression":
+        """Build a compiled expression from an already expanded one without re-parsing."""
+        compiled = cls.__new__(cls)
+        compiled.cron_expression = expanded.cron_expression
+        compiled.raw_expression = expanded.raw_expression
+        compiled.command = expanded.command
+        compiled.minute_mask, compiled.hour_mask, compiled.dom_mask, compiled.month_mask, compiled.dow_mask = (
+            expanded.expanded_field(kind).mask for kind in FIELD_KINDS
+        )
+        return compiled
+
+    @classmethod
+    def from_masks(cls, cron_expression: str, minute_mask: int, hour_mask: int, dom_mask: int, month_mask: int, dow_mask: int) -> "CompiledCronExpression":
+        """Build a compiled expression from its bitsets, e.g. when loading them from disk, without expanding any field."""
+        compiled = cls.__new__(cls)
+        compiled.cron_expression = cron_expression
+        compiled.raw_expression = parse_expression(cron_expression)
+        compiled.command = compiled.raw_expression[5]
+        compiled.minute_mask = minute_mask
+        compiled.hour_mask = hour_mask
+        compiled.dom_mask = dom_mask
+        compiled.month_mask = month_mask
+        compiled.dow_mask = dow_mask
+        return compiled
+
+    @property
+    def expanded_minute(self) -> List[int]:
+        return _mask_to_values(self.minute_mask)
+
+    @property
+    def expanded_hour(self) -> List[int]:
+        return _mask_to_values(self.hour_mask)
+
+    @property
+    def expanded_dom(self) -> List[Union[int, str]]:
+        if self.dom_mask & _DOM_LAST:
+            return _mask_to_values(self.dom_mask & _DOM_FULL) + ['L']
+        return _mask_to_values(self.dom_mask)
+
+    @property
+    def expanded_month(self) -> List[int]:
+        return _mask_to_values(self.month_mask)
+
+    @property
+    def expanded_dow(self) -> List[Union[int, str]]:
+        if self.dow_mask > _DOW_FULL:
+            return _mask_to_values(self.dow_mask & _DOW_FULL) + _extended_tokens('dow', self.dow_mask)
+        return _mask_to_values(self.dow_mask)
+
+    @property
+    def schedule_key(self) -> Tuple[int, int, int, int, int]:
+        """The five field bitsets; equal for every spelling of the same schedule."""
+        return self.minute_mask, self.hour_mask, self.dom_mask, self.month_mask, self.dow_mask
+
+    @property
+    def day_or(self) -> bool:
+        """True when both day fields are restricted, so a day matches if either field does (as in cron)."""
+        return self.dom_mask != _DOM_FULL and self.dow_mask != _DOW_FULL
+
+    @property
+    def date_dependent(self) -> bool:
+        """True when the day fields use "L", "wL" or "w#n", whose days depend on the month."""
+        return bool(self.dom_mask & _DOM_LAST) or self.dow_mask > _DOW_FULL
+
+    def matches(self, when: datetime) -> bool:
+        """Return True if the schedule fires at the minute of ``when``."""
+        if not (self.minute_mask >> when.minute & 1 and self.hour_mask >> when.hour & 1 and self.month_mask >> when.month & 1):
+            return False
+        dom_match = self.dom_mask >> when.day & 1
+        dow_match = self.dow_mask >> (when.weekday() + 1) % 7 & 1  # cron counts Sunday as 0
+        if self.dom_mask & _DOM_LAST or self.dow_mask > _DOW_FULL:
+            # "L", "wL" and "w#n" are looked up in the month's table
+            days_in_month, day_bits, _ = _month_table(when.year, when.month)
+            dom_match = dom_match or (self.dom_mask & _DOM_LAST and when.day == days_in_month)
+            dow_match = self.dow_mask & day_bits[when.day]
+        if self.day_or:
+            return bool(dom_match or dow_match)
+        return bool(dom_match and dow_match)
+
+    def _days_mask(self, year: int, month: int) -> int:
+        """Return a bitset of the days of the given month on which the schedule fires."""
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        dom_days = self.dom_mask
+        dow_days = _weekday_days_mask(self.dow_mask & _DOW_FULL, (first_weekday + 1) % 7)
+        if dom_days & _DOM_LAST:
+            dom_days |= 1 << days_in_month
+        if self.dow_mask > _DOW_FULL:
+            bit_days = _month_table(year, month)[2]
+            for bit in _mask_to_values(self.dow_mask >> _DOW_NTH_BASE << _DOW_NTH_BASE):
+                dow_days |= bit_days[bit]
+        if self.day_or:
+            days = dom_days | dow_days
+        else:
+            days = dom_days & dow_days
+        return days & (((1 << days_in_month) - 1) << 1)
+
+    def runs_on(self, day: date) -> bool:
+        """Return True if the schedule fires at some minute of the given calendar day."""
+        if not (self.month_mask >> day.month & 1 and self.hour_mask and self.minute_mask):
+            return False
+        return bool(self._days_mask(day.year, day.month) >> day.day & 1)
+
+    def never_runs(self) -> bool:
+        """Return True if no calendar date satisfies the schedule, e.g. "0 0 30 2 *"."""
+        if not (self.minute_mask and self.hour_mask and self.dom_mask and self.month_mask and self.dow_mask):
+            return True
+        if self.day_or or self.dom_mask & _ALWAYS_DAYS:
+            return False
+        return not any(
+            self.dom_mask & ((1 << (_MAX_MONTH_DAYS[month] + 1)) - 1)
+            for month in _mask_to_values(self.month_mask)
+        )
+
+    def next_run(self, after: datetime) -> Optional[datetime]:
+        """Return the first run strictly after ``after``, or None if the schedule never fires.
+
+        Each field jumps straight to its next allowed value, resetting the smaller
+        fields whenever a larger one moves, instead of stepping minute by minute.
+        """
+        if self.never_runs():
+            return None
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day, hour, minute = start.year, start.month, start.day, start.hour, start.minute
+        last_year = min(start.year + _MAX_SEARCH_YEARS, 9999)
+        while year <= last_year:
+            found = _next_bit(self.month_mask, month)
+            if found == -1:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if found != month:
+                month, day, hour, minute = found, 1, 0, 0
+            found = _next_bit(self._days_mask(year, month), day)
+            if found == -1:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                continue
+            if found != day:
+                day, hour, minute = found, 0, 0
+            found = _next_bit(self.hour_mask, hour)
+            if found == -1:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if found != hour:
+                hour, minute = found, 0
+            found = _next_bit(self.minute_mask, minute)
+            if found == -1:
+                hour, minute = hour + 1, 0
+                continue
+            return datetime(year, month, day, hour, found, tzinfo=after.tzinfo)
+        return None
+
+    def prev_run(self, before: datetime) -> Optional[datetime]:
+        """Return the last run strictly before ``before``, or None if the schedule never fires."""
+        if self.never_runs():
+            return None
+        start = (before - timedelta(microseconds=1)).replace(second=0, microsecond=0)
+        year, month, day, hour, minute = start.year, start.month, start.day, start.hour, start.minute
+        first_year = max(start.year - _MAX_SEARCH_YEARS, 1)
+        while year >= first_year:
+            found = _prev_bit(self.month_mask, month)
+            if found == -1:
+                year, month, day, hour, minute = year - 1, 12, 31, 23, 59
+                continue
+            if found != month:
+                month, day, hour, minute = found, 31, 23, 59
+            found = _prev_bit(self._days_mask(year, month), day)
+            if found == -1:
+                month, day, hour, minute = month - 1, 31, 23, 59
+                continue
+            if found != day:
+                day, hour, minute = found, 23, 59
+            found = _prev_bit(self.hour_mask, hour)
+            if found == -1:
+                day, hour, minute = day - 1, 23, 59
+                continue
+            if found != hour:
+                hour, minute = found, 59
+            found = _prev_bit(self.minute_mask, minute)
+            if found == -1:
+                hour, minute = hour - 1, 59
+                continue
+            return datetime(year, month, day, hour, found, tzinfo=before.tzinfo)
+        return None
+
+    def iter_runs(self, start: datetime, end: Optional[datetime] = None) -> Iterator[datetime]:
+        """Lazily yield every run in [start, end), or forever when end is None."""
+        run = self.next_run(start - timedelta(microseconds=1))
+        while run is not None and (end is None or run < end):
+            yield run
+            run = self.next_run(run)
+
+    def _minutes_in_day(self, first: int, last: int) -> int:
+        """Return how many run minutes fall in minutes-of-day [first, last) of a matching day."""
+        count = 0
+        for hour in _mask_to_values(self.hour_mask):
+            low = max(first - hour * 60, 0)
+            high = min(last - hour * 60, 60)
+            if low < high:
+                count += _popcount(self.minute_mask & ((1 << high) - (1 << low)))
+        return count
+
+    def _matching_days(self, first: date, last: date) -> int:
+        """Return how many calendar days in [first, last] the schedule fires on, one month at a time."""
+        count = 0
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month):
+            if self.month_mask >> month & 1:
+                low = first.day if (year, month) == (first.year, first.month) else 1
+                high = last.day if (year, month) == (last.year, last.month) else 31
+                count += _popcount(self._days_mask(year, month) & ((1 << (high + 1)) - (1 << low)))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return count
+
+    def count_runs(self, start: datetime, end: datetime) -> int:
+        """Return how many runs fall in [start, end), i.e. len(list(iter_runs(start, end))).
+
+        Whole days contribute (matching days) x (hours) x (minutes), with matching days
+        counted per month from the day bitsets; only the partial days at either edge
+        are counted minute by minute. The cost is O(months), not O(runs).
+        """
+        first, last = _ceil_minute(start), _ceil_minute(end)
+        if last <= first:
+            return 0
+        first_minute = first.hour * 60 + first.minute
+        last_minute = last.hour * 60 + last.minute
+        first_day, last_day = first.date(), last.date()
+        if first_day == last_day:
+            return self._minutes_in_day(first_minute, last_minute) if self.runs_on(first_day) else 0
+        count = self._minutes_in_day(first_minute, 1440) if self.runs_on(first_day) else 0
+        if last_minute and self.runs_on(last_day):
+            count += self._minutes_in_day(0, last_minute)
+        if last_day - first_day > timedelta(days=1):
+            full_days = self._matching_days(first_day + timedelta(days=1), last_day - timedelta(days=1))
+            count += full_days * _popcount(self.hour_mask) * _popcount(self.minute_mask)
+        return count
+
+    def to_table_format(self) -> List[Tuple[str, Union[str, List[int]]]]:
+        """Return the compiled cron expression in the expanded table format."""
+        expanded_values = {
+            'minute': self.expanded_minute,
+            'hour': self.expanded_hour,
+            'dom': self.expanded_dom,
+            'month': self.expanded_month,
+            'dow': self.expanded_dow,
+        }
+        return super().to_table_format(expanded_values)
+
+
 # Class to handle table output rendering
 class TableOutput:
     def __init__(self, table_data: List[Tuple[str, Union[str, List[int]]]], name_col_length: int = 14):
         self.table_data = table_data
         self.name_col_length = name_col_length
 
-    def render(self) -> str:
-        """Render the data as a formatted table."""
-        out = ""
+    def rows(self) -> Iterator[str]:
+        """Yield each formatted row, without its newline."""
         for name, value in self.table_data:
-            if isinstance(value, list):
+            if isinstance(value, (list, tuple)):
                 value = " ".join([str(x) for x in value])
-            row = f"{_generate_padding(name, self.name_col_length)} {value}\n"
-            out += row
-        return out.rstrip()  # Remove trailing newline for exact output
+            yield f"{_generate_padding(name, self.name_col_length)} {value}"
+
+    def render(self) -> str:
+        """Render the data as a formatted table."""
+        return "\n".join(self.rows()).rstrip()  # No trailing newline for exact output
+
+    def write(self, stream: TextIO) -> None:
+        """Write the table row by row to a text stream, ending with a newline."""
+        for row in self.rows():
+            stream.write(row)
+            stream.write("\n")
+
+
+## CANONICAL SCHEDULES
+# Helper function formatting one arithmetic run of values as the shortest field item
+def _progression_items(start: int, step: int, count: int, min_val: int, max_val: int) -> List[str]:
+    end = start + step * (count - 1)
+    if count == 1:
+        return [str(start)]
+    if step == 1:
+        return [f"{start}-{end}"]
+    if count == 2:
+        return [str(start), str(end)]
+    if end + step > max_val:
+        return [f"*/{step}" if start == min_val else f"{start}/{step}"]
+    return [f"{start}-{end}/{step}"]
+
+
+# Helper function covering values with runs of consecutive values ("1-5,9,20-22")
+def _runs_items(values: List[int], min_val: int, max_val: int) -> List[Tuple[int, str]]:
+    items = []
+    index = 0
+    while index < len(values):
+        end = index
+        while end + 1 < len(values) and values[end + 1] == values[end] + 1:
+            end += 1
+        items.extend((values[index], item) for item in _progression_items(values[index], 1, end - index + 1, min_val, max_val))
+        index = end + 1
+    return items
+
+
+# Helper function finding the longest arithmetic progression (start, step, count) within a set of values
+def _longest_progression(values: List[int]) -> Tuple[int, int, int]:
+    present = set(values)
+    best = (values[0], 1, 1)
+    for i, start in enumerate(values):
+        for following in values[i + 1:]:
+            step = following - start
+            if start - step in present:
+                continue  # not the first element of its progression
+            count = 2
+            while start + step * count in present:
+                count += 1
+            if count > best[2]:
+                best = (start, step, count)
+    return best
+
+
+# Helper function returning the canonical text of one field bitset, memoized per (kind, mask)
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _canonical_field(kind: str, mask: int) -> str:
+    spec = FIELD_SPECS[kind]
+    tokens = _extended_tokens(kind, mask) if kind in ('dom', 'dow') else []
+    if tokens:
+        plain = mask & (_DOM_FULL if kind == 'dom' else _DOW_FULL)
+        return ",".join(([_canonical_field(kind, plain)] if plain else []) + tokens)
+    values = _mask_to_values(mask)
+    if values == list(spec.options):
+        return "*"
+    if not values:
+        raise ValueError(f"Empty {spec.component} field has no cron text")
+    # Candidate 1: runs of consecutive values
+    candidates = [",".join(item for _, item in _runs_items(values, spec.min_val, spec.max_val))]
+    # Candidate 2: peel off the longest step progressions, then cover what is left with runs
+    items = []
+    remaining = values
+    while remaining:
+        start, step, count = _longest_progression(remaining)
+        if count < 3:
+            items.extend(_runs_items(remaining, spec.min_val, spec.max_val))
+            break
+        items.extend((start, item) for item in _progression_items(start, step, count, spec.min_val, spec.max_val))
+        taken = set(range(start, start + step * count, step))
+        remaining = [value for value in remaining if value not in taken]
+    candidates.append(",".join(item for _, item in sorted(items)))
+    return min(candidates, key=lambda text: (len(text), text))
+
+
+# Public function returning the canonical five-field text for a schedule's bitsets
+def canonical_schedule(schedule_key: Tuple[int, int, int, int, int]) -> str:
+    """Return the shortest range/step spelling of each field, e.g. "*/15 0-12/4 * * 1-5".
+
+    Every spelling of the same schedule maps to the same text, and parsing the text
+    gives back the same bitsets.
+    """
+    return " ".join(_canonical_field(kind, mask) for kind, mask in zip(FIELD_KINDS, schedule_key))
+
+
+# Table of shared compiled schedules keyed by their bitsets; entries vanish once nothing uses them
+_schedule_intern = weakref.WeakValueDictionary()
+
+
+# Public function returning the one shared compiled object for an expression's schedule
+def intern_schedule(expression: Union[str, BaseCronExpression]) -> "CompiledCronExpression":
+    """Return the shared CompiledCronExpression for this schedule, creating it on first use.
+
+    Equivalent schedules (``*/15`` and ``0,15,30,45``) get the same object, so its run
+    computations can be done once for all of them. The shared object describes the
+    schedule only: its expression text is the canonical schedule and its command is empty.
+    """
+    if not isinstance(expression, (ExpandedCronExpression, CompiledCronExpression)):
+        expression = compile_expression(expression)
+    key = expression.schedule_key
+    shared = _schedule_intern.get(key)
+    if shared is None:
+        shared = CompiledCronExpression.__new__(CompiledCronExpression)
+        shared.cron_expression = canonical_schedule(key)
+        shared.raw_expression = shared.cron_expression.split() + ['']
+        shared.command = ''
+        shared.minute_mask, shared.hour_mask, shared.dom_mask, shared.month_mask, shared.dow_mask = key
+        _schedule_intern[key] = shared
+    return shared
+
+
+# Public function grouping expressions that share a schedule
+def group_by_schedule(expressions: Iterable[Union[str, BaseCronExpression]]) -> Dict["CompiledCronExpression", List[Union[str, BaseCronExpression]]]:
+    """Map each distinct (interned) schedule to the expressions using it, in input order."""
+    groups = {}
+    for expression in expressions:
+        groups.setdefault(intern_schedule(expression), []).append(expression)
+    return groups
+
+
+# Public function reporting how many distinct schedules are currently interned
+def interned_schedule_count() -> int:
+    """Return the number of live shared schedules."""
+    return len(_schedule_intern)
+
+
+## OUTPUT WRITERS
+# Column keys used by the structured writers, in table order
+OUTPUT_FIELDS = ('minute', 'hour', 'day_of_month', 'month', 'day_of_week', 'command')
+
+
+# Base class for output formats: turns one expression or error into text without writing anything, so worker processes can use it
+class OutputFormatter(abc.ABC):
+    separator = ""  # written between entries
+
+    def header(self) -> str:
+        """Text written once before the first entry."""
+        return ""
+
+    @abc.abstractmethod
+    def format(self, expression: BaseCronExpression, line_number: Optional[int] = None) -> str:
+        """Return the text for one Raw/Expanded/Compiled expression."""
+
+    @abc.abstractmethod
+    def format_error(self, message: str, line_number: Optional[int] = None) -> str:
+        """Return the text reporting an expression that failed to parse."""
+
+
+# Helper function mapping an expression's table rows onto OUTPUT_FIELDS
+def _output_values(expression: BaseCronExpression) -> List[Union[str, List[int]]]:
+    return [list(value) if isinstance(value, tuple) else value for _, value in expression.to_table_format()]
+
+
+# Format for the padded text table, one block per expression separated by blank lines
+class TableFormatter(OutputFormatter):
+    separator = "\n"
+
+    def __init__(self, name_col_length: int = 14):
+        self.name_col_length = name_col_length
+
+    def format(self, expression: BaseCronExpression, line_number: Optional[int] = None) -> str:
+        return TableOutput(expression.to_table_format(), self.name_col_length).render() + "\n"
+
+    def format_error(self, message: str, line_number: Optional[int] = None) -> str:
+        if line_number is None:
+            return f"Error: {message}\n"
+        return f"Error: line {line_number}: {message}\n"
+
+
+# Format for JSON Lines, one object per expression with list values for expanded fields
+class JsonLinesFormatter(OutputFormatter):
+    def format(self, expression: BaseCronExpression, line_number: Optional[int] = None) -> str:
+        record = {} if line_number is None else {'line': line_number}
+        record.update(zip(OUTPUT_FIELDS, _output_values(expression)))
+        return json.dumps(record) + "\n"
+
+    def format_error(self, message: str, line_number: Optional[int] = None) -> str:
+        record = {} if line_number is None else {'line': line_number}
+        record['error'] = message
+        return json.dumps(record) + "\n"
+
+
+# Format for CSV with a header row; expanded values are space-separated within their cell
+class CsvFormatter(OutputFormatter):
+    columns = ('line',) + OUTPUT_FIELDS + ('error',)
+
+    def _row(self, values: List) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue()
+
+    def header(self) -> str:
+        return self._row(list(self.columns))
+
+    def format(self, expression: BaseCronExpression, line_number: Optional[int] = None) -> str:
+        values = [" ".join(map(str, value)) if isinstance(value, list) else value for value in _output_values(expression)]
+        return self._row(["" if line_number is None else line_number] + values + [""])
+
+    def format_error(self, message: str, line_number: Optional[int] = None) -> str:
+        return self._row(["" if line_number is None else line_number] + [""] * len(OUTPUT_FIELDS) + [message])
+
+
+# Base class for writers that stream one entry per expression straight to a text stream, formatted by the subclass's format
+class OutputWriter(OutputFormatter):
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.entries = 0
+
+    def emit(self, text: str) -> None:
+        """Write one already formatted entry, preceded by the header or separator as needed."""
+        self.stream.write(self.header() if self.entries == 0 else self.separator)
+        self.stream.write(text)
+        self.entries += 1
+
+    def write(self, expression: BaseCronExpression, line_number: Optional[int] = None) -> None:
+        self.emit(self.format(expression, line_number))
+
+    def write_error(self, message: str, line_number: Optional[int] = None) -> None:
+        self.emit(self.format_error(message, line_number))
+
+    def write_results(self, results: Iterable[Tuple[int, Union[BaseCronExpression, ValueError]]]) -> int:
+        """Write (line number, expression or error) pairs, e.g. from parse_crontab; return the error count."""
+        failed = 0
+        for line_number, result in results:
+            if isinstance(result, ValueError):
+                self.write_error(str(result), line_number)
+                failed += 1
+            else:
+                self.write(result, line_number)
+        return failed
+
+
+# Writers streaming each format
+class TableWriter(TableFormatter, OutputWriter):
+    def __init__(self, stream: TextIO, name_col_length: int = 14):
+        OutputWriter.__init__(self, stream)
+        TableFormatter.__init__(self, name_col_length)
+
+
+class JsonLinesWriter(JsonLinesFormatter, OutputWriter):
+    pass
+
+
+class CsvWriter(CsvFormatter, OutputWriter):
+    pass
+
+
+# Formats and writers selectable with --format
+FORMATTERS = {
+    'table': TableFormatter,
+    'jsonl': JsonLinesFormatter,
+    'csv': CsvFormatter,
+}
+WRITERS = {
+    'table': TableWriter,
+    'jsonl': JsonLinesWriter,
+    'csv': CsvWriter,
+}
 
 
 ## MAIN FUNCTIONS
@@ -209,15 +1391,458 @@ def raw_cron_expression(cron_expression: str) -> str:
     return TableOutput(raw.to_table_format()).render()
 
 
+# Public function accepting any expression form and returning its compiled form
+def compile_expression(expression: Union[str, BaseCronExpression]) -> CompiledCronExpression:
+    """Return a CompiledCronExpression for a cron string, expanded expression or compiled expression."""
+    if isinstance(expression, CompiledCronExpression):
+        return expression
+    if isinstance(expression, ExpandedCronExpression):
+        return expression.compile()
+    if isinstance(expression, BaseCronExpression):
+        expression = expression.cron_expression
+    return CompiledCronExpression(expression)
+
+
+# Public function returning the canonical text of a cron expression
+def canonicalize(cron_expression: Union[str, BaseCronExpression]) -> str:
+    """Return the expression with each time field in canonical form and the command unchanged."""
+    if not isinstance(cron_expression, ExpandedCronExpression):
+        if isinstance(cron_expression, BaseCronExpression):
+            cron_expression = cron_expression.cron_expression
+        cron_expression = ExpandedCronExpression(cron_expression)
+    return cron_expression.canonical_expression
+
+
+## CRONTAB FILES
+# Number of crontab lines handed to a worker process at a time
+CRONTAB_CHUNK_SIZE = 1000
+
+
+# Helper function yielding (line number, entry) for every non-blank, non-comment line
+def _crontab_entries(lines: Iterable[str], strip: bool = True) -> Iterator[Tuple[int, str]]:
+    for line_number, line in enumerate(lines, 1):
+        entry = line.strip()
+        if entry and not entry.startswith('#'):
+            yield line_number, entry if strip else line.rstrip('\r\n')  # unstripped keeps columns true to the file
+
+
+# Helper function to read crontab entries lazily from a path or an iterable of lines
+def _read_crontab(source: Union[str, "os.PathLike[str]", Iterable[str]]) -> Iterator[Tuple[int, str]]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as handle:
+            yield from _crontab_entries(handle)
+    else:
+        yield from _crontab_entries(source)
+
+
+# Helper function to compile one chunk of entries, capturing errors per line (runs in worker processes)
+def _compile_crontab_chunk(chunk: List[Tuple[int, str]]) -> List[Tuple[int, Union["CompiledCronExpression", ValueError]]]:
+    results = []
+    for line_number, line in chunk:
+        try:
+            results.append((line_number, CompiledCronExpression(line)))
+        except ValueError as error:
+            results.append((line_number, error))
+    return results
+
+
+# Public function to parse a whole crontab, optionally spread across worker processes
+def parse_crontab(source: Union[str, "os.PathLike[str]", Iterable[str]], workers: int = 1, chunk_size: int = CRONTAB_CHUNK_SIZE) -> Iterator[Tuple[int, Union[CompiledCronExpression, ValueError]]]:
+    """Yield (line number, compiled expression or ValueError) for each entry, in input order.
+
+    The source is read lazily and at most ``2 * workers`` chunks are in flight at once,
+    so memory stays bounded however long the file is. A bad line yields its error
+    instead of stopping the batch.
+    """
+    return _map_chunks(_compile_crontab_chunk, _read_crontab(source), workers, chunk_size)
+
+
+# Helper function fanning chunks of entries out to a process pool, yielding results in input order
+def _map_chunks(func: Callable[[List[Tuple[int, str]]], list], entries: Iterator[Tuple[int, str]], workers: int, chunk_size: int) -> Iterator:
+    chunks = iter(lambda: list(islice(entries, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(func, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+## DAEMON CLIENT
+# Environment variable overriding where the parse daemon (cron_server.py) listens
+DAEMON_SOCKET_ENV = 'CRON_PARSER_SOCKET'
+
+
+# Public function returning the Unix socket path of the parse daemon
+def daemon_socket_path() -> str:
+    """Return $CRON_PARSER_SOCKET, or a socket in this user's private runtime directory.
+
+    That directory is $XDG_RUNTIME_DIR when set, otherwise a per-user 0700
+    directory in the temp directory, which the daemon creates.
+    """
+    if os.environ.get(DAEMON_SOCKET_ENV):
+        return os.environ[DAEMON_SOCKET_ENV]
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'cron_parser.sock')
+    return os.path.join(daemon_fallback_directory(), 'daemon.sock')
+
+
+# Public function returning the per-user directory holding the daemon socket when $XDG_RUNTIME_DIR is not set
+def daemon_fallback_directory() -> str:
+    return os.path.join(tempfile.gettempdir(), f"cron_parser-{os.getuid() if hasattr(os, 'getuid') else 0}")
+
+
+# Public function creating (if needed) and checking a directory only this user can enter
+def ensure_private_directory(path: str) -> None:
+    """Create path with mode 0700 unless it exists; raise PermissionError unless it is a real directory owned by this user with no group or other access."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} is not a private directory owned by this user")
+
+
+# Public function telling whether a path is a socket this user can trust: owned by this user, in a directory no other user can swap it in
+def is_trusted_socket(path: str) -> bool:
+    """Return True if path is a Unix socket owned by this user whose directory is owned by this user or root, and sticky if others can write to it."""
+    try:
+        info = os.lstat(path)
+        directory = os.stat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+    uid = os.getuid()
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != uid:
+        return False
+    return directory.st_uid in (uid, 0) and (not directory.st_mode & 0o022 or bool(directory.st_mode & stat.S_ISVTX))
+
+
+# Public function sending one line-delimited JSON request to the daemon and returning its reply
+def daemon_request(request: dict, socket_path: Optional[str] = None, timeout: float = 5.0) -> dict:
+    """Send request to the daemon and return the decoded response; raises OSError if it is unreachable."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path or daemon_socket_path())
+        connection.sendall(json.dumps(request).encode('utf-8') + b"\n")
+        with connection.makefile('rb') as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("Parse daemon closed the connection without replying")
+    return json.loads(line)
+
+
+# Daemon op answering each CLI parse command
+DAEMON_OPS = {'expanded': 'expand', 'raw': 'raw'}
+
+
+# Helper function forwarding a single CLI call to a running daemon; None means "handle it locally"
+def _forward_to_daemon(op: str, cron_expression: str) -> Optional[dict]:
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'getuid'):
+        return None
+    socket_path = daemon_socket_path()
+    if not is_trusted_socket(socket_path):
+        return None  # no daemon, or a socket another user could answer on
+    try:
+        return daemon_request({'op': op, 'expression': cron_expression}, socket_path)
+    except (OSError, ValueError):
+        return None
+
+
+## INSTRUMENTATION
+# Pipeline stages that can be timed; stages may nest (expand includes tokenize, and its bounds checks count as expand)
+STAGES = ('tokenize', 'expand', 'validate', 'compile', 'match', 'render')
+
+
+# Upper bounds of the latency histogram buckets, one per decade from 1us to 1s
+HISTOGRAM_BUCKETS = ('<1us', '<10us', '<100us', '<1ms', '<10ms', '<100ms', '<1s', '>=1s')
+
+
+# Class accumulating call counts, total time and a latency histogram for one stage
+class StageStats:
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'buckets')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS)
+
+    def record(self, elapsed_ns: int) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(max(len(str(elapsed_ns)) - 3, 0), len(HISTOGRAM_BUCKETS) - 1)] += 1
+
+    def snapshot(self) -> Dict[str, Union[int, float, Dict[str, int]]]:
+        """Return the counters with times in seconds/microseconds and the non-empty histogram buckets."""
+        return {
+            'calls': self.calls,
+            'total_s': self.total_ns / 1e9,
+            'mean_us': self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            'max_us': self.max_ns / 1e3,
+            'histogram': {label: count for label, count in zip(HISTOGRAM_BUCKETS, self.buckets) if count},
+        }
+
+
+# (owner, attribute, stage) for every instrumented hot-path function
+_INSTRUMENTED = [
+    (sys.modules[__name__], 'parse_expression', 'tokenize'),
+    (sys.modules[__name__], 'parse_field', 'tokenize'),
+    (sys.modules[__name__], 'expand_expression', 'expand'),
+    (sys.modules[__name__], 'validate_expression', 'validate'),
+    (CompiledCronExpression, '__init__', 'compile'),
+    (CompiledCronExpression, 'from_expanded', 'compile'),
+    (CompiledCronExpression, 'matches', 'match'),
+    (CompiledCronExpression, 'next_run', 'match'),
+    (CompiledCronExpression, 'prev_run', 'match'),
+    (TableOutput, 'render', 'render'),
+    (TableOutput, 'write', 'render'),
+    (JsonLinesFormatter, 'format', 'render'),
+    (CsvFormatter, 'format', 'render'),
+]
+_stage_stats = {stage: StageStats() for stage in STAGES}
+_originals: Dict[Tuple[object, str], object] = {}
+
+
+# Helper function wrapping a function so each call is timed into a stage
+def _timed(function: Callable, stats: StageStats) -> Callable:
+    def timed(*args, **kwargs):
+        started = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats.record(time.perf_counter_ns() - started)
+    timed.__wrapped__ = function
+    timed.__name__ = getattr(function, '__name__', 'timed')
+    timed.__doc__ = function.__doc__
+    return timed
+
+
+# Public functions to switch instrumentation on and off
+def enable_instrumentation() -> None:
+    """Start timing the hot-path stages.
+
+    The instrumented functions are swapped for timed wrappers only while enabled, so
+    there is no overhead at all when it is off. Only calls made through this module
+    and its classes are timed (not names imported elsewhere before enabling), and
+    only in the current process.
+    """
+    if _originals:
+        return
+    for owner, name, stage in _INSTRUMENTED:
+        original = owner.__dict__[name]
+        _originals[(owner, name)] = original
+        if isinstance(original, classmethod):
+            wrapped = classmethod(_timed(original.__func__, _stage_stats[stage]))
+        else:
+            wrapped = _timed(original, _stage_stats[stage])
+        setattr(owner, name, wrapped)
+
+
+def disable_instrumentation() -> None:
+    """Restore the uninstrumented functions; the collected stats are kept."""
+    while _originals:
+        (owner, name), original = _originals.popitem()
+        setattr(owner, name, original)
+
+
+def instrumentation_enabled() -> bool:
+    return bool(_originals)
+
+
+# Public functions to read and reset the collected stats
+def stats_snapshot() -> Dict[str, dict]:
+    """Return per-stage counters and histograms, plus field cache and intern table counters."""
+    return {
+        'stages': {stage: stats.snapshot() for stage, stats in _stage_stats.items()},
+        'field_cache': field_cache_stats(),
+        'interned_schedules': interned_schedule_count(),
+    }
+
+
+def reset_stats() -> None:
+    """Zero every stage counter and the field cache counters."""
+    for stats in _stage_stats.values():
+        stats.reset()
+    _field_cache.reset_counters()
+
+
+# Public function formatting a stats snapshot as a table, as printed by --stats
+def format_stats(snapshot: Dict[str, dict]) -> str:
+    """Return a human-readable breakdown of a stats_snapshot()."""
+    lines = [f"{'stage':<10} {'calls':>10} {'total ms':>10} {'mean us':>9} {'max us':>9}  histogram"]
+    for stage, stats in snapshot['stages'].items():
+        histogram = " ".join(f"{bucket}:{count}" for bucket, count in stats['histogram'].items())
+        lines.append(f"{stage:<10} {stats['calls']:>10} {stats['total_s'] * 1e3:>10.2f} {stats['mean_us']:>9.2f} {stats['max_us']:>9.1f}  {histogram}".rstrip())
+    cache = snapshot['field_cache']
+    lines.append(f"field cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions, {cache['size']}/{cache['maxsize']} entries")
+    lines.append(f"interned schedules: {snapshot['interned_schedules']}")
+    return "\n".join(lines)
+
 
 ## COMMAND-LINE INTERFACE
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("USAGE: python3 cron_parser.py '<cron_expression>' 'expanded / raw'")
-        sys.exit(1)
+# Expression class for each parse command
+PARSE_COMMANDS = {
+    'expanded': ExpandedCronExpression,
+    'raw': RawCronExpression,
+}
+
 
-    cron_expr = sys.argv[1]
-    parse_command = sys.argv[2]
+# Helper function formatting one chunk of batch input, capturing errors per line (runs in worker processes)
+def _render_crontab_chunk(parse_command: str, output_format: str, chunk: List[Tuple[int, str]]) -> List[Tuple[int, str, bool]]:
+    expression_class = PARSE_COMMANDS[parse_command]
+    formatter = FORMATTERS[output_format]()
+    results = []
+    for line_number, line in chunk:
+        try:
+            results.append((line_number, formatter.format(expression_class(line), line_number), True))
+        except ValueError as error:
+            results.append((line_number, formatter.format_error(str(error), line_number), False))
+    return results
+
+
+# Batch mode: stream many expressions through one interpreter instead of one process per expression
+def run_batch(parse_command: str, lines: Iterable[str], out: TextIO, err: TextIO, jobs: int = 1, chunk_size: int = CRONTAB_CHUNK_SIZE, output_format: str = 'table') -> int:
+    """Format every expression in lines to out, in order, and a summary to err; return the error count."""
+    started = time.perf_counter()
+    succeeded = failed = 0
+    writer = WRITERS[output_format](out)
+    render_chunk = partial(_render_crontab_chunk, parse_command, output_format)
+    for line_number, text, ok in _map_chunks(render_chunk, _crontab_entries(lines), jobs, chunk_size):
+        writer.emit(text)
+        if ok:
+            succeeded += 1
+        else:
+            failed += 1
+    elapsed = time.perf_counter() - started
+    total = succeeded + failed
+    rate = total / elapsed if elapsed else 0.0
+    err.write(f"Processed {total} expressions: {succeeded} ok, {failed} errors in {elapsed:.3f}s ({rate:.0f}/s)\n")
+    return failed
+
+
+# Helper function validating one chunk of batch input (runs in worker processes)
+def _validate_crontab_chunk(chunk: List[Tuple[int, str]]) -> List[Tuple[int, List[ValidationError]]]:
+    return [(line_number, validate_expression(line)) for line_number, line in chunk]
+
+
+# Validate-only batch mode: report every error with its location, without expanding any field
+def run_validate(lines: Iterable[str], out: TextIO, err: TextIO, source: str = '<stdin>', jobs: int = 1, chunk_size: int = CRONTAB_CHUNK_SIZE) -> int:
+    """Write one "source:line:column: field: message" line per error to out and a summary to err; return the invalid line count."""
+    started = time.perf_counter()
+    valid = invalid = 0
+    for line_number, errors in _map_chunks(_validate_crontab_chunk, _crontab_entries(lines, strip=False), jobs, chunk_size):
+        if errors:
+            invalid += 1
+            for error in errors:
+                out.write(f"{source}:{line_number}:{error.start + 1}: {error.field}: {error.message}\n")
+        else:
+            valid += 1
+    elapsed = time.perf_counter() - started
+    total = valid + invalid
+    rate = total / elapsed if elapsed else 0.0
+    err.write(f"Validated {total} expressions: {valid} valid, {invalid} invalid in {elapsed:.3f}s ({rate:.0f}/s)\n")
+    return invalid
+
+
+# Usage printed when neither a single expression nor a batch mode is given
+USAGE = """USAGE: python3 cron_parser.py '<cron_expression>' 'expanded / raw' [--format table|jsonl|csv]
+       python3 cron_parser.py --batch expanded|raw [--jobs N] [--input FILE] [--format table|jsonl|csv] [--stats]
+       python3 cron_parser.py --validate [--jobs N] [--input FILE]
+       python3 cron_parser.py serve [--socket PATH]
+       python3 cron_parser.py histogram [--input FILE] [--start ISO] [--horizon day|week|month|year|DAYS] [--top N]"""
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cron_parser.py", description="Expand, echo or validate one cron expression, or many in one process.")
+    parser.add_argument('cron_expression', nargs='?', help="expression to parse (single-expression mode)")
+    parser.add_argument('parse_command', nargs='?', help="'expanded' or 'raw' (single-expression mode)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--batch', choices=sorted(PARSE_COMMANDS), help="how to render each expression")
+    mode.add_argument('--validate', action='store_true', help="only check each expression, reporting every error with its line and column")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes to spread the input over")
+    parser.add_argument('--input', default='-', help="file with one expression per line ('-' for stdin)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='table', help="output format")
+    parser.add_argument('--stats', action='store_true', help="print a per-stage timing breakdown to stderr; with --jobs above 1 the worker processes' counts are not merged in, so only this process's work is reported")
+    return parser
+
+
+# Main entry point for the command line; returns the process exit status
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'serve':
+        from cron_server import main as serve_main  # only the daemon needs asyncio
+        return serve_main(argv[1:])
+    if argv and argv[0] == 'histogram':
+        from cron_analysis import main as histogram_main  # cron_analysis imports this module
+        return histogram_main(argv[1:])
+    parser = _build_parser()
+    args = parser.parse_intermixed_args(argv)  # options may sit between the expression and the parse command
+    if args.batch or args.validate:
+        if args.cron_expression is not None:
+            parser.error("a cron expression cannot be given with --batch or --validate; pass expressions with --input")
+        if args.stats:
+            reset_stats()
+            enable_instrumentation()
+        try:
+            if args.validate:
+                run = partial(run_validate, source='<stdin>' if args.input == '-' else args.input, jobs=args.jobs)
+            else:
+                run = partial(run_batch, args.batch, jobs=args.jobs, output_format=args.format)
+            if args.input == '-':
+                failed = run(sys.stdin, sys.stdout, sys.stderr)
+            else:
+                with open(args.input) as handle:
+                    failed = run(handle, sys.stdout, sys.stderr)
+        finally:
+            if args.stats:
+                disable_instrumentation()
+                sys.stderr.write(format_stats(stats_snapshot()) + "\n")
+        return 1 if failed else 0
+
+    if args.parse_command is None:
+        print(USAGE)
+        return 1
+    if args.jobs != 1 or args.input != '-' or args.stats:
+        parser.error("--jobs, --input and --stats only apply to --batch and --validate")
+
+    cron_expr = args.cron_expression
+    parse_command = args.parse_command
+    if args.format != 'table':
+        expression_class = PARSE_COMMANDS.get(parse_command.lower())
+        writer = WRITERS[args.format](sys.stdout)
+        try:
+            if expression_class is None:
+                raise ValueError(f"Invalid parse command: {parse_command}")
+            writer.write(expression_class(cron_expr))
+        except ValueError as e:
+            writer.write_error(str(e))
+            return 1
+        return 0
+    if isinstance(parse_command, str) and parse_command.lower() in PARSE_COMMANDS:
+        response = _forward_to_daemon(DAEMON_OPS[parse_command.lower()], cron_expr)
+        if response is not None:
+            if response.get('ok'):
+                print(response['result'])
+                return 0
+            print(f"Error: {response.get('error')}")
+            return 1
     try:
         if not isinstance(parse_command, str):
             raise ValueError(f"Invalid parse command: {parse_command}")
@@ -229,4 +1854,9 @@ if __name__ == "__main__":
             raise ValueError(f"Invalid parse command: {parse_command}")
     except ValueError as e:
         print(f"Error: {e}")
-        sys.exit(1)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple, Union
+
+from cron_parser import FIELD_KINDS, CompiledCronExpression, ExpandedCronExpression, ExpandedField, expand_field, parse_expression
+
+# Default number of distinct expressions kept by an ExpressionRegistry
+REGISTRY_SIZE = 65536
+
+
+## CLASSES
+# Class holding a fully expanded and compiled expression that can never change, so threads share it without locks
+class FrozenCronExpression(CompiledCronExpression):
+    """Compiled expression with every field expanded up front and no mutable state.
+
+    Every field is expanded (and so validated) by the constructor, which raises
+    ValueError for an invalid expression. Afterwards nothing is computed lazily and
+    assigning any attribute raises AttributeError, so one instance can be read by
+    any number of threads at once. The expanded fields are the field cache's shared tuples.
+    """
+    __slots__ = ('fields',)
+
+    def __init__(self, cron_expression: str):
+        raw_expression = tuple(parse_expression(cron_expression))
+        self._freeze(cron_expression, raw_expression, tuple(expand_field(kind, text) for kind, text in zip(FIELD_KINDS, raw_expression)))
+
+    def _freeze(self, cron_expression: str, raw_expression: Tuple[str, ...], fields: Tuple[ExpandedField, ...]) -> None:
+        state = {'cron_expression': cron_expression, 'raw_expression': raw_expression, 'command': raw_expression[5], 'fields': fields}
+        state.update((f"{kind}_mask", field.mask) for kind, field in zip(FIELD_KINDS, fields))
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_expanded(cls, expanded: ExpandedCronExpression) -> "FrozenCronExpression":
+        """Freeze an already expanded expression, expanding any field it has not read yet."""
+        frozen = cls.__new__(cls)
+        frozen._freeze(expanded.cron_expression, tuple(expanded.raw_expression), tuple(expanded.expanded_field(kind) for kind in FIELD_KINDS))
+        return frozen
+
+    @classmethod
+    def from_masks(cls, cron_expression: str, minute_mask: int, hour_mask: int, dom_mask: int, month_mask: int, dow_mask: int) -> "FrozenCronExpression":
+        """Freeze an expression from its bitsets, e.g. loaded from disk, without expanding any field."""
+        compiled = CompiledCronExpression.from_masks(cron_expression, minute_mask, hour_mask, dom_mask, month_mask, dow_mask)
+        fields = tuple(
+            ExpandedField(tuple(getattr(compiled, f"expanded_{kind}")), getattr(compiled, f"{kind}_mask")) for kind in FIELD_KINDS
+        )
+        frozen = cls.__new__(cls)
+        frozen._freeze(cron_expression, tuple(compiled.raw_expression), fields)
+        return frozen
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return type(self), (self.cron_expression,)
+
+    def expanded_field(self, kind: str) -> ExpandedField:
+        """Return one field's (values, mask) expansion."""
+        return self.fields[FIELD_KINDS.index(kind)]
+
+    @property
+    def expanded_minute(self) -> Tuple[int, ...]:
+        return self.fields[0].values
+
+    @property
+    def expanded_hour(self) -> Tuple[int, ...]:
+        return self.fields[1].values
+
+    @property
+    def expanded_dom(self) -> Tuple[Union[int, str], ...]:
+        return self.fields[2].values
+
+    @property
+    def expanded_month(self) -> Tuple[int, ...]:
+        return self.fields[3].values
+
+    @property
+    def expanded_dow(self) -> Tuple[Union[int, str], ...]:
+        return self.fields[4].values
+
+
+# Class sharing one FrozenCronExpression per expression text between threads, computing each at most once at a time
+class ExpressionRegistry:
+    """Thread-safe map from expression text to its FrozenCronExpression, or the ValueError it raised.
+
+    Lookups of known expressions take no lock. On a miss exactly one thread (the
+    first to ask) expands the expression; threads asking for the same text
+    meanwhile wait for that result instead of repeating the work. Invalid
+    expressions are remembered too. Beyond ``maxsize`` entries the oldest are
+    dropped first.
+    """
+
+    def __init__(self, maxsize: int = REGISTRY_SIZE):
+        self.maxsize = maxsize
+        self._entries: Dict[str, Union[FrozenCronExpression, ValueError]] = {}  # only changed while holding _lock
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.waited = 0
+        self.evictions = 0
+
+    def resolve(self, cron_expression: str) -> Union[FrozenCronExpression, ValueError]:
+        """Return the shared expression for the text, or the ValueError it raises, expanding it on first use."""
+        entry = self._entries.get(cron_expression)
+        if entry is None:
+            entry = self._compute(cron_expression)
+        return entry
+
+    def get(self, cron_expression: str) -> FrozenCronExpression:
+        """Return the shared expression for the text; raises (a copy of) its ValueError if it is invalid."""
+        entry = self.resolve(cron_expression)
+        if isinstance(entry, ValueError):
+            raise copy.copy(entry)  # each caller gets its own traceback
+        return entry
+
+    def validate(self, cron_expression: str) -> Optional[ValueError]:
+        """Return the ValueError of an invalid expression, or None if it is valid."""
+        entry = self.resolve(cron_expression)
+        return entry if isinstance(entry, ValueError) else None
+
+    def _compute(self, cron_expression: str) -> Union[FrozenCronExpression, ValueError]:
+        with self._lock:
+            entry = self._entries.get(cron_expression)
+            if entry is not None:
+                return entry
+            pending = self._pending.get(cron_expression)
+            if pending is None:
+                pending = self._pending[cron_expression] = Future()
+                self.computed += 1
+                owner = True
+            else:
+                self.waited += 1
+                owner = False
+        if not owner:
+            return pending.result()
+        try:
+            entry = FrozenCronExpression(cron_expression)
+        except ValueError as error:
+            entry = error.with_traceback(None)
+        except BaseException as error:  # not a verdict on the expression (e.g. a non-str key): let the next caller retry
+            with self._lock:
+                del self._pending[cron_expression]
+            pending.set_exception(error)
+            raise
+        with self._lock:
+            self._entries[cron_expression] = entry
+            del self._pending[cron_expression]
+            while len(self._entries) > max(self.maxsize, 0):
+                del self._entries[next(iter(self._entries))]
+                self.evictions += 1
+        pending.set_result(entry)
+        return entry
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters; expansions in progress still complete."""
+        with self._lock:
+            self._entries.clear()
+            self.computed = self.waited = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many expressions were expanded, how many callers waited for another thread, and the size."""
+        with self._lock:
+            return {
+                'computed': self.computed,
+                'waited': self.waited,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def __contains__(self, cron_expression: str) -> bool:
+        return cron_expression in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_shared_registry = ExpressionRegistry()
+
+
+## PUBLIC FUNCTIONS
+# Public function returning the process-wide shared expression for a text
+def shared_expression(cron_expression: str) -> FrozenCronExpression:
+    """Return the FrozenCronExpression for the text from the process-wide registry; raises ValueError if invalid."""
+    return _shared_registry.get(cron_expression)
+
+
+# Public function returning the process-wide registry, e.g. to read its stats or clear it
+def shared_registry() -> ExpressionRegistry:
+    return _shared_registry
+
@@ -0,0 +1,189 @@
+import asyncio
+import heapq
+import inspect
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+from cron_parser import BaseCronExpression, CompiledCronExpression, compile_expression
+
+logger = logging.getLogger(__name__)
+
+# A job action receives the scheduled fire time; it may be a coroutine function or a plain callable
+JobAction = Callable[[datetime], Union[Awaitable[None], None]]
+
+
+## CLOCKS
+# Clock backed by the real wall clock and asyncio.sleep
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+# Clock whose sleep advances simulated time instantly, so tests can cover days of runs in milliseconds
+class SimulatedClock:
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    async def sleep(self, seconds: float) -> None:
+        self.current += timedelta(seconds=seconds)
+        await asyncio.sleep(0)
+
+
+## CLASSES
+# A job registered with the scheduler, with its next fire time and run statistics
+class ScheduledJob:
+    def __init__(self, job_id: Hashable, expression: CompiledCronExpression, action: Optional[JobAction]):
+        self.job_id = job_id
+        self.expression = expression
+        self.action = action
+        self.next_run: Optional[datetime] = None
+        self.runs = 0
+        self.failures = 0
+        self.last_error: Optional[BaseException] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+    async def execute(self, fire_time: datetime) -> None:
+        """Run the action, or the expression's command in a shell when there is no action."""
+        if self.action is None:
+            process = await asyncio.create_subprocess_shell(self.expression.command)
+            returncode = await process.wait()
+            if returncode != 0:
+                raise RuntimeError(f"Command exited with status {returncode}: {self.expression.command}")
+            return
+        result = self.action(fire_time)
+        if inspect.isawaitable(result):
+            await result
+
+
+# Class running jobs at their cron times from a min-heap keyed on next fire time
+class CronScheduler:
+    def __init__(self, max_concurrency: int = 10, clock=None):
+        self.clock = clock if clock is not None else SystemClock()
+        self.max_concurrency = max_concurrency
+        self._jobs: Dict[Hashable, ScheduledJob] = {}
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        self._sequence = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def add_job(self, job_id: Hashable, expression: Union[str, BaseCronExpression], action: Optional[JobAction] = None) -> ScheduledJob:
+        """Register a job, replacing any job with the same id; without an action the command is run in a shell."""
+        if job_id in self._jobs:
+            self.cancel(job_id)
+        job = ScheduledJob(job_id, compile_expression(expression), action)
+        self._jobs[job_id] = job
+        self._schedule(job, job.expression.next_run(self.clock.now()))
+        return job
+
+    def cancel(self, job_id: Hashable) -> None:
+        """Unregister a job and cancel any of its runs still in progress; raises KeyError if unknown."""
+        job = self._jobs.pop(job_id)
+        job.next_run = None
+        for task in list(job.tasks):
+            task.cancel()
+        self._wake()
+
+    def get_job(self, job_id: Hashable) -> Optional[ScheduledJob]:
+        return self._jobs.get(job_id)
+
+    def stop(self) -> None:
+        """Ask run() to return once the runs already started have finished."""
+        self._stopping = True
+        self._wake()
+
+    def _schedule(self, job: ScheduledJob, fire_time: Optional[datetime]) -> None:
+        """Push the job's next fire time onto the heap (None means the schedule never fires again)."""
+        job.next_run = fire_time
+        if fire_time is not None:
+            self._sequence += 1
+            heapq.heappush(self._heap, (fire_time, self._sequence, job.job_id))
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop_stale(self) -> None:
+        """Drop heap entries for cancelled or rescheduled jobs (entries are removed lazily)."""
+        while self._heap:
+            fire_time, _, job_id = self._heap[0]
+            job = self._jobs.get(job_id)
+            if job is not None and job.next_run == fire_time:
+                return
+            heapq.heappop(self._heap)
+
+    async def _sleep(self, seconds: Optional[float]) -> None:
+        """Sleep on the clock until the delay passes or a job change wakes the loop."""
+        if self._wakeup.is_set():
+            self._wakeup.clear()
+            return
+        waiter = asyncio.ensure_future(self._wakeup.wait())
+        waits = {waiter}
+        if seconds is not None:
+            waits.add(asyncio.ensure_future(self.clock.sleep(seconds)))
+        try:
+            await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in waits:
+                task.cancel()
+        self._wakeup.clear()
+
+    async def _run_job(self, job: ScheduledJob, fire_time: datetime, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                await job.execute(fire_time)
+                job.runs += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                job.runs += 1
+                job.failures += 1
+                job.last_error = error
+                logger.exception("Cron job %r failed for %s", job.job_id, fire_time)
+
+    async def run(self, until: Optional[datetime] = None) -> None:
+        """Dispatch due jobs until stop() is called or, if given, the clock reaches ``until``.
+
+        The loop sleeps exactly until the earliest fire time in the heap. At most
+        ``max_concurrency`` runs execute at once; the rest wait their turn. Runs
+        missed while the process was suspended are coalesced into one.
+        """
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        running: Set[asyncio.Task] = set()
+        try:
+            while not self._stopping:
+                self._pop_stale()
+                if not self._heap:
+                    if until is not None:
+                        break
+                    await self._sleep(None)
+                    continue
+                fire_time, _, job_id = self._heap[0]
+                if until is not None and fire_time >= until:
+                    break
+                delay = (fire_time - self.clock.now()).total_seconds()
+                if delay > 0:
+                    await self._sleep(delay)
+                    continue
+                heapq.heappop(self._heap)
+                job = self._jobs[job_id]
+                task = asyncio.ensure_future(self._run_job(job, fire_time, semaphore))
+                for tasks in (running, job.tasks):
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                self._schedule(job, job.expression.next_run(max(fire_time, self.clock.now())))
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        finally:
+            for task in running:
+                task.cancel()
+            self._wakeup = None
@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import errno
+import json
+import os
+import signal
+import stat
+import sys
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from cron_parser import (
+    FIELD_CACHE_SIZE,
+    CompiledCronExpression,
+    LRUCache,
+    TableOutput,
+    daemon_fallback_directory,
+    daemon_request,
+    daemon_socket_path,
+    ensure_private_directory,
+    raw_cron_expression,
+)
+
+# Upper bound on how many run times one next_run request may ask for
+MAX_RUN_COUNT = 1000
+
+
+## CLASSES
+# Parse daemon answering line-delimited JSON requests over a Unix domain socket.
+#
+# Each request is one JSON object per line, e.g.
+#   {"op": "expand", "expression": "*/15 0 1,15 * 1-5 /usr/bin/find"}
+#   {"op": "next_run", "expression": "...", "after": "2024-01-01T00:00", "count": 3}
+# and each reply is one JSON object per line: {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+# Supported ops are expand, raw, validate, next_run, stats and ping.
+class CronServer:
+    def __init__(self, socket_path: Optional[str] = None, cache_size: int = FIELD_CACHE_SIZE):
+        self.socket_path = socket_path or daemon_socket_path()
+        self.ready = threading.Event()
+        self._expressions = LRUCache(cache_size)  # warm compiled expressions, keyed by expression text
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+
+    def compiled(self, expression: str) -> CompiledCronExpression:
+        """Return the compiled expression, from the warm cache when it was seen before."""
+        compiled = self._expressions.get(expression)
+        if compiled is None:
+            compiled = CompiledCronExpression(expression)
+            self._expressions.put(expression, compiled)
+        return compiled
+
+    def handle(self, request: dict) -> dict:
+        """Answer one decoded request."""
+        try:
+            op = request.get('op')
+            if op == 'ping':
+                return {'ok': True, 'result': 'pong'}
+            if op == 'stats':
+                return {'ok': True, 'result': self._expressions.stats()}
+            expression = request.get('expression')
+            if not isinstance(expression, str):
+                raise ValueError("Request needs an 'expression' string")
+            if op == 'expand':
+                return {'ok': True, 'result': TableOutput(self.compiled(expression).to_table_format()).render()}
+            if op == 'raw':
+                return {'ok': True, 'result': raw_cron_expression(expression)}
+            if op == 'validate':
+                try:
+                    self.compiled(expression)
+                except ValueError as error:
+                    return {'ok': True, 'result': {'valid': False, 'error': str(error)}}
+                return {'ok': True, 'result': {'valid': True}}
+            if op == 'next_run':
+                return {'ok': True, 'result': self._next_runs(expression, request)}
+            raise ValueError(f"Unknown op: {op!r}")
+        except (ValueError, TypeError) as error:
+            return {'ok': False, 'error': str(error)}
+
+    def _next_runs(self, expression: str, request: dict) -> List[str]:
+        after = datetime.fromisoformat(request['after']) if request.get('after') else datetime.now()
+        count = int(request.get('count', 1))
+        if not 1 <= count <= MAX_RUN_COUNT:
+            raise ValueError(f"count must be between 1 and {MAX_RUN_COUNT}")
+        runs = []
+        compiled = self.compiled(expression)
+        for _ in range(count):
+            after = compiled.next_run(after)
+            if after is None:
+                break
+            runs.append(after.isoformat())
+        return runs
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    response = self.handle(request) if isinstance(request, dict) else {'ok': False, 'error': "Request must be a JSON object"}
+                except ValueError as error:
+                    response = {'ok': False, 'error': f"Invalid JSON: {error}"}
+                writer.write(json.dumps(response).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _claim_socket_path(self) -> None:
+        """Make the socket path free to bind, refusing to replace a live daemon or another user's file."""
+        if os.path.dirname(os.path.abspath(self.socket_path)) == daemon_fallback_directory():
+            ensure_private_directory(daemon_fallback_directory())
+        try:
+            info = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        try:
+            daemon_request({'op': 'ping'}, self.socket_path, timeout=1.0)
+        except (OSError, ValueError):
+            pass  # nothing answers: the socket was left behind by a daemon that did not shut down cleanly
+        else:
+            raise OSError(errno.EADDRINUSE, "A parse daemon is already serving this socket", self.socket_path)
+        if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+            raise PermissionError(errno.EEXIST, "Refusing to remove a file that is not this user's socket", self.socket_path)
+        os.unlink(self.socket_path)
+
+    async def serve(self) -> None:
+        """Listen on the socket until stop() is called, serving clients concurrently."""
+        self._claim_socket_path()
+        self._loop = asyncio.get_running_loop()
+        previous_umask = os.umask(0o077)  # the socket is created 0600: no window in which others can connect
+        try:
+            self._server = await asyncio.start_unix_server(self._serve_client, path=self.socket_path)
+        finally:
+            os.umask(previous_umask)
+        self.ready.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.ready.clear()
+
+    def stop(self) -> None:
+        """Stop serving; safe to call from any thread."""
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+
+## COMMAND-LINE INTERFACE
+# Run the daemon until SIGTERM or SIGINT, so the socket file is always removed on shutdown
+async def _serve_until_signalled(server: CronServer) -> None:
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, server.stop)
+    await server.serve()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="cron_parser.py serve", description="Run the cron parse daemon on a Unix domain socket.")
+    parser.add_argument('--socket', default=None, help="socket path (default: $CRON_PARSER_SOCKET, else in $XDG_RUNTIME_DIR or a private per-user temp directory)")
+    parser.add_argument('--cache-size', type=int, default=FIELD_CACHE_SIZE, help="compiled expressions kept warm")
+    args = parser.parse_args(argv)
+    server = CronServer(args.socket, args.cache_size)
+    print(f"Serving on {server.socket_path}")
+    try:
+        asyncio.run(_serve_until_signalled(server))
+    except OSError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+import bisect
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from cron_parser import BaseCronExpression, CompiledCronExpression, compile_expression
+
+# zoneinfo is in the standard library from Python 3.9; on 3.8 the backports.zoneinfo package provides it
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        from backports.zoneinfo import ZoneInfo
+    except ImportError:
+        ZoneInfo = None
+
+# Policies for local times that do not exist (spring forward) or occur twice (fall back)
+NONEXISTENT_POLICIES = ('shift', 'skip')
+AMBIGUOUS_POLICIES = ('first', 'last', 'both')
+
+# Spacing of the offset samples used to find transitions; no zone changes offset twice within it
+_SAMPLE_STEP = timedelta(hours=6)
+_DAY = timedelta(days=1)
+
+
+## TRANSITION CACHE
+# Class holding one zone's UTC offset transitions, computed a year at a time on first use
+class ZoneTransitions:
+    """UTC instants at which a zone's offset changes, with the offset in force after each.
+
+    Loading a year samples the zone every six hours and bisects each change down to
+    the second. After that, every offset lookup and every local-to-UTC conversion is
+    a bisect over the cached instants, with no calls into the tz database.
+    """
+
+    def __init__(self, zone: tzinfo):
+        self.zone = zone
+        self._years: Dict[int, Tuple[List[datetime], List[timedelta]]] = {}
+
+    def _offset(self, instant: datetime) -> timedelta:
+        """Ask the zone for its offset at a naive UTC instant (uncached)."""
+        return instant.replace(tzinfo=timezone.utc).astimezone(self.zone).utcoffset()
+
+    def _load_year(self, year: int) -> Tuple[List[datetime], List[timedelta]]:
+        """Return ([instants], [offsets]): offsets[0] holds from Jan 1, offsets[i] from instants[i - 1]."""
+        instants: List[datetime] = []
+        offsets = [self._offset(datetime(year, 1, 1))]
+        sample = datetime(year, 1, 1)
+        end = datetime(year + 1, 1, 1) if year < 9999 else datetime.max
+        while sample < end:
+            following = min(sample + _SAMPLE_STEP, end)
+            offset = self._offset(following) if following < end else offsets[-1]
+            if offset != offsets[-1]:
+                low, high = sample, following  # the offset changes at some second in (low, high]
+                while high - low > timedelta(seconds=1):
+                    middle = low + (high - low) // 2
+                    middle -= timedelta(microseconds=middle.microsecond)
+                    if middle <= low:
+                        middle = low + timedelta(seconds=1)
+                    if self._offset(middle) == offsets[-1]:
+                        low = middle
+                    else:
+                        high = middle
+                instants.append(high)
+                offsets.append(offset)
+            sample = following
+        return instants, offsets
+
+    def _year(self, year: int) -> Tuple[List[datetime], List[timedelta]]:
+        data = self._years.get(year)
+        if data is None:
+            data = self._years[year] = self._load_year(year)
+        return data
+
+    def offset_at(self, instant: datetime) -> timedelta:
+        """Return the UTC offset in force at a naive UTC instant."""
+        instants, offsets = self._year(instant.year)
+        return offsets[bisect.bisect_right(instants, instant)]
+
+    def transition_before(self, instant: datetime) -> Optional[datetime]:
+        """Return the latest transition at or before a naive UTC instant, looking back one year at most."""
+        for year in (instant.year, instant.year - 1):
+            instants, _ = self._year(year)
+            index = bisect.bisect_right(instants, instant)
+            if index:
+                return instants[index - 1]
+            instant = datetime(year, 1, 1)
+        return None
+
+    def steady_span(self, instant: datetime) -> Optional[Tuple[timedelta, datetime]]:
+        """Return (offset, until) when no transition falls in [instant - 1 day, until + 1 day], else None.
+
+        Inside such a span the zone is a fixed offset: every wall time maps to exactly
+        one instant, so runs can be converted without any gap or fold checks.
+        """
+        instants, offsets = self._year(instant.year)
+        index = bisect.bisect_right(instants, instant)
+        previous = instants[index - 1] if index else self.transition_before(instant)
+        if previous is not None and instant - previous < _DAY:
+            return None
+        if index < len(instants):
+            following = instants[index]
+        else:
+            later, _ = self._year(instant.year + 1) if instant.year < 9998 else ([], [])
+            following = later[0] if later else datetime(min(instant.year + 2, 9999), 1, 1)
+        return offsets[index], following - _DAY
+
+    def nearby_offsets(self, instant: datetime) -> Tuple[timedelta, timedelta]:
+        """Return the lowest and highest offsets in force within a day either side of an instant."""
+        offsets = (self.offset_at(instant - _DAY), self.offset_at(instant), self.offset_at(instant + _DAY))
+        return min(offsets), max(offsets)
+
+    def to_utc(self, wall: datetime) -> List[datetime]:
+        """Return the naive UTC instants showing a naive wall time: none in a gap, two in a fold."""
+        low, high = self.nearby_offsets(wall)
+        instants = []
+        for offset in sorted({high, low}, reverse=True):  # the larger offset gives the earlier instant
+            instant = wall - offset
+            if self.offset_at(instant) == offset:
+                instants.append(instant)
+        return instants
+
+    def to_local(self, instant: datetime) -> datetime:
+        """Return a naive UTC instant as an aware local datetime, with fold=1 for the second of two."""
+        span = self.steady_span(instant)
+        if span is not None:
+            return (instant + span[0]).replace(tzinfo=self.zone)
+        wall = instant + self.offset_at(instant)
+        instants = self.to_utc(wall)
+        fold = 1 if len(instants) == 2 and instants[1] == instant else 0
+        return wall.replace(tzinfo=self.zone, fold=fold)
+
+
+_zone_cache: Dict[tzinfo, ZoneTransitions] = {}
+
+
+# Public function returning the shared transition cache of a zone
+def zone_transitions(zone: Union[str, tzinfo]) -> ZoneTransitions:
+    """Return the cached ZoneTransitions of a zone (an IANA name or a tzinfo)."""
+    if isinstance(zone, str):
+        if ZoneInfo is None:
+            raise ImportError("zone names need zoneinfo (Python 3.9+) or the backports.zoneinfo package")
+        zone = ZoneInfo(zone)
+    transitions = _zone_cache.get(zone)
+    if transitions is None:
+        transitions = _zone_cache[zone] = ZoneTransitions(zone)
+    return transitions
+
+
+def clear_zone_cache() -> None:
+    """Drop every cached zone transition table."""
+    _zone_cache.clear()
+
+
+## CLASSES
+# Class computing run times of a cron expression read as local time in a zone
+class ZonedCronExpression:
+    """A cron expression whose fields are local wall-clock times in ``zone``.
+
+    Policy for local times that do not exist (the hour skipped when clocks go forward):
+      * ``nonexistent='shift'`` (default): the run happens once, at the first instant
+        after the gap (e.g. 03:00 when 02:00-02:59 is skipped). Several skipped runs
+        collapse into that single run, and into a regular run at the same instant.
+      * ``nonexistent='skip'``: runs in the gap are dropped.
+
+    Policy for local times that occur twice (the hour repeated when clocks go back):
+      * ``ambiguous='first'`` (default): run only at the first occurrence, so a daily
+        01:30 job runs once. Jobs such as ``*/15 * * * *`` therefore pause for the
+        repeated hour rather than double-firing.
+      * ``ambiguous='last'``: run only at the second occurrence.
+      * ``ambiguous='both'``: run at both occurrences (elapsed-time semantics).
+
+    Run times are returned as aware datetimes in ``zone``, with ``fold=1`` marking the
+    second occurrence of a repeated local time.
+    """
+
+    def __init__(self, expression: Union[str, BaseCronExpression], zone: Union[str, tzinfo], nonexistent: str = 'shift', ambiguous: str = 'first'):
+        if nonexistent not in NONEXISTENT_POLICIES:
+            raise ValueError(f"nonexistent must be one of {', '.join(NONEXISTENT_POLICIES)}, got {nonexistent!r}")
+        if ambiguous not in AMBIGUOUS_POLICIES:
+            raise ValueError(f"ambiguous must be one of {', '.join(AMBIGUOUS_POLICIES)}, got {ambiguous!r}")
+        self.compiled: CompiledCronExpression = compile_expression(expression)
+        self.transitions = zone_transitions(zone)
+        self.zone = self.transitions.zone
+        self.nonexistent = nonexistent
+        self.ambiguous = ambiguous
+
+    def _instants(self, wall: datetime) -> List[datetime]:
+        """Return the UTC instants at which a matching wall time fires under the policies."""
+        instants = self.transitions.to_utc(wall)
+        if not instants:
+            if self.nonexistent == 'skip':
+                return []
+            low, _ = self.transitions.nearby_offsets(wall)
+            return [self.transitions.transition_before(wall - low)]
+        if len(instants) == 2 and self.ambiguous != 'both':
+            return [instants[0] if self.ambiguous == 'first' else instants[1]]
+        return instants
+
+    def _next_instant(self, after: datetime) -> Optional[datetime]:
+        """Return the first firing instant strictly after a naive UTC instant."""
+        span = self.transitions.steady_span(after)
+        if span is not None:
+            # Fast path away from transitions: one fixed offset, one instant per wall time
+            offset, until = span
+            wall = self.compiled.next_run(after + offset)
+            if wall is None:
+                return None
+            if wall - offset <= until:
+                return wall - offset
+        low = min(self.transitions.offset_at(after), self.transitions.offset_at(after + _DAY))
+        wall = after + low  # no earlier wall time can fire after ``after``
+        best = bound = None
+        while True:
+            wall = self.compiled.next_run(wall)
+            if wall is None or (bound is not None and wall > bound):
+                return best
+            for instant in self._instants(wall):
+                if instant > after and (best is None or instant < best):
+                    best = instant
+                    # wall times past this one can only fire later, unless a fold reorders them
+                    bound = best + max(self.transitions.offset_at(after), self.transitions.offset_at(best))
+
+    @staticmethod
+    def _utc(when: datetime) -> datetime:
+        if when.tzinfo is None or when.utcoffset() is None:
+            raise ValueError("ZonedCronExpression needs timezone-aware datetimes")
+        return when.astimezone(timezone.utc).replace(tzinfo=None)
+
+    def next_run(self, after: datetime) -> Optional[datetime]:
+        """Return the first run strictly after the instant ``after``, as a datetime in the zone."""
+        instant = self._next_instant(self._utc(after))
+        return None if instant is None else self.transitions.to_local(instant)
+
+    def iter_runs(self, start: datetime, end: Optional[datetime] = None) -> Iterator[datetime]:
+        """Lazily yield every run in [start, end) by instant, or forever when end is None."""
+        stop = None if end is None else self._utc(end)
+        instant = self._next_instant(self._utc(start) - timedelta(microseconds=1))
+        while instant is not None and (stop is None or instant < stop):
+            yield self.transitions.to_local(instant)
+            instant = self._next_instant(instant)
@@ -0,0 +1,187 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from itertools import islice
+from cron_analysis import TimelineRun, load_histogram, merged_timeline, occurrence_matrix, occurrence_counts, window_minutes, np
+from cron_parser import CompiledCronExpression, main
+
+
+class TestOccurrenceMatrix(unittest.TestCase):
+
+    EXPRESSIONS = [
+        "*/15 * * * * /a",
+        "0 0 1 * * /b",
+        "30 23 * * 3 /c",
+        "0 0 1 * 4 /d",      # 1st of the month or a Thursday
+        "0 0 30 2 * /never",
+        "0,15,30,45 * * 1-12 * /a2",  # same schedule as /a
+    ]
+    START = datetime(2024, 1, 31, 22, 10, 30)
+    END = datetime(2024, 2, 2, 1, 0)
+
+    def brute_force(self):
+        compiled = [CompiledCronExpression(expression) for expression in self.EXPRESSIONS]
+        return [[int(expression.matches(minute)) for minute in window_minutes(self.START, self.END)] for expression in compiled]
+
+    def test_pure_python_matches_brute_force(self):
+        """Test the pure-Python matrix and counts against matches() for every minute."""
+        expected = self.brute_force()
+        matrix = occurrence_matrix(self.EXPRESSIONS, self.START, self.END, use_numpy=False)
+        self.assertEqual([list(row) for row in matrix], expected)
+        counts = occurrence_counts(self.EXPRESSIONS, self.START, self.END, use_numpy=False)
+        self.assertEqual(counts, [sum(column) for column in zip(*expected)])
+
+    def test_equivalent_schedules_get_independent_rows(self):
+        """Test that rows shared by equivalent schedules are equal but separate objects."""
+        matrix = occurrence_matrix(self.EXPRESSIONS, self.START, self.END, use_numpy=False)
+        self.assertEqual(matrix[0], matrix[-1])
+        self.assertIsNot(matrix[0], matrix[-1])
+
+    def test_window_minutes_are_columns(self):
+        """Test that the window starts at the whole minute and excludes the end."""
+        minutes = window_minutes(self.START, self.END)
+        self.assertEqual(minutes[0], datetime(2024, 1, 31, 22, 10))
+        self.assertEqual(minutes[-1], datetime(2024, 2, 2, 0, 59))
+        self.assertEqual(len(occurrence_matrix(["* * * * * /a"], self.START, self.END, use_numpy=False)[0]), len(minutes))
+
+    def test_pure_python_packed_rows(self):
+        """Test that packed rows hold the same bits, most significant first."""
+        matrix = occurrence_matrix(["*/4 * * * * /a"], datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 10), use_numpy=False, packed=True)
+        self.assertEqual(matrix, [bytearray([0b10001000, 0b10000000])])
+
+    def test_empty_expression_list(self):
+        """Test that no expressions give zero counts for every minute."""
+        self.assertEqual(occurrence_counts([], datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 3), use_numpy=False), [0, 0, 0])
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_matches_pure_python(self):
+        """Test that the vectorized matrix, packed matrix and counts equal the pure-Python results."""
+        expected = self.brute_force()
+        matrix = occurrence_matrix(self.EXPRESSIONS, self.START, self.END, use_numpy=True)
+        self.assertEqual(matrix.dtype, bool)
+        self.assertEqual(matrix.astype(int).tolist(), expected)
+        packed = occurrence_matrix(self.EXPRESSIONS, self.START, self.END, use_numpy=True, packed=True)
+        pure_packed = occurrence_matrix(self.EXPRESSIONS, self.START, self.END, use_numpy=False, packed=True)
+        self.assertEqual([row.tobytes() for row in packed], [bytes(row) for row in pure_packed])
+        counts = occurrence_counts(self.EXPRESSIONS, self.START, self.END, use_numpy=True)
+        self.assertEqual(counts.tolist(), occurrence_counts(self.EXPRESSIONS, self.START, self.END, use_numpy=False))
+
+    def test_date_dependent_days(self):
+        """Test "L" and "w#n" rows, which depend on the month, against matches() with and without NumPy."""
+        expressions = ["30 23 L * * /last", "0 0 * * THU#1 /first_thursday", "0 * 1 * 3L /first_or_last_wednesday"]
+        compiled = [CompiledCronExpression(expression) for expression in expressions]
+        expected = [[int(expression.matches(minute)) for minute in window_minutes(self.START, self.END)] for expression in compiled]
+        self.assertEqual([sum(row) for row in expected], [1, 1, 1 + 24])  # Jan 31st 23:30; Feb 1st 00:00; 23:00 on the 31st and every hour of the 1st
+        self.assertEqual([list(row) for row in occurrence_matrix(expressions, self.START, self.END, use_numpy=False)], expected)
+        if np is not None:
+            self.assertEqual(occurrence_matrix(expressions, self.START, self.END, use_numpy=True).astype(int).tolist(), expected)
+
+
+
+class TestLoadHistogram(unittest.TestCase):
+
+    EXPRESSIONS = TestOccurrenceMatrix.EXPRESSIONS + ["0 * * * * /hourly", "0 * * * 1-5 /weekday"]
+    START = TestOccurrenceMatrix.START
+    END = datetime(2024, 2, 6, 3, 0)
+
+    def test_counts_match_occurrence_counts(self):
+        """Test that the grouped histogram equals counting the occurrence matrix."""
+        histogram = load_histogram(self.EXPRESSIONS, self.START, self.END)
+        self.assertEqual(histogram.counts, occurrence_counts(self.EXPRESSIONS, self.START, self.END, use_numpy=False))
+        self.assertEqual(histogram.minute(0), datetime(2024, 1, 31, 22, 10))
+
+    def test_peaks_and_contributors(self):
+        """Test that peaks are busiest first and list the jobs firing at that minute."""
+        histogram = load_histogram(self.EXPRESSIONS, self.START, self.END)
+        peak = histogram.peaks(1)[0]
+        self.assertEqual(peak.when, datetime(2024, 2, 1, 0, 0))  # /a, /a2, /b, /d (Thursday the 1st), both hourly jobs
+        self.assertEqual(peak.count, 6)
+        self.assertEqual(peak.jobs, [0, 1, 3, 5, 6, 7])
+        self.assertEqual(histogram.count_at(datetime(2024, 2, 1, 0, 0, 30)), 6)
+        self.assertEqual(histogram.count_at(datetime(2030, 1, 1)), 0)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_matches_pure_python(self):
+        """Test the matrix product against the per-day deltas on schedules active on many different days."""
+        expressions = [f"{minute} {minute % 24} {minute % 28 + 1},{minute % 5 + 25} */{minute % 3 + 1} {minute % 7}-6 /job{minute}" for minute in range(60)]
+        expressions += self.EXPRESSIONS + ["30 12 L * * /last", "0 9 * * MON#2,5L /dated"]
+        start, end = datetime(2023, 12, 30, 11, 17), datetime(2024, 3, 2, 5, 0)
+        histogram = load_histogram(expressions, start, end, use_numpy=False)
+        self.assertEqual(load_histogram(expressions, start, end, use_numpy=True).counts, histogram.counts)
+        self.assertEqual(histogram.counts[:24 * 60], occurrence_counts(expressions, start, start + timedelta(days=1), use_numpy=False))
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles of the per-minute counts."""
+        histogram = load_histogram(["0 0 * * * /a"], datetime(2024, 1, 1), datetime(2024, 1, 2))
+        self.assertEqual(histogram.percentiles((50, 99.99, 100)), {50: 0, 99.99: 1, 100: 1})
+        self.assertEqual(load_histogram([], datetime(2024, 1, 1), datetime(2024, 1, 1)).percentiles((50,)), {50: 0})
+
+    def test_histogram_command(self):
+        """Test the histogram subcommand report on a crontab file."""
+        with tempfile.NamedTemporaryFile("w", suffix=".crontab", delete=False) as handle:
+            handle.write("0 * * * * /a\n# comment\n0 * * * * /b\n30 12 * * * /c\n")
+        self.addCleanup(os.unlink, handle.name)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            status = main(["histogram", "--input", handle.name, "--start", "2024-01-01", "--top", "1", "--max-jobs", "1"])
+        self.assertEqual(status, 0)
+        self.assertEqual(out.getvalue().splitlines(), [
+            "Load histogram 2024-01-01 00:00 to 2024-01-02 00:00: 1440 minutes, 3 jobs",
+            "Jobs per minute: p50=0 p90=0 p99=2 p100=2",
+            "Peak minutes:",
+            "  2024-01-01 00:00  2 jobs",
+            "    line 1: 0 * * * * /a",
+            "    ... and 1 more",
+        ])
+
+
+class TestMergedTimeline(unittest.TestCase):
+
+    JOBS = {
+        "quarter": "*/15 * * * * /a",
+        "hourly": "0 * * * * /b",
+        "quarter_again": "0,15,30,45 * * * * /c",  # same schedule as "quarter"
+        "daily": "30 1 * * * /d",
+        "never": "0 0 30 2 * /e",
+    }
+    START = datetime(2024, 2, 29, 23, 0)
+    END = datetime(2024, 3, 1, 3, 0)
+
+    def sorted_reference(self, jobs):
+        positions = {job: position for position, job in enumerate(jobs)}
+        runs = [(run, job) for job, expression in jobs.items() for run in CompiledCronExpression(expression).iter_runs(self.START, self.END)]
+        return sorted(runs, key=lambda run: (run[0], positions[run[1]]))
+
+    def test_matches_sorted_runs(self):
+        """Test that the merge equals sorting every job's runs, with ties in input order."""
+        timeline = list(merged_timeline(self.JOBS, self.START, self.END))
+        self.assertEqual(timeline, self.sorted_reference(self.JOBS))
+        self.assertEqual(timeline[:3], [TimelineRun(self.START, "quarter"), TimelineRun(self.START, "hourly"), TimelineRun(self.START, "quarter_again")])
+        self.assertEqual(list(merged_timeline(["0 0 * * * /a", "0 0 1 * * /b"], self.START, self.END)), [(datetime(2024, 3, 1), 0), (datetime(2024, 3, 1), 1)])
+
+    def test_resume_from_checkpoint(self):
+        """Test that resuming after any yielded run continues with exactly the remaining runs."""
+        timeline = list(merged_timeline(self.JOBS, self.START, self.END))
+        for consumed in (1, 2, 7, len(timeline)):
+            resumed = list(merged_timeline(self.JOBS, self.START, self.END, checkpoint=timeline[consumed - 1]))
+            self.assertEqual(resumed, timeline[consumed:])
+        after_minute = list(merged_timeline(self.JOBS, self.START, self.END, checkpoint=datetime(2024, 3, 1, 0, 0)))
+        self.assertEqual(after_minute[0], TimelineRun(datetime(2024, 3, 1, 0, 15), "quarter"))
+        with self.assertRaises(ValueError):
+            next(merged_timeline(self.JOBS, self.START, self.END, checkpoint=(self.START, "missing")))
+
+    def test_filter_and_open_end(self):
+        """Test filtering by job id and an unbounded timeline."""
+        only = {"hourly", "daily"}
+        filtered = list(merged_timeline(self.JOBS, self.START, self.END, only=only))
+        self.assertEqual(filtered, self.sorted_reference({job: self.JOBS[job] for job in self.JOBS if job in only}))
+        self.assertEqual(list(merged_timeline(self.JOBS, self.START, only=["never"])), [])
+        forever = merged_timeline(self.JOBS, self.START, only=["daily"])
+        self.assertEqual([run.when for run in islice(forever, 3)], [datetime(2024, 3, day, 1, 30) for day in (1, 2, 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
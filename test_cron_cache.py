@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+import cron_cache
+from cron_cache import (
+    CompiledSchedules,
+    StaleCacheError,
+    load_compiled,
+    load_crontab_cached,
+    save_compiled,
+    source_digest,
+)
+from cron_parser import CompiledCronExpression
+
+
+class TestCompiledCache(unittest.TestCase):
+
+    EXPRESSIONS = ["*/15 0 1,15 * 1 /my_command.sh", "0 0 29 2 * /leap", "5 4 * * 0,6 /weekend"]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "crontab.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_preserves_masks_and_text(self):
+        """Test that saved schedules load back with identical bitsets, text and line numbers."""
+        self.assertEqual(save_compiled(self.path, enumerate(self.EXPRESSIONS, 10)), 3)
+        with load_compiled(self.path) as schedules:
+            self.assertEqual(len(schedules), 3)
+            for index, expression in enumerate(self.EXPRESSIONS):
+                expected = CompiledCronExpression(expression)
+                loaded = schedules[index]
+                self.assertEqual(
+                    (loaded.minute_mask, loaded.hour_mask, loaded.dom_mask, loaded.month_mask, loaded.dow_mask),
+                    (expected.minute_mask, expected.hour_mask, expected.dom_mask, expected.month_mask, expected.dow_mask),
+                )
+                self.assertEqual(loaded.cron_expression, expression)
+                self.assertEqual(schedules.line_number(index), 10 + index)
+            self.assertEqual(schedules[-1].command, "/weekend")
+            self.assertEqual(schedules[1].next_run(datetime(2025, 1, 1)), datetime(2028, 2, 29))
+            with self.assertRaises(IndexError):
+                schedules[3]
+
+    def test_round_trip_extended_syntax(self):
+        """Test that "L" and "#" bits, which need the widest day-of-week field, survive the file."""
+        expression = "0 9 L * FRI#3,6L /dated"
+        save_compiled(self.path, [expression])
+        with load_compiled(self.path) as schedules:
+            self.assertEqual(schedules[0].schedule_key, CompiledCronExpression(expression).schedule_key)
+            self.assertEqual(schedules[0].next_run(datetime(2025, 1, 1)), datetime(2025, 1, 17, 9, 0))
+
+    def test_source_hash_mismatch_is_stale(self):
+        """Test that a cache checked against a different source hash is rejected."""
+        save_compiled(self.path, self.EXPRESSIONS, source_digest(b"old"))
+        load_compiled(self.path, source_digest(b"old")).close()
+        with self.assertRaises(StaleCacheError):
+            load_compiled(self.path, source_digest(b"new"))
+
+    def test_rejects_non_cache_file(self):
+        """Test that a file without the magic header is refused."""
+        with open(self.path, "wb") as handle:
+            handle.write(b"0 * * * * /not-a-cache\n" * 4)
+        with self.assertRaises(ValueError):
+            CompiledSchedules(self.path)
+
+    def test_load_crontab_cached_rebuilds_only_when_source_changes(self):
+        """Test that the crontab is parsed once, reused from cache, then re-parsed after an edit."""
+        crontab = os.path.join(self.directory.name, "crontab")
+        with open(crontab, "w") as handle:
+            handle.write("# jobs\n0 * * * * /hourly\nbad line\n30 2 * * * /nightly\n")
+        with load_crontab_cached(crontab, self.path) as schedules:
+            self.assertEqual([schedule.command for schedule in schedules], ["/hourly", "/nightly"])
+            self.assertEqual([schedules.line_number(index) for index in range(2)], [2, 4])
+
+        with mock.patch.object(cron_cache, "parse_crontab", side_effect=AssertionError("should use the cache")):
+            with load_crontab_cached(crontab, self.path) as schedules:
+                self.assertEqual(len(schedules), 2)
+
+        with open(crontab, "a") as handle:
+            handle.write("15 * * * * /quarter\n")
+        with load_crontab_cached(crontab, self.path) as schedules:
+            self.assertEqual(schedules[-1].command, "/quarter")
+
+    def test_truncated_cache_is_rebuilt(self):
+        """Test that a cache cut short anywhere is refused up front and that load_crontab_cached rebuilds it."""
+        crontab = os.path.join(self.directory.name, "crontab")
+        with open(crontab, "w") as handle:
+            handle.write("\n".join(self.EXPRESSIONS) + "\n")
+        load_crontab_cached(crontab, self.path).close()
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+        for length in (len(data) - 1, len(data) - 40, 60):  # inside the strings, the offsets and the records
+            with open(self.path, "wb") as handle:
+                handle.write(data[:length])
+            with self.assertRaises(ValueError):
+                CompiledSchedules(self.path)
+            with load_crontab_cached(crontab, self.path) as schedules:
+                self.assertEqual([schedule.cron_expression for schedule in schedules], self.EXPRESSIONS)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["crontab", "crontab.bin"])  # no temporary files left behind
+
+
+if __name__ == '__main__':
+    unittest.main()
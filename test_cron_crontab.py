@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from cron_crontab import Crontab, CrontabWatcher, sync_index, sync_scheduler
+from cron_index import ScheduleIndex
+from cron_scheduler import CronScheduler, SimulatedClock
+
+
+class TestCrontab(unittest.TestCase):
+
+    LINES = [
+        "# nightly jobs\n",
+        "0 0 * * * /backup\n",
+        "\n",
+        "*/15 * * * * /poll\n",
+        "30 6 * * 1-5 /report\n",
+    ]
+
+    def kinds(self, events):
+        return [(event.kind, event.entry.text) for event in events]
+
+    def test_initial_update_adds_every_entry(self):
+        """Test that the first update compiles each entry and skips comments and blank lines."""
+        crontab = Crontab()
+        events = crontab.update(self.LINES)
+        self.assertEqual(self.kinds(events), [("added", "0 0 * * * /backup"), ("added", "*/15 * * * * /poll"), ("added", "30 6 * * 1-5 /report")])
+        self.assertEqual([entry.line_number for entry in crontab], [2, 4, 5])
+        self.assertEqual(crontab.compiled_lines, 3)
+
+    def test_edit_recompiles_only_the_changed_line(self):
+        """Test that an edit is a 'changed' event keeping the entry id, and other entries are reused."""
+        crontab = Crontab(self.LINES)
+        backup, poll, report = list(crontab)
+        lines = list(self.LINES)
+        lines[3] = "*/5 * * * * /poll\n"
+        events = crontab.update(lines)
+        self.assertEqual(self.kinds(events), [("changed", "*/5 * * * * /poll")])
+        self.assertEqual(events[0].entry.id, poll.id)
+        self.assertIs(events[0].previous, poll)
+        self.assertEqual(crontab.compiled_lines, 4)
+        self.assertEqual(list(crontab)[0], backup)
+        self.assertIs(list(crontab)[2], report)
+        self.assertEqual(crontab.update(lines), [])
+
+    def test_insert_and_delete_keep_moved_entries(self):
+        """Test that inserting above shifts line numbers without recompiling, and deleting emits 'removed'."""
+        crontab = Crontab(self.LINES)
+        backup, poll, report = list(crontab)
+        events = crontab.update(["1 1 1 1 1 /new\n"] + self.LINES[:3] + self.LINES[4:])
+        self.assertEqual(sorted(self.kinds(events)), [("added", "1 1 1 1 1 /new"), ("removed", "*/15 * * * * /poll")])
+        self.assertEqual([(entry.line_number, entry.id) for entry in crontab][1:], [(3, backup.id), (5, report.id)])
+        self.assertIsNone(crontab.get(poll.id))
+        self.assertEqual(crontab.compiled_lines, 4)
+
+    def test_reordered_and_duplicate_lines(self):
+        """Test that swapped and repeated lines are matched by content, not position."""
+        crontab = Crontab(["0 0 * * * /a\n", "0 0 * * * /a\n", "5 5 * * * /b\n"])
+        first, second, third = list(crontab)
+        self.assertEqual(crontab.update(["5 5 * * * /b\n", "0 0 * * * /a\n", "0 0 * * * /a\n"]), [])
+        self.assertEqual([entry.id for entry in crontab], [third.id, first.id, second.id])
+
+    def test_invalid_lines_are_kept_as_errors(self):
+        """Test that a line that fails to parse becomes an entry holding its error."""
+        crontab = Crontab(["0 0 * * * /ok\n", "61 * * * * /bad\n"])
+        self.assertEqual([entry.text for entry in crontab.errors()], ["61 * * * * /bad"])
+        self.assertIsInstance(crontab.errors()[0].expression, ValueError)
+
+    def test_sync_index(self):
+        """Test that index entries are added, replaced and removed from crontab events."""
+        crontab = Crontab()
+        index = ScheduleIndex()
+        sync_index(index, crontab.update(["0 0 * * * /a\n", "30 1 * * * /b\n"]))
+        self.assertEqual(len(index), 2)
+        a, b = list(crontab)
+        sync_index(index, crontab.update(["0 0 * * * /a\n", "30 2 * * * /b\n"]))
+        self.assertEqual(index.due(datetime(2024, 1, 1, 2, 30)), {b.id})
+        sync_index(index, crontab.update(["61 0 * * * /a\n", "30 2 * * * /b\n"]))
+        self.assertNotIn(a.id, index)
+        sync_index(index, crontab.update([]))
+        self.assertEqual(len(index), 0)
+
+    def test_sync_scheduler(self):
+        """Test that scheduler jobs follow crontab events by entry id."""
+        crontab = Crontab()
+        scheduler = CronScheduler(clock=SimulatedClock(datetime(2024, 1, 1)))
+        sync_scheduler(scheduler, crontab.update(["0 0 * * * /a\n"]), action=lambda fire_time: None)
+        entry = list(crontab)[0]
+        self.assertEqual(scheduler.get_job(entry.id).expression.cron_expression, "0 0 * * * /a")
+        sync_scheduler(scheduler, crontab.update(["0 1 * * * /a\n"]), action=lambda fire_time: None)
+        self.assertEqual(scheduler.get_job(entry.id).expression.cron_expression, "0 1 * * * /a")
+        sync_scheduler(scheduler, crontab.update([]))
+        self.assertIsNone(scheduler.get_job(entry.id))
+
+
+class TestCrontabWatcher(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".crontab")
+        os.close(handle)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.unlink(self.path))
+
+    def write(self, text, mtime_ns):
+        with open(self.path, "w") as handle:
+            handle.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_reloads_only_when_the_file_changes(self):
+        """Test that check() reloads on change, notifies listeners and handles a deleted file."""
+        received = []
+        watcher = CrontabWatcher(self.path, [received.append])
+        self.write("0 0 * * * /a\n", 1_000_000_000)
+        self.assertEqual([event.kind for event in watcher.check()], ["added"])
+        self.assertEqual(watcher.check(), [])
+        self.write("0 0 * * * /a\n5 5 * * * /b\n", 2_000_000_000)
+        self.assertEqual([event.entry.text for event in watcher.check()], ["5 5 * * * /b"])
+        self.assertEqual(len(received), 2)
+        os.unlink(self.path)
+        self.assertEqual(sorted(event.kind for event in watcher.check()), ["removed", "removed"])
+        self.assertEqual(len(watcher.crontab), 0)
+        self.assertEqual(watcher.check(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from datetime import datetime, timedelta
+from cron_index import ScheduleIndex, ScheduleStore, np
+from cron_parser import CompiledCronExpression, ExpandedCronExpression
+
+
+class TestScheduleIndex(unittest.TestCase):
+
+    EXPRESSIONS = {
+        "every_5": "*/5 * * * * /a",
+        "office_hours": "0 9-17 * * 1-5 /b",
+        "first_or_sunday": "30 12 1 * 0 /c",
+        "first_of_month": "30 12 1 * * /d",
+        "quarterly": "0 0 1 1,4,7,10 * /e",
+    }
+
+    def test_due_matches_brute_force(self):
+        """Test that due() agrees with matches() for every minute over a few days."""
+        index = ScheduleIndex(self.EXPRESSIONS)
+        compiled = {job_id: CompiledCronExpression(expression) for job_id, expression in self.EXPRESSIONS.items()}
+        moment = datetime(2024, 3, 29, 0, 0)
+        while moment < datetime(2024, 4, 2):
+            expected = {job_id for job_id, expression in compiled.items() if expression.matches(moment)}
+            self.assertEqual(index.due(moment), expected, moment)
+            moment += timedelta(minutes=1)
+
+    def test_due_dom_or_dow(self):
+        """Test that a job with both day fields restricted is due if either matches."""
+        index = ScheduleIndex(self.EXPRESSIONS)
+        self.assertIn("first_or_sunday", index.due(datetime(2024, 3, 31, 12, 30)))   # a Sunday
+        self.assertNotIn("first_of_month", index.due(datetime(2024, 3, 31, 12, 30)))
+        self.assertEqual(index.due(datetime(2024, 4, 1, 12, 30)), {"every_5", "first_or_sunday", "first_of_month"})
+
+    def test_add_and_remove_incrementally(self):
+        """Test that jobs can be added, replaced and removed after construction."""
+        index = ScheduleIndex()
+        index.add("job", ExpandedCronExpression("15 * * * * /a"))
+        self.assertEqual(index.due(datetime(2024, 1, 1, 3, 15)), {"job"})
+        index.add("job", "45 * * * * /a")  # replaces the old schedule
+        self.assertEqual(index.due(datetime(2024, 1, 1, 3, 15)), set())
+        self.assertEqual(index.due(datetime(2024, 1, 1, 3, 45)), {"job"})
+        index.remove("job")
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.due(datetime(2024, 1, 1, 3, 45)), set())
+        with self.assertRaises(KeyError):
+            index.remove("job")
+
+    def test_due_with_date_dependent_jobs(self):
+        """Test jobs using "L" and "#", which skip the day buckets, against matches() over a month boundary."""
+        expressions = dict(self.EXPRESSIONS, last_day="0 * L * * /f", last_friday="*/30 9 * * 5L /g", second_monday="0 9 * * MON#2 /h")
+        index = ScheduleIndex(expressions)
+        compiled = {job_id: CompiledCronExpression(expression) for job_id, expression in expressions.items()}
+        moment = datetime(2024, 3, 28, 0, 0)
+        while moment < datetime(2024, 4, 10):
+            expected = {job_id for job_id, expression in compiled.items() if expression.matches(moment)}
+            self.assertEqual(index.due(moment), expected, moment)
+            moment += timedelta(minutes=10)
+        self.assertEqual(index.due(datetime(2024, 3, 29, 9, 30)), {"every_5", "last_friday"})
+        self.assertIn("last_day", index.due(datetime(2024, 3, 31, 23, 0)))
+        index.remove("last_day")
+        self.assertNotIn("last_day", index.due(datetime(2024, 3, 31, 23, 0)))
+
+
+
+class TestScheduleStore(unittest.TestCase):
+
+    EXPRESSIONS = list(TestScheduleIndex.EXPRESSIONS.values())
+
+    def brute_force_due(self, moment):
+        return [row for row, expression in enumerate(self.EXPRESSIONS) if CompiledCronExpression(expression).matches(moment)]
+
+    def test_due_matches_brute_force(self):
+        """Test that the pure-Python and NumPy scans agree with matches() minute by minute."""
+        store = ScheduleStore(self.EXPRESSIONS)
+        moment = datetime(2024, 3, 29, 0, 0)
+        while moment < datetime(2024, 4, 2):
+            expected = self.brute_force_due(moment)
+            self.assertEqual(store.due(moment, use_numpy=False), expected, moment)
+            if np is not None:
+                self.assertEqual(store.due(moment, use_numpy=True), expected, moment)
+            moment += timedelta(minutes=7)
+
+    def test_dow_column_widens_for_date_dependent_schedules(self):
+        """Test that the first "wL" or "w#n" widens the day-of-week column and due() still agrees with matches()."""
+        dated = ["0 9 L * * /last", "0 9 * * 5L /last_friday", "0 9 1 * MON#2 /first_or_second_monday"]
+        store = ScheduleStore(self.EXPRESSIONS + dated[:1])
+        self.assertEqual(store.columns()["dow"].itemsize, 1)
+        store.extend(dated[1:])
+        self.assertEqual(store.columns()["dow"].itemsize, 8)
+        self.assertEqual(store.masks(-1), CompiledCronExpression(dated[-1]).schedule_key)
+        self.assertEqual(store.expression(-2).cron_expression, "0 9 * * 5L /last_friday")
+        expressions = self.EXPRESSIONS + dated
+        for day in range(40):
+            moment = datetime(2024, 3, 1, 9, 0) + timedelta(days=day)
+            expected = [row for row, expression in enumerate(expressions) if CompiledCronExpression(expression).matches(moment)]
+            self.assertEqual(store.due(moment, use_numpy=False), expected, moment)
+            if np is not None:
+                self.assertEqual(store.due(moment, use_numpy=True), expected, moment)
+
+    def test_rows_round_trip(self):
+        """Test that masks, commands and expressions come back from the columns."""
+        store = ScheduleStore()
+        store.append(ExpandedCronExpression("0,15,30,45 9 * * 1-5 /usr/bin/caf\u00e9"))
+        store.extend(["*/10 * * * * /b", CompiledCronExpression("0 0 1 1 * /c")])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.command(0), "/usr/bin/caf\u00e9")
+        self.assertEqual(store.masks(2), CompiledCronExpression("0 0 1 1 * /c").schedule_key)
+        self.assertEqual(store.expression(0).cron_expression, "*/15 9 * * 1-5 /usr/bin/caf\u00e9")
+        self.assertEqual(store.command(-1), "/c")
+        with self.assertRaises(IndexError):
+            store.masks(3)
+
+    def test_invalid_expression_names_its_position(self):
+        """Test that extend() reports the failing position and keeps earlier rows."""
+        store = ScheduleStore()
+        with self.assertRaisesRegex(ValueError, "Expression 1"):
+            store.extend(["* * * * * /ok", "60 * * * * /bad", "* * * * * /never"])
+        self.assertEqual(len(store), 1)
+
+    def test_columns_are_zero_copy(self):
+        """Test that the exported columns are views of the store's buffers."""
+        store = ScheduleStore(["*/30 * * * * /a", "0 12 * * * /bb"])
+        columns = store.columns()
+        self.assertEqual(columns["minute"].tolist(), [(1 << 0) | (1 << 30), 1])
+        self.assertEqual(columns["dow"].itemsize, 1)
+        self.assertEqual(bytes(columns["commands"]), b"/a/bb")
+        self.assertEqual(columns["command_offsets"].tolist(), [0, 2, 5])
+        with self.assertRaises(BufferError):
+            store.append("* * * * * /c")  # arrays cannot grow while a view is exported
+        for view in columns.values():
+            view.release()
+        store.append("* * * * * /c")
+        self.assertEqual(len(store), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
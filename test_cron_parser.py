@@ -1,19 +1,78 @@
+import calendar
+import csv
+import io
+import json
+import os
+import pickle
+import tempfile
 import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime, timedelta
+from unittest import mock
 from cron_parser import (
+    disable_instrumentation,
+    enable_instrumentation,
+    instrumentation_enabled,
+    reset_stats,
+    stats_snapshot,
+    canonicalize,
+    canonical_schedule,
+    group_by_schedule,
+    intern_schedule,
     _generate_padding,
     expand_expression,
     parse_expression,
     parse_raw_components,
     RawCronExpression,
     ExpandedCronExpression,
+    CompiledCronExpression,
     TableOutput,
     expand_cron_expression,
-    raw_cron_expression
+    raw_cron_expression,
+    parse_crontab,
+    expand_field,
+    set_field_cache_size,
+    field_cache_stats,
+    clear_field_cache,
+    FIELD_CACHE_SIZE,
+    parse_field,
+    CronSyntaxError,
+    FieldAny,
+    FieldValue,
+    FieldRange,
+    FieldStep,
+    FieldList,
+    FieldLast,
+    FieldNth,
+    MACROS,
+    FIELD_SPECS,
+    _weekday_days_mask,
+    _evaluate_item,
+    run_batch,
+    run_validate,
+    validate_expression,
+    ValidationError,
+    main,
+    TableWriter,
+    JsonLinesWriter,
+    CsvWriter,
+    JsonLinesFormatter,
+    OutputWriter,
 )
 
 
+# Helper function evaluating a minute field through the generic parser only, as the fast paths' reference
+def _evaluate_item_values(field):
+    node = parse_field(field, "minute(s)")
+    items = node.items if isinstance(node, FieldList) else [node]
+    return [value for item in items for value in _evaluate_item(item, "minute(s)", field, list(range(60)), 0, 59)]
+
+
 class TestCronParser(unittest.TestCase):
 
+    def tearDown(self):
+        set_field_cache_size(FIELD_CACHE_SIZE)
+
     ## Tests for _generate_padding
     def test_generate_padding(self):
         self.assertEqual(_generate_padding("minute", 10), "minute    ")
@@ -74,6 +133,18 @@ class TestCronParser(unittest.TestCase):
         with self.assertRaises(ValueError):
             expand_expression("minute", "1,,2", list(range(60)), 0, 59)    
 
+    def test_plain_range_and_list_fast_paths_match_parser(self):
+        """Test that plain ranges and lists give the parser's values and, when invalid, its errors."""
+        for field in ("0-59", "7-7", "45,0,15,0", "059", "5-60", "60,1", "20-10", "1-", "-5", "1,-2", "\u0661-\u0665", "1,\u0662"):
+            try:
+                expected = sorted(set(_evaluate_item_values(field)))
+            except CronSyntaxError as error:
+                with self.assertRaises(CronSyntaxError) as context:
+                    expand_expression("minute", field, list(range(60)), 0, 59)
+                self.assertEqual((context.exception.message, context.exception.offset), (error.message, error.offset), field)
+            else:
+                self.assertEqual(expand_expression("minute", field, list(range(60)), 0, 59), expected, field)
+
     ## Hour validations
     def test_expand_hour_valid(self):
         """Test that a valid range like '4-23' works."""
@@ -424,6 +495,659 @@ class TestCronParser(unittest.TestCase):
         """Test cron expression with invalid command field raises ValueError."""
         with self.assertRaises(ValueError):
             expand_cron_expression("*/10 2 15 * *")  # Command is missing
+
+    ## Tests for CompiledCronExpression
+    def test_compiled_masks_round_trip_to_lists(self):
+        """Test that the bitsets reproduce the expanded field lists."""
+        cron_expr = "1-5,15/3 0,12 1-10,15 5,6 0-3 /my_command.sh"
+        expanded = ExpandedCronExpression(cron_expr)
+        compiled = CompiledCronExpression(cron_expr)
+        self.assertEqual(compiled.expanded_minute, list(expanded.expanded_minute))
+        self.assertEqual(compiled.expanded_dom, list(expanded.expanded_dom))
+        self.assertEqual(TableOutput(compiled.to_table_format()).render(), TableOutput(expanded.to_table_format()).render())
+        self.assertEqual(compiled.hour_mask, (1 << 0) | (1 << 12))
+
+    def test_compile_from_expanded(self):
+        """Test that compile() on an expanded expression gives the same bitsets."""
+        cron_expr = "*/15 0 1,15 * 1 /my_command.sh"
+        compiled = ExpandedCronExpression(cron_expr).compile()
+        self.assertIsInstance(compiled, CompiledCronExpression)
+        self.assertEqual(compiled.minute_mask, CompiledCronExpression(cron_expr).minute_mask)
+        self.assertEqual(compiled.command, "/my_command.sh")
+
+    def test_compiled_matches(self):
+        """Test matching a datetime against the compiled bitsets."""
+        compiled = CompiledCronExpression("*/15 9-17 * * 1-5 /cmd")
+        self.assertTrue(compiled.matches(datetime(2024, 1, 1, 9, 30)))    # Monday
+        self.assertFalse(compiled.matches(datetime(2024, 1, 1, 9, 31)))
+        self.assertFalse(compiled.matches(datetime(2024, 1, 1, 18, 0)))
+        self.assertFalse(compiled.matches(datetime(2024, 1, 6, 9, 30)))   # Saturday
+
+    def test_compiled_matches_dom_or_dow(self):
+        """Test that a restricted day of month and day of week match if either does, as in cron."""
+        compiled = CompiledCronExpression("0 0 1 * 0 /cmd")
+        self.assertTrue(compiled.matches(datetime(2024, 1, 1)))    # 1st, a Monday
+        self.assertTrue(compiled.matches(datetime(2024, 1, 7)))    # a Sunday
+        self.assertFalse(compiled.matches(datetime(2024, 1, 8)))
+
+    ## Tests for next_run / prev_run / iter_runs
+    def test_next_run_rolls_over_fields(self):
+        """Test that next_run carries into the hour, day, month and year."""
+        expanded = ExpandedCronExpression("30 4 1 * * /cmd")
+        self.assertEqual(expanded.next_run(datetime(2024, 1, 1, 4, 29, 59)), datetime(2024, 1, 1, 4, 30))
+        self.assertEqual(expanded.next_run(datetime(2024, 1, 1, 4, 30)), datetime(2024, 2, 1, 4, 30))
+        self.assertEqual(expanded.next_run(datetime(2024, 12, 31, 23, 59)), datetime(2025, 1, 1, 4, 30))
+
+    def test_next_run_leap_day(self):
+        """Test that a Feb 29 schedule jumps to the next leap year."""
+        expanded = ExpandedCronExpression("0 0 29 2 * /cmd")
+        self.assertEqual(expanded.next_run(datetime(2025, 3, 1)), datetime(2028, 2, 29))
+        self.assertEqual(expanded.prev_run(datetime(2025, 3, 1)), datetime(2024, 2, 29))
+
+    def test_impossible_schedule_has_no_runs(self):
+        """Test that a schedule like Feb 30 returns None instead of looping forever."""
+        expanded = ExpandedCronExpression("0 0 30 2 * /cmd")
+        self.assertIsNone(expanded.next_run(datetime(2024, 1, 1)))
+        self.assertIsNone(expanded.prev_run(datetime(2024, 1, 1)))
+        self.assertEqual(list(expanded.iter_runs(datetime(2024, 1, 1))), [])
+
+    def test_prev_run_is_strictly_before(self):
+        """Test that prev_run excludes the boundary minute but includes a partially elapsed one."""
+        expanded = ExpandedCronExpression("*/15 * * * * /cmd")
+        self.assertEqual(expanded.prev_run(datetime(2024, 1, 1, 0, 15)), datetime(2024, 1, 1, 0, 0))
+        self.assertEqual(expanded.prev_run(datetime(2024, 1, 1, 0, 15, 1)), datetime(2024, 1, 1, 0, 15))
+        self.assertEqual(expanded.prev_run(datetime(2024, 1, 1)), datetime(2023, 12, 31, 23, 45))
+
+    def test_iter_runs_half_open_window(self):
+        """Test that iter_runs yields runs in [start, end)."""
+        expanded = ExpandedCronExpression("0 */6 * * * /cmd")
+        runs = list(expanded.iter_runs(datetime(2024, 1, 1), datetime(2024, 1, 2)))
+        self.assertEqual(runs, [datetime(2024, 1, 1, hour) for hour in (0, 6, 12, 18)])
+
+    def test_next_run_matches_brute_force(self):
+        """Test next_run and prev_run against minute-by-minute stepping."""
+        for cron_expr in ("*/7 1-3 * * * /cmd", "5 0 1,15 * 1 /cmd", "0 12 * 2 0,6 /cmd", "59 23 31 * * /cmd"):
+            compiled = CompiledCronExpression(cron_expr)
+            moment = datetime(2024, 1, 28, 22, 0)
+            expected = []
+            while moment < datetime(2024, 3, 3):
+                if compiled.matches(moment):
+                    expected.append(moment)
+                moment += timedelta(minutes=1)
+            runs = list(compiled.iter_runs(datetime(2024, 1, 28, 22, 0), datetime(2024, 3, 3)))
+            self.assertEqual(runs, expected, cron_expr)
+            self.assertEqual(compiled.prev_run(datetime(2024, 3, 3)), expected[-1], cron_expr)
+
+    ## Tests for count_runs
+    def test_count_runs_matches_enumeration(self):
+        """Test count_runs against iter_runs over windows with partial edge days."""
+        windows = [
+            (datetime(2024, 1, 1), datetime(2024, 1, 1)),
+            (datetime(2024, 1, 1, 10, 0, 30), datetime(2024, 1, 1, 10, 5)),
+            (datetime(2024, 2, 27, 13, 7, 1), datetime(2024, 3, 2, 0, 1)),
+            (datetime(2023, 12, 30, 23, 59), datetime(2024, 1, 3, 12, 30, 15)),
+            (datetime(2024, 2, 20), datetime(2024, 3, 10)),
+        ]
+        for expression in ("* * * * * /a", "*/7 */5 * * * /a", "0 0 29 2 * /a", "0 12 1,15 * 1 /a", "5 4 * 2 0,6 /a", "1-10/3 9-17 */3 1-6/2 1-5 /a", "0 0 30 2 * /a"):
+            expanded = ExpandedCronExpression(expression)
+            for start, end in windows:
+                self.assertEqual(expanded.count_runs(start, end), sum(1 for _ in expanded.iter_runs(start, end)), (expression, start, end))
+
+    def test_count_runs_over_ten_years(self):
+        """Test the closed form for every minute of ten years, including leap days."""
+        self.assertEqual(ExpandedCronExpression("* * * * * /a").count_runs(datetime(2020, 1, 1), datetime(2030, 1, 1)), 3653 * 1440)
+        self.assertEqual(CompiledCronExpression("0 0 29 2 * /a").count_runs(datetime(2020, 1, 1), datetime(2030, 1, 1)), 3)
+        self.assertEqual(CompiledCronExpression("* * * * * /a").count_runs(datetime(2030, 1, 1), datetime(2020, 1, 1)), 0)
+
+    ## Tests for parse_crontab
+    CRONTAB_LINES = [
+        "# nightly jobs\n",
+        "0 2 * * * /backup.sh\n",
+        "\n",
+        "*/5 * * * * /poll.sh\n",
+        "61 * * * * /broken.sh\n",
+        "   # indented comment\n",
+        "0 0 1 * * /monthly.sh\n",
+    ]
+
+    def test_parse_crontab_skips_comments_and_keeps_line_numbers(self):
+        """Test that comments and blank lines are skipped and errors are yielded in place."""
+        results = list(parse_crontab(self.CRONTAB_LINES))
+        self.assertEqual([number for number, _ in results], [2, 4, 5, 7])
+        self.assertEqual(results[0][1].command, "/backup.sh")
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertIsInstance(results[3][1], CompiledCronExpression)
+
+    def test_parse_crontab_from_path(self):
+        """Test reading a crontab lazily from a file path."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "crontab")
+            with open(path, "w") as handle:
+                handle.writelines(self.CRONTAB_LINES)
+            results = list(parse_crontab(path, chunk_size=2))
+        self.assertEqual([number for number, _ in results], [2, 4, 5, 7])
+
+    def test_parse_crontab_with_workers_preserves_order(self):
+        """Test that process-pool parsing yields the same results in input order."""
+        lines = [f"{i % 60} * * * * /job{i}" if i % 7 else "bad line" for i in range(200)]
+        serial = list(parse_crontab(lines))
+        parallel = list(parse_crontab(lines, workers=2, chunk_size=16))
+        self.assertEqual([number for number, _ in parallel], list(range(1, 201)))
+        for (_, expected), (_, actual) in zip(serial, parallel):
+            if isinstance(expected, ValueError):
+                self.assertIsInstance(actual, ValueError)
+            else:
+                self.assertEqual(actual.minute_mask, expected.minute_mask)
+                self.assertEqual(actual.command, expected.command)
+
+    ## Tests for the field cache
+    def test_expand_field_is_memoized_and_shared(self):
+        """Test that repeated field text returns the same immutable result and counts a hit."""
+        clear_field_cache()
+        first = expand_field('minute', '*/15')
+        second = expand_field('minute', '*/15')
+        self.assertIs(first, second)
+        self.assertEqual(first.values, (0, 15, 30, 45))
+        self.assertEqual(first.mask, (1 << 0) | (1 << 15) | (1 << 30) | (1 << 45))
+        self.assertEqual(field_cache_stats()['hits'], 1)
+        self.assertEqual(field_cache_stats()['misses'], 1)
+
+    def test_field_cache_key_includes_kind(self):
+        """Test that the same text in different fields is cached separately."""
+        clear_field_cache()
+        self.assertEqual(expand_field('minute', '*').values, tuple(range(60)))
+        self.assertEqual(expand_field('month', '*').values, tuple(range(1, 13)))
+        self.assertEqual(field_cache_stats()['size'], 2)
+
+    def test_field_cache_evicts_least_recently_used(self):
+        """Test that a bounded cache evicts the oldest entry and counts it."""
+        clear_field_cache()
+        set_field_cache_size(2)
+        expand_field('hour', '1')
+        expand_field('hour', '2')
+        expand_field('hour', '1')
+        expand_field('hour', '3')  # evicts '2'
+        stats = field_cache_stats()
+        self.assertEqual((stats['size'], stats['evictions'], stats['maxsize']), (2, 1, 2))
+        expand_field('hour', '1')
+        self.assertEqual(field_cache_stats()['hits'], 2)
+
+    def test_field_cache_does_not_cache_errors(self):
+        """Test that invalid field text still raises on every call."""
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                expand_field('hour', '24')
+
+    def test_expanded_expressions_share_field_tuples(self):
+        """Test that two expressions with the same field text share one tuple."""
+        first = ExpandedCronExpression("*/5 * * * * /a")
+        second = ExpandedCronExpression("*/5 1 * * * /b")
+        self.assertIs(first.expanded_minute, second.expanded_minute)
+
+    ## Tests for parse_field
+    def test_parse_field_builds_ast(self):
+        """Test that each syntax form becomes the matching AST node."""
+        self.assertEqual(parse_field("5"), FieldValue(5, 0))
+        self.assertEqual(parse_field("1-5"), FieldRange(1, 5, 0, 2))
+        self.assertEqual(parse_field("*/15"), FieldStep(FieldAny(0), 15, 0, 2))
+        self.assertEqual(
+            parse_field("1-5,*/15,7"),
+            FieldList((FieldRange(1, 5, 0, 2), FieldStep(FieldAny(4), 15, 4, 6), FieldValue(7, 9))),
+        )
+
+    def test_parse_field_syntax_error_offsets(self):
+        """Test that syntax errors point at the exact offending character."""
+        for expression, offset in (("1,,2", 2), ("-1", 0), ("1-", 2), ("1-5/x", 4), ("*5", 1), ("5-*", 2)):
+            with self.assertRaises(CronSyntaxError) as context:
+                parse_field(expression, "minute")
+            self.assertEqual(context.exception.offset, offset, expression)
+
+    def test_expand_expression_bounds_error_offsets(self):
+        """Test that out-of-bounds errors point at the offending number."""
+        for expression, offset in (("1-5,61", 4), ("5-70", 2), ("*/0", 2), ("70/5", 0)):
+            with self.assertRaises(CronSyntaxError) as context:
+                expand_expression("minute", expression, list(range(60)), 0, 59)
+            self.assertEqual(context.exception.offset, offset, expression)
+            self.assertIn(f"at offset {offset}", str(context.exception))
+
+    def test_expand_expression_step_forms(self):
+        """Test value-based steps from a start value and over a range, and '*' inside a list."""
+        self.assertEqual(expand_expression("day of month", "5/10", list(range(1, 32)), 1, 31), [5, 15, 25])
+        self.assertEqual(expand_expression("minute", "0-30/10", list(range(60)), 0, 59), [0, 10, 20, 30])
+        self.assertEqual(expand_expression("day of week", "1,*", list(range(7)), 0, 6), list(range(7)))
+        self.assertEqual(expand_expression("minute", "5,3,5", list(range(60)), 0, 59), [3, 5])
+
+    def test_cron_syntax_error_pickles(self):
+        """Test that parse errors survive the trip back from parse_crontab worker processes."""
+        error = pickle.loads(pickle.dumps(CronSyntaxError("Invalid value", "minute", "61", 0)))
+        self.assertEqual((error.component, error.offset), ("minute", 0))
+        self.assertEqual(str(error), "Invalid value for 'minute' at offset 0: 61")
+
+    ## Tests for the batch command line
+    def test_run_batch_streams_results_and_errors_in_order(self):
+        """Test that batch mode renders every line, reports errors in place and summarises to stderr."""
+        out, err = io.StringIO(), io.StringIO()
+        lines = ["*/30 0 1 1 0 /a\n", "# comment\n", "*/5 24 * * * /bad\n", "0 12 * * * /b\n"]
+        self.assertEqual(run_batch("raw", lines, io.StringIO(), io.StringIO()), 0)  # raw mode only splits the fields
+        failed = run_batch("expanded", lines, out, err)
+        self.assertEqual(failed, 1)
+        blocks = out.getvalue().split("\n\n")
+        self.assertTrue(blocks[0].startswith("minute         0 30\n"))
+        self.assertTrue(blocks[1].startswith("Error: line 3: "))
+        self.assertTrue(blocks[2].endswith("command        /b\n"))
+        self.assertIn("3 expressions: 2 ok, 1 errors", err.getvalue().splitlines()[-1])
+
+    def test_run_batch_with_jobs_preserves_order(self):
+        """Test that spreading a batch over worker processes keeps the output order."""
+        lines = [f"{i % 60} * * * * /job{i}" for i in range(50)]
+        serial, parallel = io.StringIO(), io.StringIO()
+        run_batch("expanded", lines, serial, io.StringIO())
+        run_batch("expanded", lines, parallel, io.StringIO(), jobs=2, chunk_size=7)
+        self.assertEqual(parallel.getvalue(), serial.getvalue())
+
+    def test_main_batch_from_input_file(self):
+        """Test the --batch command line reading from a file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expressions")
+            with open(path, "w") as handle:
+                handle.write("0 0 * * * /nightly\n")
+            out, err = io.StringIO(), io.StringIO()
+            with redirect_stdout(out), redirect_stderr(err):
+                status = main(["--batch", "expanded", "--input", path])
+        self.assertEqual(status, 0)
+        self.assertTrue(out.getvalue().startswith("minute         0\nhour           0\n"))
+
+    def test_main_single_expression_is_unchanged(self):
+        """Test that the original two-argument command line still works."""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(["*/10 2 * * * /cmd", "raw"]), 0)
+            self.assertEqual(main(["*/10 2 * * * /cmd", "sideways"]), 1)
+        self.assertIn("minute         */10", out.getvalue())
+        self.assertIn("Error: Invalid parse command: sideways", out.getvalue())
+
+    ## Tests for validate-only mode
+    def test_validate_expression_collects_every_error(self):
+        """Test that validation reports each bad item with its field and span instead of stopping."""
+        self.assertEqual(validate_expression("*/15 0 1,15 * 1-5 /usr/bin/find"), [])
+        self.assertEqual(validate_expression("  60 0-30/x 1,32,5-1 * 7 /cmd"), [
+            ValidationError('minute', 2, 4, "Invalid value"),
+            ValidationError('hour', 10, 11, "Unexpected character 'x'"),
+            ValidationError('dom', 14, 16, "Invalid value"),
+            ValidationError('dom', 17, 20, "Invalid range"),
+            ValidationError('dow', 23, 24, "Invalid value"),
+        ])
+        errors = validate_expression("*/0 * *")
+        self.assertEqual(errors[0], ValidationError('expression', 0, 7, "Cron expression must contain exactly 5 time fields and 1 command field"))
+        self.assertEqual(errors[1:], [ValidationError('minute', 2, 3, "Invalid step value")])
+
+    def test_validate_expression_agrees_with_the_parser(self):
+        """Test that validation accepts exactly what expansion accepts, with the parser's offset and message."""
+        for field in ["*", "*/5", "5/10", "0-30/5", "1,5-7,*/20", ",", "1-", "-1", "*/", "**", "5-1", "1-60", "0/0", "60", "1,,2", "1-2-3", "١"]:
+            line = f"{field} * * * * /cmd"
+            try:
+                expand_field('minute', field)
+            except CronSyntaxError as error:
+                self.assertIn((error.offset, error.message), [(found.start, found.message) for found in validate_expression(line)], field)
+            else:
+                self.assertEqual(validate_expression(line), [], field)
+
+    def test_validate_command_line(self):
+        """Test that --validate prints one located line per error and fails if any line is invalid."""
+        lines = ["# comment\n", "0 0 * * * /ok\n", "  61 25 * * * /bad\n"]
+        out, err = io.StringIO(), io.StringIO()
+        self.assertEqual(run_validate(lines, out, err, source="crontab"), 1)
+        self.assertEqual(out.getvalue().splitlines(), ["crontab:3:3: minute: Invalid value", "crontab:3:6: hour: Invalid value"])
+        self.assertIn("Validated 2 expressions: 1 valid, 1 invalid", err.getvalue())
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+            handle.write("0 0 * * * /ok\n")
+        self.addCleanup(os.unlink, handle.name)
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["--validate", "--input", handle.name]), 0)
+        self.assertEqual(out.getvalue(), "")
+
+    ## Tests for names, macros, "L" and "#"
+    def test_names_and_macros_match_numeric_syntax(self):
+        """Test that month and weekday names and @macros give the same bitsets as numbers."""
+        pairs = [
+            ("0 9 * JAN-mar,Dec MON-FRI /cmd", "0 9 * 1-3,12 1-5 /cmd"),
+            ("0 9 * jan/2 sun,SAT /cmd", "0 9 * 1/2 0,6 /cmd"),
+        ]
+        pairs += [(f"{macro} /cmd", f"{fields} /cmd") for macro, fields in MACROS.items()]
+        for named, numeric in pairs:
+            self.assertEqual(CompiledCronExpression(named).schedule_key, CompiledCronExpression(numeric).schedule_key, named)
+        self.assertEqual(ExpandedCronExpression("@HOURLY /cmd").command, "/cmd")
+        self.assertEqual(parse_raw_components("@weekly /cmd"), ("0", "0", "*", "*", "0"))
+
+    def test_last_and_nth_match_calendar(self):
+        """Test "L", "wL" and "w#n" against the calendar for every day of three years."""
+        def last_day(day):
+            return day.day == calendar.monthrange(day.year, day.month)[1]
+
+        def last_week(day):
+            return (day + timedelta(days=7)).month != day.month
+
+        references = {
+            "0 0 L * * /cmd": last_day,
+            "0 0 * * 5L /cmd": lambda day: day.isoweekday() == 5 and last_week(day),
+            "0 0 * * MON#1,FRI#3 /cmd": lambda day: (day.isoweekday(), (day.day - 1) // 7 + 1) in ((1, 1), (5, 3)),
+            "0 0 * * 0#5 /cmd": lambda day: day.isoweekday() == 7 and day.day > 28,
+            "0 0 1 * 3L /cmd": lambda day: day.day == 1 or (day.isoweekday() == 3 and last_week(day)),
+            "0 0 L 2 * /cmd": lambda day: day.month == 2 and last_day(day),
+        }
+        start, end = datetime(2023, 1, 1), datetime(2026, 1, 1)
+        days = [start + timedelta(days=offset) for offset in range((end - start).days)]
+        for expression, reference in references.items():
+            compiled = CompiledCronExpression(expression)
+            expected = [day for day in days if reference(day)]
+            self.assertEqual([day for day in days if compiled.matches(day)], expected, expression)
+            self.assertEqual(list(compiled.iter_runs(start, end)), expected, expression)
+            self.assertEqual(compiled.count_runs(start, end), len(expected), expression)
+            self.assertEqual(compiled.prev_run(end), expected[-1], expression)
+            self.assertFalse(compiled.matches(expected[0] + timedelta(minutes=1)), expression)
+
+    def test_weekday_cache_ignores_extended_bits(self):
+        """Test that "w#n" and "wL" schedules share the plain weekday cache entries instead of adding their own."""
+        compiled = CompiledCronExpression("0 0 * * 1-5 /cmd")
+        compiled._days_mask(2024, 1)
+        before = _weekday_days_mask.cache_info().currsize
+        for expression in ("0 0 * * 1-5,MON#2 /cmd", "0 0 * * 1-5,3L /cmd", "0 0 * * 1-5,0#5,6L /cmd"):
+            CompiledCronExpression(expression)._days_mask(2024, 1)
+        self.assertEqual(_weekday_days_mask.cache_info().currsize, before)
+        self.assertIsNotNone(_weekday_days_mask.cache_info().maxsize)
+
+    def test_extended_syntax_comes_from_the_field_kind(self):
+        """Test that names and "L" need the field's syntax, not merely month or day-of-month bounds."""
+        for field, min_val, max_val in (("JAN-MAR", 1, 12), ("L", 1, 31), ("MON#2", 0, 6)):
+            with self.assertRaises(CronSyntaxError):
+                expand_expression("value", field, list(range(min_val, max_val + 1)), min_val, max_val)
+        spec = FIELD_SPECS["month"]
+        self.assertEqual(expand_expression(spec.component, "JAN-MAR", spec.options, spec.min_val, spec.max_val, spec.syntax), [1, 2, 3])
+        self.assertEqual(expand_field("dom", "1,L").values, (1, "L"))
+
+    def test_extended_syntax_ast_and_errors(self):
+        """Test the AST nodes for "L" and "#" and where their errors point."""
+        self.assertEqual(parse_field("L", "dom", FIELD_SPECS["dom"].syntax), FieldLast(None, 0))
+        self.assertEqual(
+            parse_field("5L,MON#2", "dow", FIELD_SPECS["dow"].syntax),
+            FieldList((FieldLast(5, 0), FieldNth(1, 2, 3, 7))),
+        )
+        for expression, message, offset in (
+            ("0 0 * * 1#6 /cmd", "Invalid nth weekday", 2),
+            ("0 0 * * 7L /cmd", "Invalid value", 0),
+            ("0 0 * JANUARY * /cmd", "Unknown name 'JANUARY'", 0),
+            ("0 0 5L * * /cmd", "Unexpected character 'L'", 1),
+            ("L * * * * /cmd", "Unexpected character 'L'", 0),
+        ):
+            with self.assertRaises(CronSyntaxError) as context:
+                CompiledCronExpression(expression)
+            self.assertEqual((context.exception.message, context.exception.offset), (message, offset), expression)
+        for expression, message in (
+            ("@reboot /cmd", "@reboot runs once at startup and has no schedule"),
+            ("@sometimes /cmd", "Unknown macro '@sometimes'"),
+            ("@daily", "A macro must be followed by exactly 1 command field"),
+        ):
+            with self.assertRaisesRegex(ValueError, message):
+                parse_expression(expression)
+
+    def test_extended_syntax_expanded_and_canonical_forms(self):
+        """Test that "L" and "#" tokens follow the numbers and that redundant ones are dropped."""
+        expanded = ExpandedCronExpression("0 0 L,15 JAN-MAR SUN,5L,MON#2 /cmd")
+        compiled = expanded.compile()
+        self.assertEqual((expanded.expanded_dom, expanded.expanded_dow), ((15, "L"), (0, "1#2", "5L")))
+        self.assertEqual((compiled.expanded_dom, compiled.expanded_dow), ([15, "L"], [0, "1#2", "5L"]))
+        self.assertEqual(expanded.canonical_expression, "0 0 15,L 1-3 0,1#2,5L /cmd")
+        self.assertEqual(CompiledCronExpression(expanded.canonical_expression).schedule_key, compiled.schedule_key)
+        self.assertTrue(compiled.date_dependent)
+        self.assertFalse(CompiledCronExpression("@monthly /cmd").date_dependent)
+        for expression, canonical in (("0 0 * * *,5#2 /cmd", "0 0 * * * /cmd"), ("0 0 * * 5,5L /cmd", "0 0 * * 5 /cmd"), ("0 0 28-31,L * * /cmd", "0 0 28-31 * * /cmd")):
+            self.assertEqual(canonicalize(expression), canonical)
+
+    def test_validate_extended_syntax(self):
+        """Test that validation accepts the extended syntax and reports its errors like the parser."""
+        self.assertEqual(validate_expression("0 9 L JAN-MAR MON#1,5L /cmd"), [])
+        self.assertEqual(validate_expression("@daily /cmd"), [])
+        self.assertEqual(validate_expression("0 0 * * 1#6 /cmd"), [ValidationError('dow', 10, 11, "Invalid nth weekday")])
+        self.assertEqual(validate_expression("0 0 * JANUARY FOO /cmd"), [
+            ValidationError('month', 6, 13, "Unknown name 'JANUARY'"),
+            ValidationError('dow', 14, 17, "Unknown name 'FOO'"),
+        ])
+        self.assertEqual(validate_expression("@reboot /cmd"), [ValidationError('expression', 0, 7, "@reboot runs once at startup and has no schedule")])
+
+    ## Tests for output writers
+    def test_table_output_write_matches_render(self):
+        """Test that streaming a table writes the rendered text plus a final newline."""
+        data = ExpandedCronExpression("*/15 0 1,15 * 1 /cmd").to_table_format()
+        out = io.StringIO()
+        TableOutput(data).write(out)
+        self.assertEqual(out.getvalue(), TableOutput(data).render() + "\n")
+
+    def test_jsonl_writer_raw_and_expanded(self):
+        """Test that JSON Lines gives field lists for expanded and strings for raw expressions."""
+        out = io.StringIO()
+        writer = JsonLinesWriter(out)
+        writer.write(ExpandedCronExpression("*/30 0 1 * 1-2 /cmd"), line_number=3)
+        writer.write(RawCronExpression("*/30 0 1 * 1-2 /cmd"))
+        writer.write_error("bad", line_number=4)
+        expanded, raw, error = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(expanded["line"], 3)
+        self.assertEqual(expanded["minute"], [0, 30])
+        self.assertEqual(expanded["day_of_week"], [1, 2])
+        self.assertEqual(raw, {"minute": "*/30", "hour": "0", "day_of_month": "1", "month": "*", "day_of_week": "1-2", "command": "/cmd"})
+        self.assertEqual(error, {"line": 4, "error": "bad"})
+
+    def test_csv_writer_from_parse_crontab(self):
+        """Test that bulk parse results stream into CSV with one header and per-line errors."""
+        out = io.StringIO()
+        failed = CsvWriter(out).write_results(parse_crontab(["0 0 1 * * /a", "# skip", "0 0 32 * * /b"]))
+        self.assertEqual(failed, 1)
+        rows = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(rows[0], ["line", "minute", "hour", "day_of_month", "month", "day_of_week", "command", "error"])
+        self.assertEqual(rows[1][:4], ["1", "0", "0", "1"])
+        self.assertEqual(rows[1][4], "1 2 3 4 5 6 7 8 9 10 11 12")
+        self.assertEqual(rows[2][0], "3")
+        self.assertIn("day(s) of month", rows[2][7])
+
+    def test_table_writer_separates_entries(self):
+        """Test that the table writer separates entries with a blank line."""
+        out = io.StringIO()
+        writer = TableWriter(out)
+        writer.write(RawCronExpression("1 * * * * /a"))
+        writer.write_error("oops", line_number=2)
+        self.assertTrue(out.getvalue().endswith("command        /a\n\nError: line 2: oops\n"))
+
+    def test_cli_format_flag(self):
+        """Test --format for single expressions and for batch mode."""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(["*/30 * * * * /cmd", "expanded", "--format", "jsonl"]), 0)
+        self.assertEqual(json.loads(out.getvalue())["minute"], [0, 30])
+        out, err = io.StringIO(), io.StringIO()
+        run_batch("raw", ["1 2 3 4 5 /a"], out, err, output_format="csv")
+        self.assertEqual(out.getvalue().splitlines()[1], "1,1,2,3,4,5,/a,")
+
+    def test_cli_format_flag_any_position_and_bad_values(self):
+        """Test that --format is accepted anywhere on a single-expression command line and bad values are reported."""
+        for argv in (["--format", "csv", "1 2 3 4 5 /a", "raw"], ["1 2 3 4 5 /a", "--format", "csv", "raw"], ["1 2 3 4 5 /a", "raw", "--format=csv"]):
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main(argv), 0, argv)
+            self.assertEqual(out.getvalue().splitlines()[1], ",1,2,3,4,5,/a,", argv)  # no line number for a single expression
+        for argv, message in (
+            (["1 2 3 4 5 /a", "raw", "--format", "xml"], "invalid choice: 'xml'"),
+            (["1 2 3 4 5 /a", "raw", "--jobs", "2"], "--jobs, --input and --stats only apply"),
+            (["1 2 3 4 5 /a", "--batch", "raw"], "cannot be given with --batch"),
+        ):
+            err = io.StringIO()
+            with redirect_stderr(err), self.assertRaises(SystemExit):
+                main(argv)
+            self.assertIn(message, err.getvalue(), argv)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(["1 2 3 4 5 /a"]), 1)
+        self.assertTrue(out.getvalue().startswith("USAGE:"))
+
+    def test_formatters_and_abstract_writers(self):
+        """Test that formatters need no stream and a writer missing format() cannot be created."""
+        formatter = JsonLinesFormatter()
+        self.assertEqual(json.loads(formatter.format(RawCronExpression("1 2 3 4 5 /a"), 7))["line"], 7)
+        self.assertEqual(formatter.format_error("bad"), '{"error": "bad"}\n')
+
+        class PartialWriter(OutputWriter):
+            def format(self, expression, line_number=None):
+                return ""
+
+        with self.assertRaises(TypeError):
+            PartialWriter(io.StringIO())
+
+    ## Tests for lazy, slots-based expressions
+    def test_expressions_have_no_instance_dict(self):
+        """Test that expression objects use __slots__."""
+        for expression_class in (RawCronExpression, ExpandedCronExpression, CompiledCronExpression):
+            self.assertFalse(hasattr(expression_class("*/5 * * * * /cmd"), "__dict__"), expression_class)
+
+    def test_expanded_fields_are_expanded_on_first_access(self):
+        """Test that construction expands nothing and each field is expanded once."""
+        clear_field_cache()
+        expanded = ExpandedCronExpression("7 8 9 10 1 /cmd")
+        self.assertEqual(field_cache_stats()["misses"], 0)
+        self.assertEqual(expanded.expanded_hour, (8,))
+        self.assertEqual(expanded.expanded_hour, (8,))
+        self.assertEqual(field_cache_stats()["misses"] + field_cache_stats()["hits"], 1)
+
+    def test_invalid_field_raises_on_access(self):
+        """Test that an invalid field raises when read, while other fields stay usable."""
+        expanded = ExpandedCronExpression("0 24 * * * /cmd")
+        self.assertEqual(expanded.command, "/cmd")
+        self.assertEqual(expanded.expanded_minute, (0,))
+        with self.assertRaises(ValueError):
+            expanded.expanded_hour
+        with self.assertRaises(ValueError):
+            expanded.compile()
+
+    def test_expression_text_is_split_once(self):
+        """Test that constructing an expression parses the text only once."""
+        with mock.patch("cron_parser.parse_expression", wraps=parse_expression) as parse:
+            expanded = ExpandedCronExpression("*/5 1 2 3 4 /cmd")
+            RawCronExpression("*/5 1 2 3 4 /cmd").to_table_format()
+            expanded.to_table_format()
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual((expanded.minute, expanded.dow), ("*/5", "4"))
+
+    ## Tests for canonical schedules and interning
+    def test_canonical_forms_of_equivalent_fields(self):
+        """Test that different spellings of a schedule share one canonical form."""
+        for expression in ("*/15 * * * * /cmd", "0,15,30,45 * * * * /cmd", "0-59/15 0-23 1-31 1-12 0-6 /cmd"):
+            self.assertEqual(canonicalize(expression), "*/15 * * * * /cmd")
+        self.assertEqual(canonicalize("5,10,20,40 1,2,3 */2 2,4,6,8,10 1-5 /cmd"), "5,10,20,40 1-3 */2 2-10/2 1-5 /cmd")
+        self.assertEqual(canonicalize("0,15,30,45,50 9-17/2 1 1 0,6 /cmd"), "*/15,50 9-17/2 1 1 0,6 /cmd")
+
+    def test_canonical_form_round_trips(self):
+        """Test that expanding the canonical text gives back the same bitsets."""
+        for expression in ("1/7 3-9,20 2,4,7-9 */3 1,3,5 /cmd", "59 0 31 12 6 /cmd", "2,3,5,7,11,13,17 * * * * /cmd"):
+            compiled = CompiledCronExpression(expression)
+            self.assertEqual(CompiledCronExpression(canonicalize(expression)).schedule_key, compiled.schedule_key)
+            self.assertEqual(canonical_schedule(compiled.schedule_key), canonicalize(expression).rsplit(" ", 1)[0])
+
+    def test_expanded_equality_and_hash(self):
+        """Test value-based equality: same schedule and command, regardless of spelling."""
+        first = ExpandedCronExpression("*/15 * * * * /cmd")
+        second = ExpandedCronExpression("0,15,30,45 * * 1-12 * /cmd")
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second}), 1)
+        self.assertNotEqual(first, ExpandedCronExpression("*/15 * * * * /other"))
+        self.assertNotEqual(first, ExpandedCronExpression("*/20 * * * * /cmd"))
+        self.assertNotEqual(first, "*/15 * * * * /cmd")
+
+    def test_intern_schedule_shares_compiled_objects(self):
+        """Test that equivalent schedules share one interned compiled object."""
+        first = ExpandedCronExpression("*/15 * * * * /a")
+        second = ExpandedCronExpression("0,15,30,45 * * * * /b")
+        shared = intern_schedule(first)
+        self.assertIs(intern_schedule(second), shared)
+        self.assertIs(intern_schedule("0-59/15 * * * * /c"), shared)
+        self.assertEqual(shared.cron_expression, "*/15 * * * *")
+        self.assertEqual(shared.command, "")
+        self.assertEqual(first.next_run(datetime(2024, 1, 1, 0, 1)), datetime(2024, 1, 1, 0, 15))
+        self.assertIs(first._schedule(), second._schedule())
+
+    def test_group_by_schedule(self):
+        """Test that expressions are grouped by their shared schedule, in input order."""
+        lines = ["*/15 * * * * /a", "0 0 * * * /b", "0,15,30,45 * * * * /c", "0 0 1-31 * * /d"]
+        groups = group_by_schedule(lines)
+        self.assertEqual(list(groups.values()), [[lines[0], lines[2]], [lines[1], lines[3]]])
+        self.assertEqual([schedule.cron_expression for schedule in groups], ["*/15 * * * *", "0 0 * * *"])
+
+    ## Tests for instrumentation
+    def test_instrumentation_is_removed_when_disabled(self):
+        """Test that enabling swaps in timed wrappers and disabling restores the originals."""
+        matches = CompiledCronExpression.matches
+        self.addCleanup(disable_instrumentation)
+        enable_instrumentation()
+        self.assertTrue(instrumentation_enabled())
+        self.assertIsNot(CompiledCronExpression.matches, matches)
+        disable_instrumentation()
+        self.assertFalse(instrumentation_enabled())
+        self.assertIs(CompiledCronExpression.matches, matches)
+
+    def test_instrumentation_counts_stages(self):
+        """Test per-stage call counts, histograms and reset."""
+        clear_field_cache()
+        reset_stats()
+        self.addCleanup(disable_instrumentation)
+        enable_instrumentation()
+        compiled = ExpandedCronExpression("1-5 0 * * * /cmd").compile()
+        compiled.matches(datetime(2024, 1, 1, 0, 3))
+        expand_cron_expression("1-5 0 * * * /cmd")
+        disable_instrumentation()
+        compiled.matches(datetime(2024, 1, 1))  # not counted once disabled
+        snapshot = stats_snapshot()
+        stages = snapshot["stages"]
+        self.assertEqual(stages["tokenize"]["calls"], 2 + 1)  # two expressions split, "0" parsed; "1-5" takes the plain-range fast path
+        self.assertEqual(stages["expand"]["calls"], 5)
+        self.assertEqual(stages["compile"]["calls"], 1)
+        self.assertEqual(stages["match"]["calls"], 1)
+        self.assertEqual(stages["render"]["calls"], 1)
+        self.assertEqual(sum(stages["match"]["histogram"].values()), 1)
+        self.assertEqual(snapshot["field_cache"]["hits"], 5)
+        reset_stats()
+        snapshot = stats_snapshot()
+        self.assertEqual(snapshot["stages"]["match"]["calls"], 0)
+        self.assertEqual((snapshot["field_cache"]["hits"], snapshot["field_cache"]["misses"]), (0, 0))
+        self.assertGreater(snapshot["field_cache"]["size"], 0)  # entries survive a counter reset
+
+    def test_expansion_is_not_counted_as_validation(self):
+        """Test that expanding a field is attributed to tokenize and expand only, and --validate checks to validate."""
+        clear_field_cache()
+        reset_stats()
+        self.addCleanup(disable_instrumentation)
+        enable_instrumentation()
+        expand_field("minute", "1-5,*/7,30")
+        stages = stats_snapshot()["stages"]
+        self.assertEqual((stages["tokenize"]["calls"], stages["expand"]["calls"], stages["validate"]["calls"]), (1, 1, 0))
+        run_validate(["1-5,*/7 * * * * /cmd"], io.StringIO(), io.StringIO())
+        stages = stats_snapshot()["stages"]
+        self.assertEqual((stages["expand"]["calls"], stages["validate"]["calls"]), (1, 1))
+
+    def test_batch_stats_flag(self):
+        """Test that --stats prints the stage breakdown after the batch summary."""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+            handle.write("*/15 0 1,15 * 1-5 /usr/bin/find\n")
+        self.addCleanup(os.unlink, handle.name)
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            status = main(["--batch", "expanded", "--input", handle.name, "--stats"])
+        self.assertEqual(status, 0)
+        lines = err.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("Processed 1 expressions"))
+        self.assertEqual(lines[1].split()[:5], ["stage", "calls", "total", "ms", "mean"])
+        self.assertEqual([line.split()[0] for line in lines[2:8]], ["tokenize", "expand", "validate", "compile", "match", "render"])
+        self.assertIn("field cache:", err.getvalue())
+        self.assertFalse(instrumentation_enabled())
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,149 @@
+import pickle
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+import cron_registry
+from cron_registry import ExpressionRegistry, FrozenCronExpression, shared_expression, shared_registry
+from cron_parser import FIELD_KINDS, CompiledCronExpression, CronSyntaxError, ExpandedCronExpression
+
+
+class TestFrozenCronExpression(unittest.TestCase):
+
+    def test_fields_are_expanded_up_front(self):
+        """Test that every field is expanded by the constructor and matches the other expression classes."""
+        expression = "*/15 0 1,15,L JAN-MAR 1-5 /usr/bin/find"
+        frozen = FrozenCronExpression(expression)
+        expanded = ExpandedCronExpression(expression)
+        self.assertEqual(
+            [frozen.expanded_minute, frozen.expanded_hour, frozen.expanded_dom, frozen.expanded_month, frozen.expanded_dow],
+            [expanded.expanded_minute, expanded.expanded_hour, expanded.expanded_dom, expanded.expanded_month, expanded.expanded_dow],
+        )
+        self.assertIs(frozen.expanded_field("dom"), expanded.expanded_field("dom"))
+        self.assertEqual(frozen.schedule_key, CompiledCronExpression(expression).schedule_key)
+        self.assertEqual(frozen.next_run(datetime(2024, 1, 1, 0, 50)), datetime(2024, 1, 2))  # a weekday, as either day field may match
+        self.assertEqual((frozen.dom, frozen.command), ("1,15,L", "/usr/bin/find"))
+        with self.assertRaises(CronSyntaxError):
+            FrozenCronExpression("* * * 13 * /cmd")
+
+    def test_cannot_be_changed(self):
+        """Test that assigning or deleting any attribute fails and that pickling rebuilds the expression."""
+        frozen = FrozenCronExpression("0 9 * * 1-5 /cmd")
+        for name in ("minute_mask", "command", "fields", "other"):
+            with self.assertRaises(AttributeError):
+                setattr(frozen, name, 0)
+        with self.assertRaises(AttributeError):
+            del frozen.minute_mask
+        self.assertIsInstance(frozen.raw_expression, tuple)
+        copied = pickle.loads(pickle.dumps(frozen))
+        self.assertEqual((copied.cron_expression, copied.schedule_key), (frozen.cron_expression, frozen.schedule_key))
+
+    def test_alternate_constructors(self):
+        """Test that from_expanded and from_masks build frozen expressions equal to the constructor's."""
+        expression = "*/15 0 1,15,L JAN-MAR 1-5,FRI#3 /usr/bin/find"
+        frozen = FrozenCronExpression(expression)
+        compiled = CompiledCronExpression(expression)
+        for built in (
+            FrozenCronExpression.from_expanded(ExpandedCronExpression(expression)),
+            FrozenCronExpression.from_masks(expression, *compiled.schedule_key),
+        ):
+            self.assertIsInstance(built, FrozenCronExpression)
+            self.assertEqual(built.schedule_key, frozen.schedule_key)
+            self.assertEqual([built.expanded_field(kind) for kind in FIELD_KINDS], [frozen.expanded_field(kind) for kind in FIELD_KINDS])
+            self.assertEqual((built.raw_expression, built.command), (frozen.raw_expression, frozen.command))
+            with self.assertRaises(AttributeError):
+                built.minute_mask = 0
+
+
+class TestExpressionRegistry(unittest.TestCase):
+
+    def test_shares_one_object_per_text(self):
+        """Test that repeated lookups return the same object and remember invalid expressions."""
+        registry = ExpressionRegistry()
+        first = registry.get("*/5 * * * * /cmd")
+        self.assertIs(registry.get("*/5 * * * * /cmd"), first)
+        self.assertIn("*/5 * * * * /cmd", registry)
+        self.assertIsNone(registry.validate("*/5 * * * * /cmd"))
+        error = registry.validate("61 * * * * /cmd")
+        self.assertIsInstance(error, CronSyntaxError)
+        with self.assertRaises(CronSyntaxError) as context:
+            registry.get("61 * * * * /cmd")
+        self.assertIsNot(context.exception, error)
+        self.assertEqual(str(context.exception), str(error))
+        self.assertEqual(registry.stats(), {'computed': 2, 'waited': 0, 'evictions': 0, 'size': 2, 'maxsize': cron_registry.REGISTRY_SIZE})
+        self.assertIs(shared_expression("0 0 * * * /cmd"), shared_registry().get("0 0 * * * /cmd"))
+
+    def test_evicts_oldest_entries(self):
+        """Test that entries beyond maxsize are dropped oldest first."""
+        registry = ExpressionRegistry(maxsize=2)
+        for minute in range(3):
+            registry.get(f"{minute} * * * * /cmd")
+        self.assertEqual(len(registry), 2)
+        self.assertNotIn("0 * * * * /cmd", registry)
+        self.assertEqual(registry.stats()["evictions"], 1)
+        registry.clear()
+        self.assertEqual((len(registry), registry.stats()["computed"]), (0, 0))
+
+    def test_concurrent_misses_compute_once(self):
+        """Test that threads missing on the same text wait for the one thread expanding it."""
+        registry = ExpressionRegistry()
+        release = threading.Event()
+        calls = []
+
+        def slow_freeze(cron_expression):
+            calls.append(cron_expression)
+            release.wait(5)
+            return FrozenCronExpression(cron_expression)
+
+        results = []
+        with mock.patch("cron_registry.FrozenCronExpression", side_effect=slow_freeze):
+            threads = [threading.Thread(target=lambda: results.append(registry.get("0 12 * * * /cmd"))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while registry.stats()["waited"] < 7 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(calls, ["0 12 * * * /cmd"])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(registry.stats()["waited"], 7)
+
+    def test_unexpected_errors_are_not_remembered(self):
+        """Test that an error other than ValueError reaches the caller and the next lookup retries."""
+        registry = ExpressionRegistry()
+        with mock.patch("cron_registry.FrozenCronExpression", side_effect=MemoryError):
+            with self.assertRaises(MemoryError):
+                registry.get("0 0 * * * /cmd")
+        self.assertNotIn("0 0 * * * /cmd", registry)
+        self.assertEqual(registry.get("0 0 * * * /cmd").command, "/cmd")
+
+    def test_many_threads_agree(self):
+        """Test many threads looking up overlapping valid and invalid texts at once."""
+        registry = ExpressionRegistry(maxsize=64)
+        texts = [f"{minute} {minute % 24} * * * /job" for minute in range(60)] + ["61 * * * * /bad", "* * * /short"]
+        seen = [{} for _ in range(8)]
+
+        def worker(found):
+            for round_number in range(20):
+                for text in texts[round_number % 3::2] + texts[::-7]:
+                    entry = registry.resolve(text)
+                    found.setdefault(text, set()).add(type(entry) if isinstance(entry, ValueError) else entry.schedule_key)
+
+        threads = [threading.Thread(target=worker, args=(found,)) for found in seen]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        for text in texts:
+            answers = set().union(*(found.get(text, set()) for found in seen))
+            self.assertEqual(len(answers), 1, text)
+        self.assertEqual(registry.get(texts[5]).schedule_key, CompiledCronExpression(texts[5]).schedule_key)
+        self.assertLessEqual(len(registry), 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from cron_scheduler import CronScheduler, SimulatedClock
+
+
+class TestCronScheduler(unittest.TestCase):
+
+    START = datetime(2024, 1, 1, 0, 0, 30)
+
+    def run_scheduler(self, scheduler, until):
+        asyncio.run(asyncio.wait_for(scheduler.run(until=until), timeout=10))
+
+    def test_simulates_days_of_runs(self):
+        """Test that an hourly job runs 72 times over three simulated days, at its exact fire times."""
+        clock = SimulatedClock(self.START)
+        scheduler = CronScheduler(clock=clock)
+        fired = []
+
+        async def record(fire_time):
+            self.assertEqual(clock.now(), fire_time)
+            fired.append(fire_time)
+
+        scheduler.add_job("hourly", "0 * * * * /cmd", record)
+        self.run_scheduler(scheduler, self.START + timedelta(days=3))
+        self.assertEqual(len(fired), 72)
+        self.assertEqual(fired[0], datetime(2024, 1, 1, 1, 0))
+        self.assertEqual(fired[-1], datetime(2024, 1, 4, 0, 0))
+        self.assertEqual(scheduler.get_job("hourly").runs, 72)
+
+    def test_jobs_interleave_in_fire_time_order(self):
+        """Test that the heap dispatches several jobs in chronological order."""
+        clock = SimulatedClock(self.START)
+        scheduler = CronScheduler(clock=clock)
+        fired = []
+        scheduler.add_job("a", "*/20 * * * * /a", lambda fire_time: fired.append(("a", fire_time.minute)))
+        scheduler.add_job("b", "*/30 * * * * /b", lambda fire_time: fired.append(("b", fire_time.minute)))
+        self.run_scheduler(scheduler, datetime(2024, 1, 1, 1, 0))
+        self.assertEqual(fired, [("a", 20), ("b", 30), ("a", 40)])
+
+    def test_concurrency_limit(self):
+        """Test that no more than max_concurrency runs execute at once."""
+        scheduler = CronScheduler(max_concurrency=2, clock=SimulatedClock(self.START))
+        active = []
+        peak = []
+
+        async def work(fire_time):
+            active.append(fire_time)
+            peak.append(len(active))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            active.pop()
+
+        for job_id in range(5):
+            scheduler.add_job(job_id, "0 * * * * /cmd", work)
+        self.run_scheduler(scheduler, datetime(2024, 1, 1, 1, 1))
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(sum(scheduler.get_job(job_id).runs for job_id in range(5)), 5)
+
+    def test_cancel_stops_future_runs(self):
+        """Test that a job cancelled from inside another job never runs again."""
+        scheduler = CronScheduler(clock=SimulatedClock(self.START))
+        fired = []
+
+        def cancel_other(fire_time):
+            fired.append(fire_time)
+            scheduler.cancel("victim")
+
+        scheduler.add_job("victim", "30 * * * * /cmd", lambda fire_time: fired.append("victim"))
+        scheduler.add_job("canceller", "10 2 * * * /cmd", cancel_other)
+        self.run_scheduler(scheduler, datetime(2024, 1, 1, 6, 0))
+        self.assertEqual(fired.count("victim"), 2)  # 00:30 and 01:30
+        self.assertIsNone(scheduler.get_job("victim"))
+
+    def test_add_job_wakes_idle_loop_and_stop(self):
+        """Test that a job added while the loop is idle is picked up, and stop() ends run()."""
+        scheduler = CronScheduler(clock=SimulatedClock(self.START))
+        fired = []
+
+        def record(fire_time):
+            fired.append(fire_time)
+            if len(fired) == 3:
+                scheduler.stop()
+
+        async def main():
+            runner = asyncio.ensure_future(scheduler.run())
+            await asyncio.sleep(0)
+            scheduler.add_job("late", "*/5 * * * * /cmd", record)
+            await asyncio.wait_for(runner, timeout=10)
+
+        asyncio.run(main())
+        self.assertEqual([fire_time.minute for fire_time in fired], [5, 10, 15])
+
+    def test_failures_are_recorded(self):
+        """Test that an exception in one run is recorded and the job keeps being scheduled."""
+        scheduler = CronScheduler(clock=SimulatedClock(self.START))
+
+        def fail(fire_time):
+            raise RuntimeError("boom")
+
+        job = scheduler.add_job("flaky", "*/15 * * * * /cmd", fail)
+        with self.assertLogs("cron_scheduler", level="ERROR"):
+            self.run_scheduler(scheduler, datetime(2024, 1, 1, 1, 0))
+        self.assertEqual((job.runs, job.failures), (3, 3))  # 00:15, 00:30, 00:45
+        self.assertIsInstance(job.last_error, RuntimeError)
+
+    def test_runs_command_in_subprocess(self):
+        """Test that a job without an action runs its command in a shell."""
+        scheduler = CronScheduler(clock=SimulatedClock(self.START))
+        ok = scheduler.add_job("ok", "* * * * * true")
+        failing = scheduler.add_job("failing", "* * * * * false")
+        with self.assertLogs("cron_scheduler", level="ERROR"):
+            self.run_scheduler(scheduler, datetime(2024, 1, 1, 0, 2))
+        self.assertEqual((ok.runs, ok.failures), (1, 0))
+        self.assertEqual((failing.runs, failing.failures), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import errno
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+from cron_parser import DAEMON_SOCKET_ENV, _forward_to_daemon, daemon_request, daemon_socket_path, ensure_private_directory, expand_cron_expression, is_trusted_socket, main
+from cron_server import CronServer
+
+
+class TestCronServer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "cron.sock")
+        self.server = CronServer(self.socket_path)
+        self.thread = threading.Thread(target=asyncio.run, args=(self.server.serve(),), daemon=True)
+        self.thread.start()
+        self.assertTrue(self.server.ready.wait(5))
+
+    def tearDown(self):
+        self.server.stop()
+        self.thread.join(5)
+        self.directory.cleanup()
+
+    def request(self, **payload):
+        return daemon_request(payload, self.socket_path)
+
+    def test_expand_and_raw(self):
+        """Test that expand and raw answer with the same tables as the CLI."""
+        expression = "*/15 0 1,15 * 1-5 /usr/bin/find"
+        self.assertEqual(self.request(op="expand", expression=expression), {"ok": True, "result": expand_cron_expression(expression)})
+        self.assertTrue(self.request(op="raw", expression=expression)["result"].startswith("minute         */15"))
+
+    def test_validate_and_errors(self):
+        """Test that validation failures are results while malformed requests are errors."""
+        self.assertEqual(self.request(op="validate", expression="0 0 * * * /ok")["result"], {"valid": True})
+        invalid = self.request(op="validate", expression="0 24 * * * /bad")["result"]
+        self.assertFalse(invalid["valid"])
+        self.assertIn("hour", invalid["error"])
+        self.assertFalse(self.request(op="expand", expression="0 24 * * * /bad")["ok"])
+        self.assertFalse(self.request(op="explode", expression="0 0 * * * /ok")["ok"])
+        self.assertFalse(self.request(op="expand")["ok"])
+
+    def test_next_run_and_warm_cache(self):
+        """Test next_run replies and that repeated expressions hit the compiled cache."""
+        reply = self.request(op="next_run", expression="0 0 29 2 * /leap", after="2025-01-01T00:00", count=2)
+        self.assertEqual(reply["result"], ["2028-02-29T00:00:00", "2032-02-29T00:00:00"])
+        self.request(op="next_run", expression="0 0 29 2 * /leap", after="2025-01-01T00:00")
+        self.assertEqual(self.request(op="stats")["result"]["hits"], 1)
+        self.assertEqual(self.request(op="next_run", expression="0 0 30 2 * /never")["result"], [])
+
+    def test_concurrent_clients(self):
+        """Test that many clients can talk to the daemon at the same time."""
+        results = []
+
+        def client(minute):
+            results.append(self.request(op="expand", expression=f"{minute} * * * * /job")["result"].splitlines()[0])
+
+        threads = [threading.Thread(target=client, args=(minute,)) for minute in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(sorted(results), sorted(f"minute         {minute}" for minute in range(20)))
+
+    def test_cli_forwards_to_running_daemon(self):
+        """Test that the single-expression CLI answers through the daemon when one is running."""
+        out = io.StringIO()
+        with mock.patch.dict(os.environ, {DAEMON_SOCKET_ENV: self.socket_path}), redirect_stdout(out):
+            with mock.patch.object(CronServer, "handle", wraps=self.server.handle) as handle:
+                self.assertEqual(main(["*/30 * * * * /cmd", "expanded"]), 0)
+                self.assertEqual(main(["*/30 * * * * /cmd", "nope"]), 1)
+        self.assertTrue(out.getvalue().startswith("minute         0 30\n"))
+        self.assertEqual(handle.call_count, 1)  # unknown parse commands never reach the daemon
+
+    def test_cli_ignores_untrusted_sockets(self):
+        """Test that the CLI only forwards to a socket owned by the current user."""
+        self.assertTrue(is_trusted_socket(self.socket_path))
+        with mock.patch.dict(os.environ, {DAEMON_SOCKET_ENV: self.socket_path}):
+            self.assertTrue(_forward_to_daemon("expand", "0 0 * * * /cmd")["ok"])
+            with mock.patch("cron_parser.os.getuid", return_value=os.getuid() + 1):
+                self.assertFalse(is_trusted_socket(self.socket_path))
+                self.assertIsNone(_forward_to_daemon("expand", "0 0 * * * /cmd"))
+        not_a_socket = os.path.join(self.directory.name, "file.sock")
+        open(not_a_socket, "w").close()
+        self.assertFalse(is_trusted_socket(not_a_socket))
+
+    def test_refuses_to_replace_a_running_daemon(self):
+        """Test that a second daemon on the same path fails and leaves the first one serving."""
+        with self.assertRaises(OSError) as context:
+            asyncio.run(CronServer(self.socket_path).serve())
+        self.assertEqual(context.exception.errno, errno.EADDRINUSE)
+        self.assertEqual(self.request(op="ping")["result"], "pong")
+
+    def test_socket_is_private(self):
+        """Test that the socket is created without group or other permissions."""
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o077, 0)
+
+
+class TestStaleSocket(unittest.TestCase):
+
+    def test_stale_socket_is_replaced_but_other_files_are_not(self):
+        """Test that a dead daemon's socket is removed while a regular file is refused."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cron.sock")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+                stale.bind(path)  # bound but never listening, as after a crash
+            server = CronServer(path)
+            thread = threading.Thread(target=asyncio.run, args=(server.serve(),), daemon=True)
+            thread.start()
+            self.assertTrue(server.ready.wait(5))
+            self.assertEqual(daemon_request({"op": "ping"}, path)["result"], "pong")
+            server.stop()
+            thread.join(5)
+
+            open(path, "w").close()
+            with self.assertRaises(PermissionError):
+                asyncio.run(CronServer(path).serve())
+            self.assertTrue(os.path.isfile(path))
+
+
+class TestDaemonSocketPath(unittest.TestCase):
+
+    def test_default_paths(self):
+        """Test the socket path precedence: $CRON_PARSER_SOCKET, $XDG_RUNTIME_DIR, then a private temp directory."""
+        with mock.patch.dict(os.environ, {DAEMON_SOCKET_ENV: "/run/custom.sock", "XDG_RUNTIME_DIR": "/run/user/1000"}):
+            self.assertEqual(daemon_socket_path(), "/run/custom.sock")
+            del os.environ[DAEMON_SOCKET_ENV]
+            self.assertEqual(daemon_socket_path(), "/run/user/1000/cron_parser.sock")
+            del os.environ["XDG_RUNTIME_DIR"]
+            self.assertEqual(daemon_socket_path(), os.path.join(tempfile.gettempdir(), f"cron_parser-{os.getuid()}", "daemon.sock"))
+
+    def test_private_directory(self):
+        """Test that the socket directory is created 0700 and that a directory others can enter is refused."""
+        with tempfile.TemporaryDirectory() as parent:
+            private = os.path.join(parent, "private")
+            ensure_private_directory(private)
+            self.assertEqual(os.stat(private).st_mode & 0o777, 0o700)
+            ensure_private_directory(private)  # already there and private
+            os.chmod(private, 0o755)
+            with self.assertRaises(PermissionError):
+                ensure_private_directory(private)
+            os.symlink(parent, os.path.join(parent, "link"))
+            with self.assertRaises(PermissionError):
+                ensure_private_directory(os.path.join(parent, "link"))
+
+
+if __name__ == '__main__':
+    unittest.main()
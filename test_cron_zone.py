@@ -0,0 +1,107 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from cron_parser import CompiledCronExpression
+from cron_zone import ZoneInfo, ZoneTransitions, ZonedCronExpression, clear_zone_cache, zone_transitions
+
+
+@unittest.skipIf(ZoneInfo is None, "zoneinfo is not available")
+class TestZonedCronExpression(unittest.TestCase):
+
+    def setUp(self):
+        self.new_york = ZoneInfo("America/New_York")
+
+    def local(self, *args, fold=0):
+        return datetime(*args, tzinfo=self.new_york, fold=fold)
+
+    def runs(self, expression, start, end, zone=None, **policies):
+        return list(ZonedCronExpression(expression, zone or self.new_york, **policies).iter_runs(start, end))
+
+    def stepping_reference(self, expression, zone, start, end):
+        """Every UTC minute whose local wall time matches, i.e. the 'skip' + 'both' policies."""
+        compiled = CompiledCronExpression(expression)
+        instant = start.astimezone(timezone.utc)
+        runs = []
+        while instant < end.astimezone(timezone.utc):
+            local = instant.astimezone(zone)
+            if compiled.matches(local):
+                runs.append(local)
+            instant += timedelta(minutes=1)
+        return runs
+
+    ## Tests for the transition cache
+    def test_transitions_are_found_to_the_second(self):
+        """Test that a year of New York transitions is found at 07:00 and 06:00 UTC."""
+        transitions = ZoneTransitions(self.new_york)
+        instants, offsets = transitions._year(2024)
+        self.assertEqual(instants, [datetime(2024, 3, 10, 7, 0), datetime(2024, 11, 3, 6, 0)])
+        self.assertEqual(offsets, [timedelta(hours=-5), timedelta(hours=-4), timedelta(hours=-5)])
+        self.assertEqual(transitions.to_utc(datetime(2024, 3, 10, 2, 30)), [])
+        self.assertEqual(transitions.to_utc(datetime(2024, 11, 3, 1, 30)), [datetime(2024, 11, 3, 5, 30), datetime(2024, 11, 3, 6, 30)])
+
+    def test_iterating_a_year_uses_the_cache(self):
+        """Test that the zone is only consulted while loading each year, not once per run."""
+        clear_zone_cache()
+        with mock.patch.object(ZoneTransitions, "_offset", autospec=True, side_effect=ZoneTransitions._offset) as offset:
+            runs = self.runs("*/10 * * * * /cmd", self.local(2024, 1, 1), self.local(2025, 1, 1))
+        self.assertEqual(len(runs), 366 * 144 - 6)  # the six 02:xx runs of the spring gap merge into the 03:00 run
+        self.assertLess(offset.call_count, 4 * 1500)  # at most a few years' samples, independent of the 52k runs
+        self.assertIs(zone_transitions("America/New_York"), zone_transitions(self.new_york))
+
+    ## Tests for nonexistent local times
+    def test_nonexistent_time_shifts_to_end_of_gap(self):
+        """Test that a run in the skipped hour happens once at 03:00, or is dropped with 'skip'."""
+        start, end = self.local(2024, 3, 9), self.local(2024, 3, 12)
+        self.assertEqual(self.runs("30 2 * * * /cmd", start, end), [self.local(2024, 3, 9, 2, 30), self.local(2024, 3, 10, 3, 0), self.local(2024, 3, 11, 2, 30)])
+        self.assertEqual(self.runs("30 2 * * * /cmd", start, end, nonexistent="skip"), [self.local(2024, 3, 9, 2, 30), self.local(2024, 3, 11, 2, 30)])
+        # Four skipped runs and the regular 03:00 run collapse into one
+        self.assertEqual(self.runs("*/15 2,3 10 3 * /cmd", start, end)[:3], [self.local(2024, 3, 10, 3, 0), self.local(2024, 3, 10, 3, 15), self.local(2024, 3, 10, 3, 30)])
+
+    ## Tests for ambiguous local times
+    def test_ambiguous_time_policies(self):
+        """Test that a repeated 01:30 fires at the first, last or both occurrences."""
+        start, end = self.local(2024, 11, 3), self.local(2024, 11, 4)
+        first, second = self.local(2024, 11, 3, 1, 30), self.local(2024, 11, 3, 1, 30, fold=1)
+        self.assertEqual([(run, run.fold) for run in self.runs("30 1 * * * /cmd", start, end)], [(first, 0)])
+        self.assertEqual([(run, run.fold) for run in self.runs("30 1 * * * /cmd", start, end, ambiguous="last")], [(second, 1)])
+        runs = self.runs("30 1 * * * /cmd", start, end, ambiguous="both")
+        self.assertEqual([run.fold for run in runs], [0, 1])
+        self.assertEqual(runs[1] - runs[0], timedelta(0))  # same wall time ...
+        self.assertEqual(runs[1].astimezone(timezone.utc) - runs[0].astimezone(timezone.utc), timedelta(hours=1))  # ... an hour apart
+
+    def test_runs_match_minute_stepping_reference(self):
+        """Test iter_runs against converting every UTC minute, including a 30-minute DST shift."""
+        lord_howe = ZoneInfo("Australia/Lord_Howe")
+        cases = [
+            (self.new_york, datetime(2024, 3, 9, 22), datetime(2024, 3, 10, 5)),
+            (self.new_york, datetime(2024, 11, 2, 23), datetime(2024, 11, 3, 4)),
+            (lord_howe, datetime(2024, 4, 7, 0), datetime(2024, 4, 7, 4)),
+            (lord_howe, datetime(2024, 10, 6, 0), datetime(2024, 10, 6, 4)),
+        ]
+        for zone, start, end in cases:
+            start, end = start.replace(tzinfo=zone), end.replace(tzinfo=zone)
+            for expression in ("*/15 * * * * /cmd", "45 1,2 * * * /cmd", "10 0-4 * * * /cmd"):
+                expected = self.stepping_reference(expression, zone, start, end)
+                got = self.runs(expression, start, end, zone, nonexistent="skip", ambiguous="both")
+                self.assertEqual([run.astimezone(timezone.utc) for run in got], [run.astimezone(timezone.utc) for run in expected], (zone, expression))
+                self.assertEqual([run.fold for run in got], [run.fold for run in expected])
+
+    def test_next_run_is_strictly_after_an_instant(self):
+        """Test next_run with an aware datetime from another zone."""
+        zoned = ZonedCronExpression("0 9 * * * /cmd", "America/New_York")
+        self.assertEqual(zoned.next_run(datetime(2024, 7, 1, 13, 0, tzinfo=timezone.utc)), self.local(2024, 7, 2, 9, 0))
+        self.assertEqual(zoned.next_run(datetime(2024, 7, 1, 12, 59, tzinfo=timezone.utc)), self.local(2024, 7, 1, 9, 0))
+        self.assertIsNone(ZonedCronExpression("0 0 30 2 * /cmd", self.new_york).next_run(self.local(2024, 1, 1)))
+
+    def test_invalid_arguments(self):
+        """Test that naive datetimes and unknown policies are rejected."""
+        with self.assertRaises(ValueError):
+            ZonedCronExpression("* * * * * /cmd", self.new_york).next_run(datetime(2024, 1, 1))
+        with self.assertRaises(ValueError):
+            ZonedCronExpression("* * * * * /cmd", self.new_york, nonexistent="later")
+        with self.assertRaises(ValueError):
+            ZonedCronExpression("* * * * * /cmd", self.new_york, ambiguous="never")
+
+
+if __name__ == '__main__':
+    unittest.main()